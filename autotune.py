@@ -0,0 +1,100 @@
+import copy
+import time
+
+# Candidate values per tunable option, in increasing order; the tuner moves one step at a time.
+TUNABLES = {
+    'robocopy': {'threads': [1, 2, 4, 8, 12, 16, 24, 32, 64, 128]},
+    'rclone': {'checkers': [4, 8, 16, 32, 64], 'transfers': [2, 4, 8, 16, 32], 'multi_thread_streams': [0, 1, 2, 4, 8, 16]},
+    'native': {'workers': [1, 2, 4, 8, 16, 32]},
+}
+DEFAULTS = {'threads': 16, 'checkers': 16, 'transfers': 8, 'multi_thread_streams': 4, 'workers': 8}
+# Runs that move less data than this say nothing useful about throughput.
+MIN_SAMPLE_BYTES = 32 * 1024 * 1024
+# A trial must beat the current best by this factor to be kept, so noise doesn't cause flapping.
+IMPROVEMENT_FACTOR = 1.05
+# Weight of a new sample of the current best setting, so the baseline follows slow drift.
+BASELINE_WEIGHT = 0.3
+# Once converged, exploration restarts after this many useful samples in case conditions changed.
+REEXPLORE_AFTER = 20
+
+
+def _nearest_index(values, value):
+    return min(range(len(values)), key=lambda i: abs(values[i] - value))
+
+
+def apply_tuning(pair, tuning, options):
+    """Stores the result of AutoTuner.observe on a pair; call it on the thread that owns and saves the config."""
+    pair['tuning'] = tuning
+    if options: pair['tool_options'] = dict(pair.get('tool_options') or {}, **options)
+
+
+class AutoTuner:
+    """Coordinate-wise hill climbing over a pair's tool options, driven by measured throughput.
+
+    State lives in pair['tuning'] so it is saved with the pair, and the chosen setting goes into
+    pair['tool_options'] for the next run. observe() runs on sync threads and never changes the
+    pair itself; the owner of the config applies its result with apply_tuning.
+    """
+
+    def observe(self, pair, record):
+        """Feeds one finished run.
+
+        Returns None if the run says nothing about throughput, else (description, tuning, options):
+        the new tuning state and the options to set, with description None if the options stay as they are.
+        """
+        tunables = TUNABLES.get(pair.get('tool'))
+        metrics = record.metrics
+        if not tunables or not record.success or metrics.bytes_transferred < MIN_SAMPLE_BYTES or not metrics.speed_bps:
+            return None
+        score = metrics.speed_bps
+        state = copy.deepcopy(pair.get('tuning') or {})
+        options = pair.get('tool_options') or {}
+        current = {k: options.get(k, DEFAULTS[k]) for k in tunables}
+        state['samples'] = state.get('samples', 0) + 1
+        state['updated'] = time.time()
+
+        trial = state.get('trial')
+        if not state.get('best') or state.get('best_score') is None:
+            state.update(best=current, best_score=score, param=0, direction=1, failures=0, converged=False)
+        elif trial and trial == current:
+            if score > state['best_score'] * IMPROVEMENT_FACTOR:
+                state.update(best=trial, best_score=score, failures=0)
+            else:
+                state['failures'] = state.get('failures', 0) + 1
+                self._next_direction(state, len(tunables))
+        else:
+            state['best_score'] = (1 - BASELINE_WEIGHT) * state['best_score'] + BASELINE_WEIGHT * score
+            if state.get('converged') and state['samples'] % REEXPLORE_AFTER == 0:
+                state.update(converged=False, failures=0)
+
+        if state.get('failures', 0) >= 2 * len(tunables):
+            state['converged'] = True
+        state['trial'] = None if state.get('converged') else self._propose(state, tunables)
+        chosen = state['trial'] or state['best']
+        if chosen == current:
+            return None, state, {}
+        label = "trying" if state['trial'] else "settled on"
+        return f"{label} " + ", ".join(f"{k}={v}" for k, v in chosen.items()), state, dict(chosen)
+
+    @staticmethod
+    def _next_direction(state, param_count):
+        if state.get('direction', 1) == 1:
+            state['direction'] = -1
+        else:
+            state['direction'] = 1
+            state['param'] = (state.get('param', 0) + 1) % param_count
+
+    def _propose(self, state, tunables):
+        """Returns the best setting with one option moved one step, skipping moves off the end of a range."""
+        names = list(tunables)
+        for _ in range(2 * len(names)):
+            name = names[state.get('param', 0) % len(names)]
+            values = tunables[name]
+            index = _nearest_index(values, state['best'][name]) + state.get('direction', 1)
+            if 0 <= index < len(values):
+                trial = dict(state['best'])
+                trial[name] = values[index]
+                return trial
+            state['failures'] = state.get('failures', 0) + 1
+            self._next_direction(state, len(names))
+        return None
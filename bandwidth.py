@@ -0,0 +1,146 @@
+import time
+import threading
+from datetime import datetime
+
+MB = 1024 * 1024
+# How often running native copies pick up schedule changes.
+REBALANCE_SECONDS = 5.0
+# Longest single sleep of a throttled copy, so cancellation and rate changes are noticed quickly.
+MAX_THROTTLE_SLEEP = 0.5
+# Floor for an external job started while fixed-rate jobs hold the whole budget, so it still makes progress.
+MIN_JOB_RATE = 64 * 1024
+
+
+def _minutes(text):
+    hours, _, minutes = str(text).partition(':')
+    return int(hours) * 60 + int(minutes or 0)
+
+
+def budget_at(limit_mbps, schedule, now=None):
+    """Returns the budget in bytes/s for a moment, or None for unlimited.
+
+    schedule entries look like {"start": "08:00", "end": "18:00", "limit": 5} (MB/s, 0 = unlimited);
+    a window may wrap past midnight, and the first matching entry wins over the base limit.
+    """
+    now = now or datetime.now()
+    minute = now.hour * 60 + now.minute
+    limit = limit_mbps
+    for entry in schedule or []:
+        try:
+            start, end = _minutes(entry['start']), _minutes(entry['end'])
+        except (KeyError, ValueError):
+            continue
+        inside = start <= minute < end if start <= end else (minute >= start or minute < end)
+        if inside:
+            limit = entry.get('limit', 0)
+            break
+    limit = float(limit or 0)
+    return limit * MB if limit > 0 else None
+
+
+class TokenBucket:
+    """Paces one pair's native copies; the rate is changed in place when the budget is rebalanced."""
+
+    def __init__(self, manager, rate=None):
+        self.manager = manager
+        self.rate = rate
+        self._tokens = 0.0
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, amount, cancel_event=None):
+        self.manager.maybe_rebalance()
+        while True:
+            with self._lock:
+                rate = self.rate
+                now = time.monotonic()
+                if rate is None:
+                    self._last = now
+                    return
+                # Allow at most one second of burst after an idle period.
+                self._tokens = min(rate, self._tokens + (now - self._last) * rate)
+                self._last = now
+                if self._tokens >= amount or amount > rate and self._tokens >= rate:
+                    self._tokens -= amount
+                    return
+                wait = (min(amount, rate) - self._tokens) / rate
+            if cancel_event is not None and cancel_event.wait(min(wait, MAX_THROTTLE_SLEEP)): return
+            if cancel_event is None: time.sleep(min(wait, MAX_THROTTLE_SLEEP))
+
+
+class BandwidthManager:
+    """Splits a global, time-of-day dependent bandwidth budget across running pairs by their priority weight.
+
+    External tools get a fixed rate when they start, which is reserved until they finish; native
+    buckets share whatever those reservations leave and are rebalanced live.
+    """
+
+    def __init__(self, limit_mbps=0, schedule=None):
+        self.limit_mbps = limit_mbps
+        self.schedule = schedule or []
+        self._lock = threading.Lock()
+        self._leases = {}
+        self._last_rebalance = 0.0
+
+    def configure(self, limit_mbps=0, schedule=None):
+        with self._lock:
+            self.limit_mbps = limit_mbps or 0
+            self.schedule = schedule or []
+        self.rebalance()
+
+    def is_limited(self):
+        return bool(self.limit_mbps) or any(entry.get('limit') for entry in self.schedule)
+
+    def acquire(self, key, weight=1):
+        """Registers a running job of a pair and returns the pair's TokenBucket. Jobs of one pair share its bucket."""
+        with self._lock:
+            lease = self._leases.get(key)
+            if lease is None:
+                lease = self._leases[key] = {"weight": max(0.1, float(weight or 1)), "jobs": 0, "reserved": 0.0,
+                                             "bucket": TokenBucket(self)}
+            lease["jobs"] += 1
+        self.rebalance()
+        return lease["bucket"]
+
+    def release(self, key, reserved=None):
+        """Ends a job of a pair; reserved is the rate reserve_job_rate returned for it, if any."""
+        with self._lock:
+            lease = self._leases.get(key)
+            if lease is None: return
+            lease["jobs"] -= 1
+            if reserved: lease["reserved"] = max(0.0, lease["reserved"] - reserved)
+            if lease["jobs"] <= 0: del self._leases[key]
+        self.rebalance()
+
+    def reserve_job_rate(self, key):
+        """Fixes the bytes/s of one external process of a pair, or returns None when unlimited.
+
+        The rate is the pair's weighted share split across its concurrent jobs, capped at what other
+        running fixed-rate jobs leave unused, so all jobs together stay within the budget.
+        """
+        with self._lock:
+            lease = self._leases.get(key)
+            budget = budget_at(self.limit_mbps, self.schedule)
+            if lease is None or not budget: return None
+            total_weight = sum(l["weight"] for l in self._leases.values())
+            share = budget * lease["weight"] / total_weight / max(1, lease["jobs"])
+            unused = budget - sum(l["reserved"] for l in self._leases.values())
+            rate = max(MIN_JOB_RATE, min(share, unused))
+            lease["reserved"] += rate
+        self.rebalance()
+        return rate
+
+    def rebalance(self):
+        with self._lock:
+            budget = budget_at(self.limit_mbps, self.schedule)
+            paced = [lease for lease in self._leases.values() if not lease["reserved"]]
+            left = max(MIN_JOB_RATE, budget - sum(lease["reserved"] for lease in self._leases.values())) if budget else None
+            total_weight = sum(lease["weight"] for lease in paced)
+            for lease in self._leases.values():
+                if not budget: lease["bucket"].rate = None
+                elif lease["reserved"]: lease["bucket"].rate = lease["reserved"]
+                else: lease["bucket"].rate = left * lease["weight"] / total_weight
+            self._last_rebalance = time.monotonic()
+
+    def maybe_rebalance(self):
+        if time.monotonic() - self._last_rebalance > REBALANCE_SECONDS: self.rebalance()
@@ -0,0 +1,206 @@
+"""Benchmarks SyncManager engines and option sets on synthetic trees.
+
+Each case syncs a generated tree to an empty destination ("initial"), syncs it again
+unchanged ("noop") and syncs it after a round of edits ("churn"). Every phase runs in a
+fresh worker process, so peak RSS and CPU time belong to that phase alone, including the
+rsync/rclone/robocopy processes it starts. rclone runs against its local backend, standing
+in for a remote.
+
+    python benchmarks/run.py --profiles small-files mixed --engines native rsync --scale 0.2
+    python benchmarks/run.py --compare benchmarks/results/20250101-120000.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.trees import PROFILES, generate, churn
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+PHASES = ("initial", "noop", "churn")
+MODES = {"native": "MIR", "rsync": "MIR", "rclone": "sync", "robocopy": "MIR"}
+# (variant name, tool_options); each engine is measured with every variant.
+VARIANTS = {
+    "native": [("workers=8", {"workers": 8}), ("workers=32", {"workers": 32})],
+    "rsync": [("whole-file", {"transfer_mode": "whole"}), ("delta", {"transfer_mode": "delta"})],
+    "rclone": [("transfers=8", {"transfers": 8, "checkers": 16}), ("transfers=32", {"transfers": 32, "checkers": 32})],
+    "robocopy": [("mt=16", {"threads": 16, "retries": 0, "wait": 0}), ("mt=64", {"threads": 64, "retries": 0, "wait": 0})],
+}
+# Wall-time increase (relative) that --compare reports as a regression.
+REGRESSION_THRESHOLD = 0.15
+
+
+def engine_available(engine):
+    return engine == "native" or shutil.which(engine) is not None
+
+
+def _peak_rss_mb(usage):
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    return usage.ru_maxrss / (1048576 if sys.platform == "darwin" else 1024)
+
+
+def run_phase(spec):
+    """Worker side: one SyncManager run of one pair, measured from inside a fresh process."""
+    from sync_manager import SyncManager
+    manager = SyncManager(queue.Queue(), spec["state_dir"])
+    records = []
+    manager.add_listener(lambda event: records.append(event[2]) if event[0] == "run" else None)
+    pair = {"source": spec["source"], "destination": spec["destination"], "tool": spec["engine"], "mode": MODES[spec["engine"]],
+            "enabled": True, "exclusions": [], "tool_options": spec["options"]}
+    before = os.times()
+    started = time.perf_counter()
+    results = manager.run_once([pair])
+    wall = time.perf_counter() - started
+    after = os.times()
+    cpu = sum(after[i] - before[i] for i in range(4))
+    peak_rss = None
+    if resource is not None:
+        peak_rss = max(_peak_rss_mb(resource.getrusage(resource.RUSAGE_SELF)), _peak_rss_mb(resource.getrusage(resource.RUSAGE_CHILDREN)))
+    metrics = records[-1].metrics if records else None
+    return {"success": bool(results and results[0][1]), "wall_seconds": wall, "cpu_seconds": cpu, "peak_rss_mb": peak_rss,
+            "reported_files_copied": metrics.files_copied if metrics else None,
+            "reported_bytes": metrics.bytes_transferred if metrics else None,
+            "errors": metrics.errors if metrics else None}
+
+
+def _measure(spec):
+    process = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", json.dumps(spec)],
+                             capture_output=True, text=True)
+    lines = process.stdout.strip().splitlines()
+    if process.returncode != 0 or not lines:
+        return {"success": False, "error": (process.stderr or "worker failed").strip()[-2000:]}
+    return json.loads(lines[-1])
+
+
+def run_case(profile, engine, variant, options, args, work_dir):
+    case_dir = tempfile.mkdtemp(prefix=f"{profile}-{engine}-", dir=work_dir)
+    source, destination, state_dir = (os.path.join(case_dir, name) for name in ("src", "dst", "state"))
+    os.makedirs(destination)
+    os.makedirs(state_dir)
+    dataset = generate(profile, source, args.scale, args.seed)
+    spec = {"source": source, "destination": destination, "state_dir": state_dir, "engine": engine, "options": options}
+    results = []
+    try:
+        for phase in PHASES:
+            work = dataset
+            if phase == "noop": work = {"files": dataset["files"], "bytes": 0}
+            if phase == "churn": work = churn(source, args.churn, args.seed)
+            result = {"profile": profile, "engine": engine, "variant": variant, "phase": phase,
+                      "dataset_files": dataset["files"], "dataset_bytes": dataset["bytes"], "files": work["files"], "bytes": work["bytes"]}
+            result.update(_measure(spec))
+            wall = result.get("wall_seconds")
+            # Throughput is measured against the work the scenario defines, so engines are compared on equal terms.
+            result["files_per_second"] = work["files"] / wall if wall else None
+            result["mb_per_second"] = work["bytes"] / 1048576 / wall if wall else None
+            results.append(result)
+            print(format_result(result), flush=True)
+    finally:
+        if not args.keep: shutil.rmtree(case_dir, ignore_errors=True)
+    return results
+
+
+def _median_run(phase_results):
+    """Keeps the repeat with the median wall time (failed repeats sort last)."""
+    ordered = sorted(phase_results, key=lambda r: r.get("wall_seconds") if r.get("success") else float('inf'))
+    result = dict(ordered[(len(ordered) - 1) // 2])
+    result["repeats"] = len(phase_results)
+    return result
+
+
+def format_result(r):
+    if "wall_seconds" not in r:
+        return f"{r['profile']:<12} {r['engine']:<8} {r['variant']:<13} {r['phase']:<8} FAILED: {r.get('error', '')[:200]}"
+    rss = f"{r['peak_rss_mb']:.0f} MB" if r.get("peak_rss_mb") is not None else "n/a"
+    status = "" if r["success"] else "  (sync reported failure)"
+    return (f"{r['profile']:<12} {r['engine']:<8} {r['variant']:<13} {r['phase']:<8} {r['wall_seconds']:8.2f}s "
+            f"{r['files_per_second'] or 0:10.0f} files/s {r['mb_per_second'] or 0:8.1f} MB/s  cpu {r['cpu_seconds']:.2f}s  rss {rss}{status}")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(old_path, new_results, threshold):
+    """Prints wall-time changes against an earlier results file; returns the number of regressions."""
+    with open(old_path, 'r', encoding='utf-8') as f:
+        old = {(r["profile"], r["engine"], r["variant"], r["phase"]): r for r in json.load(f)["results"]}
+    regressions = 0
+    for r in new_results:
+        before = old.get((r["profile"], r["engine"], r["variant"], r["phase"]))
+        if not before or not before.get("wall_seconds") or not r.get("wall_seconds"): continue
+        change = r["wall_seconds"] / before["wall_seconds"] - 1
+        flag = ""
+        if change > threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{r['profile']:<12} {r['engine']:<8} {r['variant']:<13} {r['phase']:<8} "
+              f"{before['wall_seconds']:8.2f}s -> {r['wall_seconds']:8.2f}s ({change:+.0%}){flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark DirectorySync engines on synthetic trees.")
+    parser.add_argument("--profiles", nargs="+", choices=sorted(PROFILES), default=sorted(PROFILES))
+    parser.add_argument("--engines", nargs="+", choices=sorted(VARIANTS), default=sorted(VARIANTS))
+    parser.add_argument("--variants", nargs="+", help="Only run these variant names (e.g. workers=8)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplies the number of files in every profile")
+    parser.add_argument("--churn", type=float, default=0.1, help="Fraction of files touched before the churn phase")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1, help="Run every case this many times and keep the median")
+    parser.add_argument("--work-dir", help="Where trees are generated (default: system temp dir)")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare wall times against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="Relative slowdown counted as a regression")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated trees")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_phase(json.loads(args.worker))))
+        return 0
+
+    results = []
+    for engine in args.engines:
+        if not engine_available(engine):
+            print(f"Skipping {engine}: executable not found in PATH.")
+            continue
+        for variant, options in VARIANTS[engine]:
+            if args.variants and variant not in args.variants: continue
+            for profile in args.profiles:
+                runs = [run_case(profile, engine, variant, options, args, args.work_dir) for _ in range(args.repeat)]
+                results.extend(_median_run(phase_results) for phase_results in zip(*runs))
+
+    report = {"created": datetime.datetime.now().isoformat(timespec="seconds"), "commit": _git_commit(),
+              "host": {"platform": platform.platform(), "python": platform.python_version(), "cpus": os.cpu_count()},
+              "settings": {"scale": args.scale, "churn": args.churn, "seed": args.seed, "repeat": args.repeat}, "results": results}
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    failed = sum(1 for r in results if not r.get("success"))
+    regressions = compare(args.compare, results, args.threshold) if args.compare else 0
+    return 1 if failed or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
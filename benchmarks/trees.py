@@ -0,0 +1,107 @@
+"""Deterministic synthetic source trees for the benchmark runner.
+
+Every tree is built from a seeded RNG, so the same profile, scale and seed always produce the
+same paths, sizes and contents. Contents are slices of one random block, so they don't compress.
+"""
+import os
+import random
+
+BLOCK_SIZE = 4 * 1024 * 1024
+KB = 1024
+MB = 1024 * KB
+
+
+def _small_files(rng, scale):
+    for i in range(int(20000 * scale)):
+        yield f"d{i % 200:03d}/f{i:06d}.dat", rng.randint(1 * KB, 16 * KB)
+
+
+def _huge_files(rng, scale):
+    for i in range(max(1, int(4 * scale))):
+        yield f"huge{i:02d}.bin", 128 * MB + rng.randint(0, MB)
+
+
+def _deep(rng, scale):
+    # Long chains of nested directories with a few files at every level.
+    for branch in range(max(1, int(50 * scale))):
+        parts = [f"b{branch:03d}"]
+        for level in range(40):
+            parts.append(f"l{level:02d}")
+            for n in range(5):
+                yield "/".join(parts + [f"f{n}.txt"]), rng.randint(512, 8 * KB)
+
+
+def _mixed(rng, scale):
+    for i in range(int(5000 * scale)):
+        # Log-normal sizes: mostly small files, with a long tail up to tens of MB.
+        size = min(64 * MB, int(rng.lognormvariate(9.5, 2.0)))
+        yield f"p{i % 37:02d}/s{i % 11:02d}/m{i:05d}.bin", size
+
+
+PROFILES = {
+    "small-files": _small_files,
+    "huge-files": _huge_files,
+    "deep": _deep,
+    "mixed": _mixed,
+}
+
+
+class _Content:
+    """Writes pseudo-random, incompressible bytes cut from one seeded block."""
+
+    def __init__(self, rng):
+        self.block = rng.randbytes(BLOCK_SIZE)
+        self.rng = rng
+
+    def write(self, path, size):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        offset = self.rng.randrange(BLOCK_SIZE)
+        with open(path, 'wb') as f:
+            remaining = size
+            while remaining > 0:
+                chunk = self.block[offset:offset + remaining]
+                f.write(chunk)
+                remaining -= len(chunk)
+                offset = 0
+
+
+def generate(profile, root, scale=1.0, seed=0):
+    """Creates the profile's tree under root and returns {"files": n, "bytes": n}."""
+    rng = random.Random(f"{profile}:{seed}")
+    content = _Content(rng)
+    files = total = 0
+    for rel_path, size in PROFILES[profile](rng, scale):
+        content.write(os.path.join(root, rel_path), size)
+        files += 1
+        total += size
+    return {"files": files, "bytes": total}
+
+
+def churn(root, fraction=0.1, seed=0):
+    """Modifies, deletes and adds files under root like a day of edits; returns the work a sync must do."""
+    rng = random.Random(f"churn:{seed}")
+    content = _Content(rng)
+    paths = []
+    for dirpath, _, filenames in os.walk(root):
+        paths.extend(os.path.join(dirpath, name) for name in filenames)
+    paths.sort()
+    picked = rng.sample(paths, max(1, int(len(paths) * fraction))) if paths else []
+    modified, deleted = picked[:len(picked) // 2], picked[len(picked) // 2:len(picked) * 3 // 4]
+    result = {"files": 0, "bytes": 0, "modified": len(modified), "deleted": len(deleted), "added": 0}
+    for path in modified:
+        size = os.path.getsize(path)
+        st = os.stat(path)
+        content.write(path, size)
+        # Same size, so push mtime clearly past the last sync for tools that compare size and mtime.
+        os.utime(path, (st.st_atime, st.st_mtime + 10))
+        result["bytes"] += size
+    for path in deleted:
+        os.remove(path)
+    for i, path in enumerate(picked[len(picked) * 3 // 4:]):
+        new_path = os.path.join(os.path.dirname(path), f"new{seed}_{i:05d}.dat")
+        size = os.path.getsize(path)
+        content.write(new_path, size)
+        result["bytes"] += size
+        result["added"] += 1
+    result["files"] = result["modified"] + result["deleted"] + result["added"]
+    return result
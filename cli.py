@@ -0,0 +1,174 @@
+"""Headless entry point: drives SyncManager from config.json without Tk.
+
+Nothing in this module (or what it imports) may pull in tkinter or ttkbootstrap,
+so it starts fast and runs on servers without a display.
+"""
+import argparse
+import json
+import logging
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+
+from sync_manager import SyncManager, DEFAULT_MAX_WORKERS, DEFAULT_MAX_PER_DEVICE
+from metrics_exporter import MetricsExporter
+from config_store import ConfigStore
+from autotune import apply_tuning
+
+LEVELS = {"INFO": logging.INFO, "SUCCESS": logging.INFO, "WARNING": logging.WARNING, "ERROR": logging.ERROR}
+
+logger = logging.getLogger("directorysync")
+
+
+def pair_name(pair):
+    return os.path.basename(pair.get("source") or "") or "New Pair"
+
+
+def enabled_pairs(config):
+    pairs = []
+    for pair in config.get("pairs", []):
+        if not pair.get("enabled", False): continue
+        if not pair.get("source") or not pair.get("destination"):
+            logger.warning(f"Skipping pair '{pair_name(pair)}': empty source or destination.")
+            continue
+        pairs.append(pair)
+    return pairs
+
+
+def find_pair(config, name):
+    for pair in config.get("pairs", []):
+        if name in (pair_name(pair), pair.get("source"), pair.get("id")):
+            return pair
+    return None
+
+
+def setup_logging(log_file, verbose):
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if log_file:
+        from logging.handlers import RotatingFileHandler
+        handlers.append(RotatingFileHandler(log_file, maxBytes=10 * 1024 * 1024, backupCount=5, encoding='utf-8'))
+    logging.basicConfig(level=logging.DEBUG if verbose else logging.INFO, handlers=handlers,
+                        format="[%(asctime)s] %(levelname)s %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+
+
+def consume_messages(message_queue, store, stop_event):
+    """Turns SyncManager events into log records until stop_event is set and the queue is drained."""
+    while not (stop_event.is_set() and message_queue.empty()):
+        try:
+            message_type, *args = message_queue.get(timeout=0.2)
+        except queue.Empty:
+            continue
+        if message_type == "log":
+            logger.log(LEVELS.get(args[1], logging.INFO), args[0])
+        elif message_type == "status":
+            logger.debug(f"{pair_name(args[1])}: {args[0]}")
+        elif message_type == "progress":
+            logger.debug(f"{pair_name(args[0])}: {args[1]}")
+        elif message_type == "tuned":
+            pair, tuning, options = args
+            store.apply(lambda: apply_tuning(pair, tuning, options))
+            store.schedule_save()
+        # "error" repeats a message already logged at ERROR level; "metrics", "run" and "verify" are for the GUI/exporters.
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="directorysync", description="Run DirectorySync pairs without the GUI.")
+    parser.add_argument("--config", default="config.json", help="Path to config.json (default: %(default)s)")
+    parser.add_argument("--log-file", help="Also write logs to this file (rotated at 10 MB)")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this port (default: metrics_port from config, off if unset)")
+    parser.add_argument("--metrics-host", help="Address for the metrics endpoint (default: metrics_host from config or 127.0.0.1)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show per-pair status and progress")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("run-once", help="Sync every enabled pair once and exit")
+    loop_parser = subparsers.add_parser("run-loop", help="Sync enabled pairs every interval until stopped")
+    loop_parser.add_argument("--interval", type=int, help="Seconds between cycles (default: from config)")
+    loop_parser.add_argument("--watch", action="store_true", default=None, help="Also sync on file changes (Linux inotify)")
+    pair_parser = subparsers.add_parser("run-pair", help="Sync one pair once and exit")
+    pair_parser.add_argument("name", help="Pair name (source folder name), full source path or pair id")
+    plan_parser = subparsers.add_parser("plan", help="Show what syncing one pair would change, without changing anything")
+    plan_parser.add_argument("name", help="Pair name (source folder name) or full source path")
+    plan_parser.add_argument("--json", action="store_true", help="Print the full plan as JSON")
+    verify_parser = subparsers.add_parser("verify", help="Compare one pair's source and destination by content hash")
+    verify_parser.add_argument("name", help="Pair name (source folder name) or full source path")
+    args = parser.parse_args(argv)
+
+    setup_logging(args.log_file, args.verbose)
+    config_path = os.path.abspath(args.config)
+    store = ConfigStore(config_path, lambda message, level: logger.log(LEVELS.get(level, logging.INFO), message))
+    try:
+        if not store.exists(): raise FileNotFoundError("no such file")
+        config = store.load()
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to load config '{config_path}': {e}")
+        return 2
+    # Persists ids assigned to pairs from older configs; a no-op otherwise.
+    store.save()
+
+    message_queue = queue.Queue()
+    manager = SyncManager(message_queue, os.path.dirname(config_path))
+    metrics_port = config.get("metrics_port") if args.metrics_port is None else args.metrics_port
+    if metrics_port:
+        exporter = MetricsExporter(manager, int(metrics_port), args.metrics_host or config.get("metrics_host", "127.0.0.1"))
+        try:
+            logger.info(f"Serving metrics on http://{exporter.host}:{exporter.start()}/metrics")
+        except OSError as e:
+            logger.error(f"Could not start the metrics endpoint on port {metrics_port}: {e}")
+            return 2
+    stop_event = threading.Event()
+    consumer = threading.Thread(target=consume_messages, args=(message_queue, store, stop_event), daemon=True)
+    consumer.start()
+
+    def handle_signal(signum, frame):
+        logger.warning(f"Received signal {signum}, stopping.")
+        manager.stop_cycle()
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    manager.bandwidth.configure(float(config.get("bandwidth_limit") or 0), config.get("bandwidth_schedule", []))
+    max_workers = config.get("max_workers", DEFAULT_MAX_WORKERS)
+    max_per_device = config.get("max_per_device", DEFAULT_MAX_PER_DEVICE)
+    try:
+        if args.command == "run-loop":
+            pairs = enabled_pairs(config)
+            if not pairs:
+                logger.warning("No enabled pairs to sync.")
+                return 1
+            interval = args.interval or int(config.get("interval", 60))
+            watch = config.get("watch", False) if args.watch is None else args.watch
+            manager.start_cycle(pairs, interval, max_workers, max_per_device, watch)
+            while manager.is_running():
+                time.sleep(0.5)
+            return 0
+
+        if args.command in ("run-pair", "plan", "verify"):
+            pair = find_pair(config, args.name)
+            if pair is None:
+                logger.error(f"No pair named '{args.name}' in {config_path}.")
+                return 2
+            if args.command == "plan":
+                plan = manager.plan_pair(pair)
+                if plan is not None and args.json: print(json.dumps(plan.to_dict(), indent=2))
+                return 2 if plan is None else 0
+            if args.command == "verify":
+                result = manager.verify_pair(pair)
+                return 2 if result is None else int(bool(result["missing"] or result["mismatched"]))
+            pairs = [pair]
+        else:
+            pairs = enabled_pairs(config)
+        results = manager.run_once(pairs, max_workers, max_per_device)
+        failed = [pair_name(p) for p, ok in results if not ok]
+        if failed:
+            logger.error(f"{len(failed)} of {len(pairs)} pair(s) failed: {', '.join(failed)}")
+        return 1 if failed or len(results) < len(pairs) else 0
+    finally:
+        manager.shutdown()
+        stop_event.set()
+        consumer.join(timeout=5)
+        store.flush()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+import os
+import json
+import uuid
+import hashlib
+import threading
+
+# Per-run state the GUI keeps on pairs in older configs; it is never written back.
+RUNTIME_KEYS = ("status",)
+SAVE_DELAY_SECONDS = 1.0
+
+
+def new_pair_id():
+    return uuid.uuid4().hex
+
+
+def pair_id(pair):
+    """Returns the pair's stable id, assigning one to pairs that don't have it yet."""
+    if not pair.get("id"): pair["id"] = new_pair_id()
+    return pair["id"]
+
+
+def path_key(pair):
+    """The key persisted state used before pairs had ids: a hash of the pair's paths."""
+    key = f"{pair.get('source')}|{pair.get('destination')}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+def state_key(pair):
+    """Key for a pair's persisted state: its stable id (plus the subtree for sub-pairs), or its path key if it has no id."""
+    if not pair.get("id"): return path_key(pair)
+    if not pair.get("subtree"): return pair["id"]
+    return f"{pair['id']}-{hashlib.sha1(pair['subtree'].encode('utf-8')).hexdigest()[:8]}"
+
+
+class ConfigStore:
+    """config.json with lazy loading, atomic replace-on-write and debounced saves.
+
+    Every pair gets a stable "id" on load. Runtime keys are dropped from pairs, and a save
+    whose content matches what is already on disk is skipped.
+    """
+
+    def __init__(self, path, log=None):
+        self.path = os.path.abspath(path)
+        self.log = log or (lambda message, level: None)
+        self._config = None
+        self._written = None
+        self._lock = threading.Lock()
+        self._timer = None
+
+    @property
+    def config(self):
+        if self._config is None: self.load()
+        return self._config
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def load(self):
+        """Reads the file (an empty config if it does not exist); raises OSError/ValueError if it can't be parsed."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except FileNotFoundError:
+            self._config = {}
+            return self._config
+        config = json.loads(content)
+        if not isinstance(config, dict): raise ValueError("config root must be a JSON object")
+        changed = False
+        for pair in config.get("pairs", []):
+            for key in RUNTIME_KEYS:
+                changed = pair.pop(key, None) is not None or changed
+            if not pair.get("id"):
+                pair_id(pair)
+                changed = True
+        self._config = config
+        # Newly assigned ids make the next save() write them, so they stay stable across restarts.
+        self._written = None if changed else content
+        return config
+
+    def serialize(self, config=None):
+        config = dict(self.config if config is None else config)
+        if "pairs" in config:
+            config["pairs"] = [{k: v for k, v in pair.items() if k not in RUNTIME_KEYS} for pair in config["pairs"]]
+        return json.dumps(config, indent=4, ensure_ascii=False)
+
+    def save(self, config=None):
+        """Writes the config now if it changed since the last write. Returns True if the file was written."""
+        if config is not None: self._config = config
+        with self._lock:
+            self._cancel_timer()
+            try:
+                content = self.serialize()
+                if content == self._written: return False
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                    f.flush()
+                    os.fsync(f.fileno())
+                # The old file stays intact until the new one is complete on disk.
+                os.replace(tmp_path, self.path)
+                self._written = content
+                return True
+            except Exception as e:
+                self.log(f"Error saving configuration: {e}", "ERROR")
+                return False
+
+    def apply(self, change):
+        """Runs change() under the save lock, so a save on another thread never serializes a half-applied edit."""
+        with self._lock:
+            change()
+
+    def schedule_save(self, delay=SAVE_DELAY_SECONDS):
+        """Coalesces saves requested within delay seconds into one write."""
+        with self._lock:
+            if self._timer is not None: return
+            self._timer = threading.Timer(delay, self._save_scheduled)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _save_scheduled(self):
+        with self._lock:
+            self._timer = None
+        self.save()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def flush(self):
+        """Writes any pending debounced save immediately."""
+        with self._lock:
+            pending = self._timer is not None
+            self._cancel_timer()
+        if pending: self.save()
@@ -0,0 +1,167 @@
+import os
+import re
+import time
+import fnmatch
+import hashlib
+import functools
+
+_GLOB_CHARS = re.compile(r'[*?\[]')
+# Above this many characters of exclusion arguments, patterns go into a filter file instead of argv
+# (cmd.exe stops at 8191 characters for the whole command line).
+MAX_EXCLUDE_ARGV = 1024
+# Filter files no run has used for this long are pruned at startup; each reuse refreshes a file's mtime.
+FILTER_MAX_AGE_SECONDS = 7 * 24 * 3600
+
+
+def split_exclusions(exclusions):
+    """Splits exclusion lines into directory and file patterns, using the same trailing-slash convention as the GUI."""
+    dir_patterns, file_patterns = [], []
+    for pattern in exclusions or []:
+        pattern = pattern.strip()
+        if not pattern or pattern.startswith('#'): continue
+        if pattern.endswith('/') or pattern.endswith('\\'):
+            dir_patterns.append(pattern.replace('\\', '/').rstrip('/'))
+        else:
+            file_patterns.append(pattern.replace('\\', '/'))
+    return dir_patterns, file_patterns
+
+
+class _PatternSet:
+    """Patterns for one entry type: literal names, a trie of anchored literal paths, and one combined regex for globs.
+
+    A pattern matches an entry's name or its relative path; a leading slash anchors it to the
+    pair root so it only matches the relative path, as in rclone/rsync filters.
+    """
+
+    def __init__(self, patterns):
+        self.names = set()
+        self.trie = {}
+        name_globs, path_globs = [], []
+        for pattern in patterns:
+            anchored = pattern.startswith('/')
+            pattern = os.path.normcase(pattern.lstrip('/')).replace('\\', '/')
+            if not pattern: continue
+            if _GLOB_CHARS.search(pattern):
+                regex = fnmatch.translate(pattern)
+                path_globs.append(regex)
+                if not anchored: name_globs.append(regex)
+                continue
+            if not anchored: self.names.add(pattern)
+            node = self.trie
+            for part in pattern.split('/'):
+                node = node.setdefault(part, {})
+            node[None] = True
+        self.name_regex = re.compile('|'.join(f'(?:{r})' for r in name_globs)) if name_globs else None
+        self.path_regex = re.compile('|'.join(f'(?:{r})' for r in path_globs)) if path_globs else None
+
+    def __bool__(self):
+        return bool(self.names or self.trie or self.name_regex or self.path_regex)
+
+    def _in_trie(self, rel_path):
+        node = self.trie
+        for part in rel_path.split('/'):
+            node = node.get(part)
+            if node is None: return False
+        return None in node
+
+    def matches(self, name, rel_path):
+        name = os.path.normcase(name)
+        rel_path = os.path.normcase(rel_path).replace('\\', '/')
+        if name in self.names or self._in_trie(rel_path): return True
+        if self.name_regex is not None and self.name_regex.match(name): return True
+        return self.path_regex is not None and self.path_regex.match(rel_path) is not None
+
+
+class ExclusionMatcher:
+    """A pair's exclusion list compiled once; use matcher_for() to get a cached instance."""
+
+    def __init__(self, exclusions):
+        self.patterns = tuple(p.strip() for p in exclusions or [] if p.strip() and not p.strip().startswith('#'))
+        dir_patterns, file_patterns = split_exclusions(self.patterns)
+        self.dirs = _PatternSet(dir_patterns)
+        self.files = _PatternSet(file_patterns)
+
+    def __bool__(self):
+        return bool(self.dirs or self.files)
+
+    def excluded(self, name, rel_path, is_dir):
+        """Checks one entry during a walk; the walk itself prunes everything under an excluded directory."""
+        patterns = self.dirs if is_dir else self.files
+        return bool(patterns) and patterns.matches(name, rel_path)
+
+    def excludes_path(self, rel_path, is_dir):
+        """Checks an arbitrary relative path, including whether any parent directory is excluded."""
+        parts = rel_path.split('/')
+        for i in range(1, len(parts)):
+            if self.excluded(parts[i - 1], '/'.join(parts[:i]), True): return True
+        return self.excluded(parts[-1], rel_path, is_dir)
+
+
+def rebase_exclusions(exclusions, subtree):
+    """Rewrites a pair's exclusions for a run rooted at subtree, a relative path below the pair root.
+
+    Unanchored patterns apply anywhere and are kept. Anchored ones below subtree are re-anchored to
+    it; the rest can't match inside it and are dropped.
+    """
+    parts = [part for part in subtree.replace('\\', '/').split('/') if part]
+    rebased = []
+    for line in exclusions or []:
+        pattern = line.strip()
+        if not pattern.startswith(('/', '\\')):
+            rebased.append(line)
+            continue
+        suffix = '/' if pattern.endswith(('/', '\\')) else ''
+        pattern_parts = [part for part in pattern.replace('\\', '/').split('/') if part]
+        head, rest = pattern_parts[:len(parts)], pattern_parts[len(parts):]
+        if rest and all(fnmatch.fnmatch(name, part) for name, part in zip(parts, head)):
+            rebased.append('/' + '/'.join(rest) + suffix)
+    return rebased
+
+
+@functools.lru_cache(maxsize=256)
+def _compile(patterns):
+    return ExclusionMatcher(patterns)
+
+
+def matcher_for(exclusions):
+    """Returns the compiled matcher for an exclusion list. Edited lists compile anew; unchanged ones are reused."""
+    if isinstance(exclusions, ExclusionMatcher): return exclusions
+    return _compile(tuple(exclusions or ()))
+
+
+def write_filter_file(directory, lines, extension="txt"):
+    """Writes lines to a file named after their content (so concurrent runs never clash) and returns its path."""
+    content = "\n".join(lines) + "\n"
+    digest = hashlib.sha1(content.encode('utf-8')).hexdigest()[:16]
+    path = os.path.join(directory, f"exclude-{digest}.{extension}")
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    else:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+    return path
+
+
+def prune_filter_files(directory, max_age=FILTER_MAX_AGE_SECONDS):
+    """Removes filter files (and leftover temp files) unused for max_age seconds; returns how many were removed."""
+    cutoff = time.time() - max_age
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return 0
+    removed = 0
+    for entry in entries:
+        if not entry.name.startswith("exclude-"): continue
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
@@ -0,0 +1,164 @@
+import os
+import time
+import sqlite3
+import threading
+
+from native_sync import scan_tree
+from config_store import path_key, state_key
+
+INDEX_FILE = "sync_index.db"
+# The index only tracks the source, so drift on the destination side is
+# corrected by forcing a full run at least this often.
+FULL_SWEEP_SECONDS = 24 * 3600
+_PAIR_TABLES = ("files", "pairs", "shard_weights")
+
+
+class ChangeSet:
+    def __init__(self, added, modified, removed, entries):
+        self.added = added
+        self.modified = modified
+        self.removed = removed
+        self.entries = entries
+
+    def is_empty(self):
+        return not (self.added or self.modified or self.removed)
+
+    def __len__(self):
+        return len(self.added) + len(self.modified) + len(self.removed)
+
+    def changed_subtrees(self):
+        """Returns the top-level directories holding every change, or None if the root itself changed."""
+        subtrees = set()
+        for rel_path in self.added | self.modified | self.removed:
+            top, sep, _ = rel_path.partition('/')
+            if not sep:
+                entry = self.entries.get(rel_path)
+                # A new or touched top-level dir can be synced on its own; anything
+                # else at the root (files, removed dirs) needs a full run.
+                if entry is None or not entry.is_dir or rel_path in self.removed:
+                    return None
+            subtrees.add(top)
+        return sorted(subtrees)
+
+
+class FileIndex:
+    """Persistent (path, size, mtime, inode) snapshot of each pair's source, kept in SQLite next to config.json."""
+
+    def __init__(self, state_dir):
+        self.db_path = os.path.join(state_dir, INDEX_FILE)
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self._claim_lock = threading.Lock()
+        self._roots = {}
+
+    @staticmethod
+    def pair_id(pair):
+        return state_key(pair)
+
+    def _claim(self, pair):
+        """Returns the pair's key, first adopting state stored under its old path key and dropping state recorded for other paths."""
+        pair_id, roots = self.pair_id(pair), (pair.get('source'), pair.get('destination'))
+        with self._claim_lock:
+            if self._roots.get(pair_id) == roots: return pair_id
+            conn = self._connect()
+            try:
+                with conn:
+                    row = conn.execute("SELECT source, destination FROM roots WHERE pair_id = ?", (pair_id,)).fetchone()
+                    if row is None:
+                        legacy = path_key(pair)
+                        for table in _PAIR_TABLES:
+                            if legacy != pair_id: conn.execute(f"UPDATE OR IGNORE {table} SET pair_id = ? WHERE pair_id = ?", (pair_id, legacy))
+                    elif tuple(row) != roots:
+                        # The pair was pointed at other paths; its snapshot says nothing about them, so the next run is a full one.
+                        for table in _PAIR_TABLES:
+                            conn.execute(f"DELETE FROM {table} WHERE pair_id = ?", (pair_id,))
+                    conn.execute("INSERT OR REPLACE INTO roots VALUES (?, ?, ?)", (pair_id, *roots))
+            finally:
+                conn.close()
+            self._roots[pair_id] = roots
+        return pair_id
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        with self._init_lock:
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("CREATE TABLE IF NOT EXISTS files (pair_id TEXT, path TEXT, is_dir INTEGER, size INTEGER, "
+                             "mtime_ns INTEGER, inode INTEGER, PRIMARY KEY (pair_id, path)) WITHOUT ROWID")
+                conn.execute("CREATE TABLE IF NOT EXISTS pairs (pair_id TEXT PRIMARY KEY, last_full_sync REAL)")
+                conn.execute("CREATE TABLE IF NOT EXISTS shard_weights (pair_id TEXT, name TEXT, weight REAL, PRIMARY KEY (pair_id, name))")
+                conn.execute("CREATE TABLE IF NOT EXISTS roots (pair_id TEXT PRIMARY KEY, source TEXT, destination TEXT)")
+                conn.commit()
+                self._initialized = True
+        return conn
+
+    def load(self, pair_id):
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT path, is_dir, size, mtime_ns, inode FROM files WHERE pair_id = ?", (pair_id,))
+            return {path: (bool(is_dir), size, mtime_ns, inode) for path, is_dir, size, mtime_ns, inode in rows}
+        finally:
+            conn.close()
+
+    def last_full_sync(self, pair_id):
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT last_full_sync FROM pairs WHERE pair_id = ?", (pair_id,)).fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+
+    def scan(self, pair, cancel_event=None, entries=None):
+        """Scans the pair's source (unless entries from a recent scan are given) and diffs it against the stored snapshot."""
+        if entries is None: entries = scan_tree(pair['source'], pair.get('exclusions', []), cancel_event)
+        previous = self.load(self._claim(pair))
+        added, modified = set(), set()
+        for rel_path, entry in entries.items():
+            old = previous.get(rel_path)
+            if old is None:
+                added.add(rel_path)
+            elif old != (entry.is_dir, entry.size, entry.mtime_ns, entry.inode):
+                modified.add(rel_path)
+        removed = set(previous) - set(entries)
+        return ChangeSet(added, modified, removed, entries)
+
+    def commit(self, pair, changes, full_run):
+        """Stores the scanned state after a successful run."""
+        pair_id = self._claim(pair)
+        rows = []
+        for rel_path in changes.added | changes.modified:
+            e = changes.entries[rel_path]
+            rows.append((pair_id, rel_path, int(e.is_dir), e.size, e.mtime_ns, e.inode))
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)", rows)
+                conn.executemany("DELETE FROM files WHERE pair_id = ? AND path = ?", ((pair_id, p) for p in changes.removed))
+                if full_run:
+                    conn.execute("INSERT OR REPLACE INTO pairs VALUES (?, ?)", (pair_id, time.time()))
+        finally:
+            conn.close()
+
+    def load_weights(self, pair):
+        pair_id = self._claim(pair)
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT name, weight FROM shard_weights WHERE pair_id = ?", (pair_id,))
+            return dict(rows)
+        finally:
+            conn.close()
+
+    def save_weights(self, pair, weights):
+        """Replaces the per-subtree weights used to balance shards on the next run."""
+        pair_id = self._claim(pair)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM shard_weights WHERE pair_id = ?", (pair_id,))
+                conn.executemany("INSERT INTO shard_weights VALUES (?, ?, ?)", ((pair_id, n, w) for n, w in weights.items()))
+        finally:
+            conn.close()
+
+    def needs_full_sweep(self, pair):
+        last = self.last_full_sync(self._claim(pair))
+        return last is None or time.time() - last > FULL_SWEEP_SECONDS
@@ -0,0 +1,192 @@
+import os
+import sys
+import time
+import errno
+import struct
+import select
+import ctypes
+import ctypes.util
+import threading
+
+from exclusions import matcher_for
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT = struct.Struct('iIII')
+# Past this many distinct paths a pair is reported as "changed everywhere".
+MAX_PATHS_PER_PAIR = 1000
+
+
+def is_supported():
+    return sys.platform.startswith('linux') and _load_libc() is not None
+
+
+_libc = None
+
+def _load_libc():
+    global _libc
+    if _libc is None:
+        try:
+            _libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            _libc.inotify_init1.argtypes = [ctypes.c_int]
+            _libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            _libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        except (OSError, AttributeError):
+            _libc = False
+    return _libc or None
+
+
+class InotifyWatcher:
+    """Recursive inotify watcher that debounces events and reports changed paths per watched root.
+
+    on_change(key, paths) is called from the watcher thread once a root has been quiet
+    for `debounce` seconds (or busy for `max_delay`). paths is a set of paths relative
+    to the root, or None when the change set overflowed and everything must be checked.
+    """
+
+    def __init__(self, on_change, debounce=1.0, max_delay=10.0, log=None):
+        libc = _load_libc()
+        if libc is None:
+            raise OSError("inotify is not available on this platform")
+        self._libc = libc
+        self.on_change = on_change
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.log = log or (lambda message, level: None)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.roots = {}
+        self.watches = {}
+        self.pending = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.thread = None
+
+    def watch(self, key, root, exclusions=None):
+        """Adds recursive watches under root. Returns False if the kernel watch limit was hit."""
+        self.roots[key] = (os.path.abspath(root), matcher_for(exclusions))
+        return self._add_tree(key, "")
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True, name="fs-watcher")
+        self.thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self.thread:
+            self.thread.join(timeout=2)
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+    def _add_tree(self, key, rel_dir):
+        root, matcher = self.roots[key]
+        stack = [rel_dir]
+        while stack:
+            rel = stack.pop()
+            path = os.path.join(root, *rel.split('/')) if rel else root
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC:
+                    self.log("inotify watch limit reached (fs.inotify.max_user_watches); "
+                             "changes in some folders will only be picked up by the interval sweep.", "WARNING")
+                    return False
+                continue
+            self.watches[wd] = (key, rel)
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        child = f"{rel}/{entry.name}" if rel else entry.name
+                        if entry.is_dir(follow_symlinks=False) and not matcher.excluded(entry.name, child, True):
+                            stack.append(child)
+            except OSError:
+                continue
+        return True
+
+    def _record(self, key, rel_path):
+        now = time.monotonic()
+        with self._lock:
+            first, _, paths = self.pending.get(key, (now, now, set()))
+            if paths is not None and rel_path is not None:
+                paths.add(rel_path)
+                if len(paths) > MAX_PATHS_PER_PAIR: paths = None
+            elif rel_path is None:
+                paths = None
+            self.pending[key] = (first, now, paths)
+
+    def _flush_due(self):
+        now = time.monotonic()
+        due = []
+        with self._lock:
+            for key, (first, last, paths) in list(self.pending.items()):
+                if now - last >= self.debounce or now - first >= self.max_delay:
+                    due.append((key, paths))
+                    del self.pending[key]
+        for key, paths in due:
+            try:
+                self.on_change(key, paths)
+            except Exception as e:
+                self.log(f"Watcher callback failed: {e}", "ERROR")
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                readable, _, _ = select.select([self.fd], [], [], min(0.25, self.debounce))
+            except (OSError, ValueError):
+                break
+            if readable:
+                try:
+                    data = os.read(self.fd, 64 * 1024)
+                except BlockingIOError:
+                    data = b""
+                except OSError:
+                    break
+                self._handle(data)
+            self._flush_due()
+
+    def _handle(self, data):
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size: offset + _EVENT.size + length].split(b'\0', 1)[0]
+            offset += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                for key in self.roots:
+                    self._record(key, None)
+                continue
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            if wd not in self.watches: continue
+            key, rel_dir = self.watches[wd]
+            if not name:
+                if rel_dir: self._record(key, rel_dir)
+                continue
+            name = os.fsdecode(name)
+            rel_path = f"{rel_dir}/{name}" if rel_dir else name
+            _, matcher = self.roots[key]
+            is_dir = bool(mask & IN_ISDIR)
+            if matcher.excluded(name, rel_path, is_dir): continue
+            if is_dir and mask & (IN_CREATE | IN_MOVED_TO):
+                self._add_tree(key, rel_path)
+            self._record(key, rel_path)
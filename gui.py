@@ -2,24 +2,62 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import ttkbootstrap as ttk_bs
 from ttkbootstrap.constants import *
-from ttkbootstrap.tooltip import ToolTip
 import json
 import os
 import queue
 import time
-from sync_manager import SyncManager
+import threading
+from sync_manager import SyncManager, DEFAULT_MAX_WORKERS, DEFAULT_MAX_PER_DEVICE
+from log_buffer import LogBuffer, LEVEL_RANK
+from run_history import summarize, SUMMARY_WINDOW, TREND_RUNS
 from pathlib import Path
 import shutil
 import copy
+from config_store import ConfigStore, new_pair_id
+from autotune import apply_tuning
+
+TOOL_MODES = {"robocopy": ["MIR", "E-Copy"], "rclone": ["sync", "copy"], "rsync": ["MIR", "copy"], "native": ["MIR", "E-Copy"]}
+POLL_MIN_MS = 50
+POLL_MAX_MS = 1000
+POLL_MESSAGE_BUDGET = 500
+POLL_TIME_BUDGET = 0.03
+# Edits within this window are written to config.json together.
+SAVE_DELAY_MS = 1000
+# Time from process start to an idle, drawn window; slower starts are logged as warnings.
+STARTUP_BUDGET_SECONDS = 0.8
+# Throughput trends below this are highlighted in the Performance tab.
+REGRESSION_THRESHOLD = -0.25
+TOOL_OPTION_DEFAULTS = {'threads': 16, 'retries': 3, 'wait': 5, 'checkers': 16, 'transfers': 8, 'multi_thread_streams': 4, 'workers': 8,
+                        'transfer_mode': 'auto', 'compress_level': 0, 'inplace': False, 'compare': 'mtime', 'use_rcd': False}
+
+def tooltip(widget, text):
+    """Attaches a ToolTip that is only created on first hover; building dozens up front slows startup."""
+    def create(event):
+        from ttkbootstrap.tooltip import ToolTip
+        # ToolTip rebinds <Enter>, which replaces this handler.
+        ToolTip(widget, text, bootstyle="info").enter(event)
+    widget.bind("<Enter>", create, add="+")
 
 class SyncApp:
-    def __init__(self, root):
+    def __init__(self, root, started=None):
         self.root = root
+        self.started = started or time.perf_counter()
+        self.config_loaded = False
         self.config_file = "config.json"
         self.pairs = []
         self.message_queue = queue.Queue()
-        self.sync_manager = SyncManager(self.message_queue)
+        self.sync_manager = SyncManager(self.message_queue, os.path.dirname(os.path.abspath(self.config_file)))
         self.selected_pair_index = None
+        self.config_store = ConfigStore(self.config_file, self.log_message)
+        self.pair_status = {}
+        self.pair_progress = {}
+        self.pair_index = {}
+        self._save_pending = False
+        self.poll_interval = POLL_MIN_MS
+        self.bandwidth_schedule = []
+        self.metrics_exporter = None
+        self.loaded_config = {}
+        self.log_buffer = LogBuffer(spill_path=os.path.join(os.path.dirname(os.path.abspath(self.config_file)), "directorysync.log"))
         
         self.detail_widgets = {}
         self.detail_vars = {}
@@ -33,6 +71,15 @@ class SyncApp:
         self.load_config()
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         self.poll_messages()
+        self.root.after_idle(self.report_startup)
+
+    def _since_start(self):
+        return f"{(time.perf_counter() - self.started) * 1000:.0f} ms after start"
+
+    def report_startup(self):
+        elapsed = time.perf_counter() - self.started
+        level = "WARNING" if elapsed > STARTUP_BUDGET_SECONDS else "INFO"
+        self.log_message(f"Window ready {self._since_start()} (budget {STARTUP_BUDGET_SECONDS * 1000:.0f} ms).", level)
 
     def create_gui(self):
         self.style.theme_use(self.current_theme)
@@ -56,7 +103,10 @@ class SyncApp:
         paned_window.add(detail_container, weight=3)
         
         self.create_detail_widgets(detail_container)
-        self.create_log_section(main_frame)
+        self.bottom_notebook = ttk_bs.Notebook(main_frame)
+        self.bottom_notebook.pack(fill=BOTH, expand=True, pady=(10, 0))
+        self.create_log_section(self.bottom_notebook)
+        self.create_performance_section(self.bottom_notebook)
         self.create_context_menu()
         
         self.set_detail_widgets_state(tk.DISABLED)
@@ -87,7 +137,9 @@ class SyncApp:
     def create_basic_settings_widgets(self, parent):
         self.detail_vars.update({
             'enabled': tk.BooleanVar(), 'source': tk.StringVar(), 'destination': tk.StringVar(),
-            'tool': tk.StringVar(), 'mode': tk.StringVar()
+            'tool': tk.StringVar(), 'mode': tk.StringVar(), 'incremental': tk.BooleanVar(),
+            'auto_tune': tk.BooleanVar(), 'shards': tk.IntVar(), 'detect_renames': tk.BooleanVar(),
+            'priority': tk.IntVar(), 'interval': tk.StringVar(), 'max_staleness': tk.StringVar()
         })
         self.detail_widgets['enabled_check'] = ttk_bs.Checkbutton(parent, text="Enabled", variable=self.detail_vars['enabled'], command=self._auto_commit_details)
         self.detail_widgets['enabled_check'].grid(row=0, column=0, columnspan=3, sticky=W, pady=(0, 10))
@@ -104,12 +156,41 @@ class SyncApp:
         self.detail_widgets['dest_browse'] = ttk_bs.Button(parent, text="Browse", command=lambda: self.browse_directory(self.detail_vars['destination']), bootstyle=OUTLINE)
         self.detail_widgets['dest_browse'].grid(row=2, column=2, padx=(5, 0), pady=(5, 0))
         ttk_bs.Label(parent, text="Tool:").grid(row=3, column=0, sticky=W, padx=(0, 5), pady=(5, 0))
-        self.detail_widgets['tool_combo'] = ttk_bs.Combobox(parent, textvariable=self.detail_vars['tool'], values=["robocopy", "rclone"], state="readonly", width=15)
+        self.detail_widgets['tool_combo'] = ttk_bs.Combobox(parent, textvariable=self.detail_vars['tool'], values=list(TOOL_MODES), state="readonly", width=15)
         self.detail_widgets['tool_combo'].grid(row=3, column=1, sticky=W, pady=(5, 0))
         ttk_bs.Label(parent, text="Mode:").grid(row=4, column=0, sticky=W, padx=(0, 5), pady=(5, 0))
         self.detail_widgets['mode_combo'] = ttk_bs.Combobox(parent, textvariable=self.detail_vars['mode'], state="readonly", width=15)
         self.detail_widgets['mode_combo'].grid(row=4, column=1, sticky=W, pady=(5, 0))
         self.detail_widgets['mode_combo'].bind("<<ComboboxSelected>>", self._auto_commit_details)
+        self.detail_widgets['incremental_check'] = ttk_bs.Checkbutton(parent, text="Incremental (skip unchanged sources)", variable=self.detail_vars['incremental'], command=self._auto_commit_details)
+        self.detail_widgets['incremental_check'].grid(row=5, column=1, sticky=W, pady=(5, 0))
+        tooltip(self.detail_widgets['incremental_check'], "Keep an index of the local source and only run the tool on changed subtrees. A full sync still runs once a day.")
+        self.detail_widgets['auto_tune_check'] = ttk_bs.Checkbutton(parent, text="Auto-tune performance options", variable=self.detail_vars['auto_tune'], command=self._auto_commit_details)
+        self.detail_widgets['auto_tune_check'].grid(row=6, column=1, sticky=W, pady=(5, 0))
+        tooltip(self.detail_widgets['auto_tune_check'], "Measure throughput on each run and step threads/checkers/transfers/workers towards the fastest setting.")
+        ttk_bs.Label(parent, text="Shards:").grid(row=7, column=0, sticky=W, padx=(0, 5), pady=(5, 0))
+        self.detail_widgets['shards_combo'] = ttk_bs.Combobox(parent, textvariable=self.detail_vars['shards'], values=[1, 2, 4, 8, 16], state="readonly", width=5)
+        self.detail_widgets['shards_combo'].grid(row=7, column=1, sticky=W, pady=(5, 0))
+        self.detail_widgets['shards_combo'].bind("<<ComboboxSelected>>", self._auto_commit_details)
+        self.detail_widgets['detect_renames_check'] = ttk_bs.Checkbutton(parent, text="Detect renamed/moved files", variable=self.detail_vars['detect_renames'], command=self._auto_commit_details)
+        self.detail_widgets['detect_renames_check'].grid(row=8, column=1, sticky=W, pady=(5, 0))
+        tooltip(self.detail_widgets['detect_renames_check'], "Mirror modes only. Files that were just renamed or moved are moved at the destination instead of deleted and copied again (content hashes are cached). rclone uses --track-renames.")
+        ttk_bs.Label(parent, text="Priority:").grid(row=9, column=0, sticky=W, padx=(0, 5), pady=(5, 0))
+        self.detail_widgets['priority_spin'] = ttk_bs.Spinbox(parent, from_=1, to=10, textvariable=self.detail_vars['priority'], width=5, command=self._auto_commit_details)
+        self.detail_widgets['priority_spin'].grid(row=9, column=1, sticky=W, pady=(5, 0))
+        self.detail_widgets['priority_spin'].bind("<FocusOut>", self._auto_commit_details)
+        tooltip(parent.grid_slaves(row=9, column=0)[0], "Pairs with a higher priority are started first when several are due, and get a larger share of the bandwidth limit (2 gets twice the share of 1).")
+        ttk_bs.Label(parent, text="Interval (s):").grid(row=10, column=0, sticky=W, padx=(0, 5), pady=(5, 0))
+        self.detail_widgets['pair_interval_entry'] = ttk_bs.Entry(parent, textvariable=self.detail_vars['interval'], width=8)
+        self.detail_widgets['pair_interval_entry'].grid(row=10, column=1, sticky=W, pady=(5, 0))
+        self.detail_widgets['pair_interval_entry'].bind("<FocusOut>", self._auto_commit_details)
+        tooltip(self.detail_widgets['pair_interval_entry'], "Seconds between syncs of this pair. Leave empty to use the global interval.")
+        ttk_bs.Label(parent, text="Max staleness (s):").grid(row=11, column=0, sticky=W, padx=(0, 5), pady=(5, 0))
+        self.detail_widgets['max_staleness_entry'] = ttk_bs.Entry(parent, textvariable=self.detail_vars['max_staleness'], width=8)
+        self.detail_widgets['max_staleness_entry'].grid(row=11, column=1, sticky=W, pady=(5, 0))
+        self.detail_widgets['max_staleness_entry'].bind("<FocusOut>", self._auto_commit_details)
+        tooltip(self.detail_widgets['max_staleness_entry'], "Warn and move this pair to the front of the queue when it has not synced successfully for this long. Failing pairs back off, but are retried in time for this deadline. Leave empty for none.")
+        tooltip(parent.grid_slaves(row=7, column=0)[0], "Split a local source into this many groups of top-level folders, each synced by its own tool process (1 = off). Groups are balanced using file counts from the previous run.")
         parent.grid_columnconfigure(1, weight=1)
 
     def create_exclusions_widgets(self, parent):
@@ -118,11 +199,11 @@ class SyncApp:
         ttk_bs.Label(exclusions_header, text="Exclusions").pack(side=LEFT)
         help_label = ttk_bs.Label(exclusions_header, text=" ( ?)", bootstyle="info")
         help_label.pack(side=LEFT, padx=(5,0))
-        ToolTip(help_label, text=r"""Exclusion Rules:
+        tooltip(help_label, r"""Exclusion Rules:
 - One pattern per line.
 - Directories: End with a slash (e.g., build/, node_modules\).
 - Wildcard Files: Use * (e.g., *.log, *.tmp).
-- Rules are adapted for robocopy and rclone.""", bootstyle="info")
+- Rules are adapted for robocopy, rclone, rsync and the native engine.""")
         
         exclusions_frame = ttk_bs.Frame(parent)
         exclusions_frame.pack(fill=BOTH, expand=True)
@@ -134,43 +215,89 @@ class SyncApp:
         self.set_exclusions_placeholder()
 
     def create_advanced_options_widgets(self, parent):
-        self.robocopy_options_frame = ttk_bs.LabelFrame(parent, text="Advanced Robocopy Options", padding=10)
-        self.detail_vars.update({'threads': tk.IntVar(), 'retries': tk.IntVar(), 'wait': tk.IntVar()})
+        # Only the variables are needed up front; a tool's option frame is built the first time that tool is shown.
+        self.advanced_options_parent = parent
+        self.detail_vars.update({'threads': tk.IntVar(), 'retries': tk.IntVar(), 'wait': tk.IntVar(),
+                                 'checkers': tk.IntVar(), 'transfers': tk.IntVar(), 'multi_thread_streams': tk.IntVar(), 'use_rcd': tk.BooleanVar(),
+                                 'workers': tk.IntVar(), 'transfer_mode': tk.StringVar(), 'compress_level': tk.IntVar(),
+                                 'inplace': tk.BooleanVar(), 'compare': tk.StringVar()})
+        self.tool_options_frames = {}
+        self.tool_options_builders = {'robocopy': self.create_robocopy_options, 'rclone': self.create_rclone_options,
+                                      'rsync': self.create_rsync_options, 'native': self.create_native_options}
+
+    def create_robocopy_options(self, parent):
+        frame = ttk_bs.LabelFrame(parent, text="Advanced Robocopy Options", padding=10)
         robocopy_values = {'threads': [1, 2, 4, 8, 12, 16, 24, 32, 64, 128], 'retries': [0, 1, 2, 3, 5, 10], 'wait': [1, 3, 5, 10, 15, 30, 60]}
-        ttk_bs.Label(self.robocopy_options_frame, text="Threads:").grid(row=0, column=0, sticky=W, padx=5)
-        self.detail_widgets['threads_combo'] = ttk_bs.Combobox(self.robocopy_options_frame, textvariable=self.detail_vars['threads'], width=5, state="readonly", values=robocopy_values['threads'])
+        ttk_bs.Label(frame, text="Threads:").grid(row=0, column=0, sticky=W, padx=5)
+        self.detail_widgets['threads_combo'] = ttk_bs.Combobox(frame, textvariable=self.detail_vars['threads'], width=5, state="readonly", values=robocopy_values['threads'])
         self.detail_widgets['threads_combo'].grid(row=0, column=1, sticky=W)
         self.detail_widgets['threads_combo'].bind("<<ComboboxSelected>>", self._auto_commit_details)
-        ToolTip(self.robocopy_options_frame.grid_slaves(row=0, column=0)[0], "Number of threads to use (/MT)", bootstyle="info")
-        ttk_bs.Label(self.robocopy_options_frame, text="Retries:").grid(row=0, column=2, sticky=W, padx=5)
-        self.detail_widgets['retries_combo'] = ttk_bs.Combobox(self.robocopy_options_frame, textvariable=self.detail_vars['retries'], width=5, state="readonly", values=robocopy_values['retries'])
+        tooltip(frame.grid_slaves(row=0, column=0)[0], "Number of threads to use (/MT)")
+        ttk_bs.Label(frame, text="Retries:").grid(row=0, column=2, sticky=W, padx=5)
+        self.detail_widgets['retries_combo'] = ttk_bs.Combobox(frame, textvariable=self.detail_vars['retries'], width=5, state="readonly", values=robocopy_values['retries'])
         self.detail_widgets['retries_combo'].grid(row=0, column=3, sticky=W)
         self.detail_widgets['retries_combo'].bind("<<ComboboxSelected>>", self._auto_commit_details)
-        ToolTip(self.robocopy_options_frame.grid_slaves(row=0, column=2)[0], "Retries on failed copies (/R)", bootstyle="info")
-        ttk_bs.Label(self.robocopy_options_frame, text="Wait (s):").grid(row=0, column=4, sticky=W, padx=5)
-        self.detail_widgets['wait_combo'] = ttk_bs.Combobox(self.robocopy_options_frame, textvariable=self.detail_vars['wait'], width=5, state="readonly", values=robocopy_values['wait'])
+        tooltip(frame.grid_slaves(row=0, column=2)[0], "Retries on failed copies (/R)")
+        ttk_bs.Label(frame, text="Wait (s):").grid(row=0, column=4, sticky=W, padx=5)
+        self.detail_widgets['wait_combo'] = ttk_bs.Combobox(frame, textvariable=self.detail_vars['wait'], width=5, state="readonly", values=robocopy_values['wait'])
         self.detail_widgets['wait_combo'].grid(row=0, column=5, sticky=W)
         self.detail_widgets['wait_combo'].bind("<<ComboboxSelected>>", self._auto_commit_details)
-        ToolTip(self.robocopy_options_frame.grid_slaves(row=0, column=4)[0], "Wait time between retries in seconds (/W)", bootstyle="info")
+        tooltip(frame.grid_slaves(row=0, column=4)[0], "Wait time between retries in seconds (/W)")
+        return frame
 
-        self.rclone_options_frame = ttk_bs.LabelFrame(parent, text="Advanced Rclone Options", padding=10)
-        self.detail_vars.update({'checkers': tk.IntVar(), 'transfers': tk.IntVar(), 'multi_thread_streams': tk.IntVar()})
+    def create_rclone_options(self, parent):
+        frame = ttk_bs.LabelFrame(parent, text="Advanced Rclone Options", padding=10)
         rclone_values = {'checkers': [4, 8, 16, 32, 64], 'transfers': [2, 4, 8, 16, 32], 'multi_thread_streams': [0, 1, 2, 4, 8, 16]}
-        ttk_bs.Label(self.rclone_options_frame, text="Checkers:").grid(row=0, column=0, sticky=W, padx=5)
-        self.detail_widgets['checkers_combo'] = ttk_bs.Combobox(self.rclone_options_frame, textvariable=self.detail_vars['checkers'], width=5, state="readonly", values=rclone_values['checkers'])
+        ttk_bs.Label(frame, text="Checkers:").grid(row=0, column=0, sticky=W, padx=5)
+        self.detail_widgets['checkers_combo'] = ttk_bs.Combobox(frame, textvariable=self.detail_vars['checkers'], width=5, state="readonly", values=rclone_values['checkers'])
         self.detail_widgets['checkers_combo'].grid(row=0, column=1, sticky=W)
         self.detail_widgets['checkers_combo'].bind("<<ComboboxSelected>>", self._auto_commit_details)
-        ToolTip(self.rclone_options_frame.grid_slaves(row=0, column=0)[0], "Number of parallel checkers", bootstyle="info")
-        ttk_bs.Label(self.rclone_options_frame, text="Transfers:").grid(row=0, column=2, sticky=W, padx=5)
-        self.detail_widgets['transfers_combo'] = ttk_bs.Combobox(self.rclone_options_frame, textvariable=self.detail_vars['transfers'], width=5, state="readonly", values=rclone_values['transfers'])
+        tooltip(frame.grid_slaves(row=0, column=0)[0], "Number of parallel checkers")
+        ttk_bs.Label(frame, text="Transfers:").grid(row=0, column=2, sticky=W, padx=5)
+        self.detail_widgets['transfers_combo'] = ttk_bs.Combobox(frame, textvariable=self.detail_vars['transfers'], width=5, state="readonly", values=rclone_values['transfers'])
         self.detail_widgets['transfers_combo'].grid(row=0, column=3, sticky=W)
         self.detail_widgets['transfers_combo'].bind("<<ComboboxSelected>>", self._auto_commit_details)
-        ToolTip(self.rclone_options_frame.grid_slaves(row=0, column=2)[0], "Number of parallel transfers", bootstyle="info")
-        ttk_bs.Label(self.rclone_options_frame, text="Streams:").grid(row=0, column=4, sticky=W, padx=5)
-        self.detail_widgets['multi_thread_streams_combo'] = ttk_bs.Combobox(self.rclone_options_frame, textvariable=self.detail_vars['multi_thread_streams'], width=5, state="readonly", values=rclone_values['multi_thread_streams'])
+        tooltip(frame.grid_slaves(row=0, column=2)[0], "Number of parallel transfers")
+        ttk_bs.Label(frame, text="Streams:").grid(row=0, column=4, sticky=W, padx=5)
+        self.detail_widgets['multi_thread_streams_combo'] = ttk_bs.Combobox(frame, textvariable=self.detail_vars['multi_thread_streams'], width=5, state="readonly", values=rclone_values['multi_thread_streams'])
         self.detail_widgets['multi_thread_streams_combo'].grid(row=0, column=5, sticky=W)
         self.detail_widgets['multi_thread_streams_combo'].bind("<<ComboboxSelected>>", self._auto_commit_details)
-        ToolTip(self.rclone_options_frame.grid_slaves(row=0, column=4)[0], "Multi-thread streams per transfer (0 to disable)", bootstyle="info")
+        tooltip(frame.grid_slaves(row=0, column=4)[0], "Multi-thread streams per transfer (0 to disable)")
+        self.detail_widgets['use_rcd_check'] = ttk_bs.Checkbutton(frame, text="Persistent daemon", variable=self.detail_vars['use_rcd'], command=self._auto_commit_details)
+        self.detail_widgets['use_rcd_check'].grid(row=0, column=6, sticky=W, padx=(10, 0))
+        tooltip(self.detail_widgets['use_rcd_check'], "Run this pair as a job of one shared 'rclone rcd' instead of a new rclone process per run. Connections, directory caches and auth tokens are reused between runs. Pairs with a bandwidth share still get their own process.")
+        return frame
+
+    def create_rsync_options(self, parent):
+        frame = ttk_bs.LabelFrame(parent, text="Advanced Rsync Options", padding=10)
+        ttk_bs.Label(frame, text="Transfer:").grid(row=0, column=0, sticky=W, padx=5)
+        self.detail_widgets['transfer_mode_combo'] = ttk_bs.Combobox(frame, textvariable=self.detail_vars['transfer_mode'], width=7, state="readonly", values=["auto", "whole", "delta"])
+        self.detail_widgets['transfer_mode_combo'].grid(row=0, column=1, sticky=W)
+        self.detail_widgets['transfer_mode_combo'].bind("<<ComboboxSelected>>", self._auto_commit_details)
+        tooltip(frame.grid_slaves(row=0, column=0)[0], "whole: always send whole files (--whole-file)\ndelta: send only changed blocks, even locally (--no-whole-file)\nauto: rsync's default")
+        ttk_bs.Label(frame, text="Compression:").grid(row=0, column=2, sticky=W, padx=5)
+        self.detail_widgets['compress_level_combo'] = ttk_bs.Combobox(frame, textvariable=self.detail_vars['compress_level'], width=5, state="readonly", values=list(range(10)))
+        self.detail_widgets['compress_level_combo'].grid(row=0, column=3, sticky=W)
+        self.detail_widgets['compress_level_combo'].bind("<<ComboboxSelected>>", self._auto_commit_details)
+        tooltip(frame.grid_slaves(row=0, column=2)[0], "Compression level for network transfers (0 to disable, -z)")
+        ttk_bs.Label(frame, text="Compare:").grid(row=0, column=4, sticky=W, padx=5)
+        self.detail_widgets['compare_combo'] = ttk_bs.Combobox(frame, textvariable=self.detail_vars['compare'], width=9, state="readonly", values=["mtime", "checksum"])
+        self.detail_widgets['compare_combo'].grid(row=0, column=5, sticky=W)
+        self.detail_widgets['compare_combo'].bind("<<ComboboxSelected>>", self._auto_commit_details)
+        tooltip(frame.grid_slaves(row=0, column=4)[0], "mtime: compare size and modification time (fast)\nchecksum: compare file contents (--checksum, reads everything)")
+        self.detail_widgets['inplace_check'] = ttk_bs.Checkbutton(frame, text="In-place", variable=self.detail_vars['inplace'], command=self._auto_commit_details)
+        self.detail_widgets['inplace_check'].grid(row=0, column=6, sticky=W, padx=(10, 0))
+        tooltip(self.detail_widgets['inplace_check'], "Update destination files in place instead of via a temp copy (--inplace). Good for large, mostly-unchanged files such as VM images.")
+        return frame
+
+    def create_native_options(self, parent):
+        frame = ttk_bs.LabelFrame(parent, text="Advanced Native Options", padding=10)
+        ttk_bs.Label(frame, text="Workers:").grid(row=0, column=0, sticky=W, padx=5)
+        self.detail_widgets['workers_combo'] = ttk_bs.Combobox(frame, textvariable=self.detail_vars['workers'], width=5, state="readonly", values=[1, 2, 4, 8, 16, 32])
+        self.detail_widgets['workers_combo'].grid(row=0, column=1, sticky=W)
+        self.detail_widgets['workers_combo'].bind("<<ComboboxSelected>>", self._auto_commit_details)
+        tooltip(frame.grid_slaves(row=0, column=0)[0], "Number of files copied in parallel")
+        return frame
 
     def on_tool_change(self, *args):
         if self._is_updating_vars: return
@@ -184,10 +311,11 @@ class SyncApp:
 
         try:
             pair = self.pairs[self.selected_pair_index]
+            before = copy.deepcopy(pair)
             
             # Update basic info from vars
             for key, var in self.detail_vars.items():
-                is_opt = key in ['threads', 'retries', 'wait', 'checkers', 'transfers', 'multi_thread_streams']
+                is_opt = key in TOOL_OPTION_DEFAULTS
                 try:
                     value = var.get()
                     if is_opt:
@@ -203,6 +331,8 @@ class SyncApp:
                 pair['exclusions'] = []
             else:
                 pair['exclusions'] = [line.strip() for line in exclusions_text.split('\n') if line.strip()]
+            # A plan made before the edit no longer describes what a run would do.
+            if pair != before: self.sync_manager.discard_plan_scan(pair)
             
             # After committing, update the listbox entry to reflect any name change
             self.update_listbox_entry(self.selected_pair_index, select_it=False)
@@ -210,15 +340,12 @@ class SyncApp:
 
     def toggle_advanced_options(self):
         tool = self.detail_vars['tool'].get()
-        if tool == 'robocopy':
-            self.rclone_options_frame.pack_forget()
-            self.robocopy_options_frame.pack(fill=X, expand=True)
-        elif tool == 'rclone':
-            self.robocopy_options_frame.pack_forget()
-            self.rclone_options_frame.pack(fill=X, expand=True)
-        else:
-            self.robocopy_options_frame.pack_forget()
-            self.rclone_options_frame.pack_forget()
+        if tool in self.tool_options_builders and tool not in self.tool_options_frames:
+            self.tool_options_frames[tool] = self.tool_options_builders[tool](self.advanced_options_parent)
+        for name, frame in self.tool_options_frames.items():
+            if name != tool: frame.pack_forget()
+        if tool in self.tool_options_frames:
+            self.tool_options_frames[tool].pack(fill=X, expand=True)
 
     def display_pair_details(self):
         if self.selected_pair_index is None: return
@@ -230,13 +357,19 @@ class SyncApp:
             self.detail_vars['enabled'].set(pair.get("enabled", True))
             self.detail_vars['source'].set(pair.get("source", ""))
             self.detail_vars['destination'].set(pair.get("destination", ""))
+            self.detail_vars['incremental'].set(pair.get("incremental", False))
+            self.detail_vars['auto_tune'].set(pair.get("auto_tune", False))
+            self.detail_vars['shards'].set(pair.get("shards", 1))
+            self.detail_vars['detect_renames'].set(pair.get("detect_renames", False))
+            self.detail_vars['priority'].set(pair.get("priority", 1))
+            self.detail_vars['interval'].set(pair.get("interval", ""))
+            self.detail_vars['max_staleness'].set(pair.get("max_staleness", ""))
             self.detail_vars['tool'].set(pair.get("tool", "robocopy"))
             
             self.update_mode_options()
             self.detail_vars['mode'].set(pair.get("mode", "MIR"))
             
-            defaults = {'threads': 16, 'retries': 3, 'wait': 5, 'checkers': 16, 'transfers': 8, 'multi_thread_streams': 4}
-            for key, default_val in defaults.items():
+            for key, default_val in TOOL_OPTION_DEFAULTS.items():
                 self.detail_vars[key].set(opts.get(key, default_val))
 
             exclusions = pair.get("exclusions", [])
@@ -254,12 +387,13 @@ class SyncApp:
 
     def add_pair(self):
         self.commit_ui_to_data()
-        new_pair = {"source": "New Pair", "destination": "", "tool": "robocopy", "mode": "MIR", "enabled": True, "status": "Idle", "exclusions": [], "tool_options": {}}
+        new_pair = {"id": new_pair_id(), "source": "New Pair", "destination": "", "tool": "robocopy", "mode": "MIR", "enabled": True, "exclusions": [], "tool_options": {}}
         self.pairs.append(new_pair)
+        self.rebuild_pair_index()
         new_index = len(self.pairs) - 1
         self.update_listbox_entry(new_index, select_it=True)
         self.on_pair_select(None)
-        self.save_config_to_file()
+        self.request_save()
         self.log_message("Added a new sync pair.", "INFO")
 
     def remove_selected_pair(self):
@@ -269,6 +403,7 @@ class SyncApp:
         
         current_index = self.selected_pair_index
         self.pairs.pop(current_index)
+        self.rebuild_pair_index()
         self.pair_listbox.delete(current_index)
         
         self.selected_pair_index = None
@@ -282,7 +417,7 @@ class SyncApp:
         finally:
             self._is_updating_vars = False
             
-        self.save_config_to_file()
+        self.request_save()
         self.log_message("Removed a sync pair.", "INFO")
 
     def set_exclusions_placeholder(self, force=False):
@@ -300,19 +435,106 @@ class SyncApp:
     def on_exclusions_focus_out(self, event=None):
         self.set_exclusions_placeholder()
 
-    def create_log_section(self, parent):
-        log_frame = ttk_bs.LabelFrame(parent, text="Logs", padding=10)
-        log_frame.pack(fill=BOTH, expand=True, pady=(10, 0))
+    def create_log_section(self, notebook):
+        log_frame = ttk_bs.Frame(notebook, padding=10)
+        notebook.add(log_frame, text="Logs")
+        log_header = ttk_bs.Frame(log_frame)
+        log_header.pack(fill=X, pady=(0, 5))
+        ttk_bs.Label(log_header, text="Show:").pack(side=LEFT, padx=(0, 5))
+        self.log_level_var = tk.StringVar(value="INFO")
+        level_combo = ttk_bs.Combobox(log_header, textvariable=self.log_level_var, values=list(LEVEL_RANK), state="readonly", width=10)
+        level_combo.pack(side=LEFT)
+        level_combo.bind("<<ComboboxSelected>>", self.refresh_log_view)
+        tooltip(level_combo, f"Minimum level shown. The view keeps the last {self.log_buffer.max_lines} messages; the full history is in directorysync.log.")
         self.log_text = scrolledtext.ScrolledText(log_frame, height=10, wrap=tk.WORD, font=("Consolas", 9), state=tk.DISABLED)
         self.log_text.pack(fill=BOTH, expand=True)
         self.log_text.tag_config("INFO", foreground=self.style.colors.fg)
         self.log_text.tag_config("SUCCESS", foreground=self.style.colors.success)
         self.log_text.tag_config("ERROR", foreground=self.style.colors.danger)
         self.log_text.tag_config("WARNING", foreground=self.style.colors.warning)
-        
+
+    def create_performance_section(self, notebook):
+        # The tab's contents are built the first time it is opened.
+        self.performance_frame = ttk_bs.Frame(notebook, padding=10)
+        notebook.add(self.performance_frame, text="Performance")
+        self.perf_tree = None
+        notebook.bind("<<NotebookTabChanged>>", lambda e: self.performance_visible() and self.refresh_performance_view())
+
+    def build_performance_view(self):
+        header = ttk_bs.Frame(self.performance_frame)
+        header.pack(fill=X, pady=(0, 5))
+        ttk_bs.Label(header, text=f"Last {SUMMARY_WINDOW} runs per pair. Select a pair to see its runs.").pack(side=LEFT)
+        ttk_bs.Button(header, text="Refresh", command=self.refresh_performance_view, bootstyle=OUTLINE).pack(side=RIGHT)
+        columns = {"runs": ("Runs", 50), "success": ("OK %", 50), "p50": ("p50", 70), "p95": ("p95", 70),
+                   "speed": ("Median MB/s", 90), "trend": ("Trend", 70), "last": ("Last run", 130)}
+        self.perf_tree = ttk_bs.Treeview(self.performance_frame, columns=list(columns), height=4)
+        self.perf_tree.heading("#0", text="Pair")
+        self.perf_tree.column("#0", width=200)
+        for key, (title, width) in columns.items():
+            self.perf_tree.heading(key, text=title)
+            self.perf_tree.column(key, width=width, anchor=E)
+        self.perf_tree.tag_configure("regression", foreground=self.style.colors.danger)
+        self.perf_tree.pack(fill=X)
+        self.perf_tree.bind("<<TreeviewSelect>>", self.show_pair_runs)
+        tooltip(self.perf_tree, f"p50/p95: run durations. Trend: median throughput of the last {TREND_RUNS} runs against the runs before them.")
+        run_columns = {"started": ("Started", 130), "duration": ("Duration", 70), "result": ("Result", 70), "copied": ("Copied", 60),
+                       "data": ("MB", 70), "speed": ("MB/s", 70), "settings": ("Settings", 250)}
+        self.runs_tree = ttk_bs.Treeview(self.performance_frame, columns=list(run_columns), show="headings", height=5)
+        for key, (title, width) in run_columns.items():
+            self.runs_tree.heading(key, text=title)
+            self.runs_tree.column(key, width=width, anchor=W if key == "settings" else E)
+        self.runs_tree.pack(fill=BOTH, expand=True, pady=(5, 0))
+        self.perf_pairs = {}
+
+    def performance_visible(self):
+        return self.bottom_notebook.select() == str(self.performance_frame)
+
+    def refresh_performance_view(self):
+        if self.perf_tree is None: self.build_performance_view()
+        selected = self.perf_tree.selection()
+        self.perf_tree.delete(*self.perf_tree.get_children())
+        self.perf_pairs = {}
+        for i, pair in enumerate(self.pairs):
+            try:
+                stats = summarize(self.sync_manager.history_store.recent(pair))
+            except Exception as e:
+                self.log_message(f"Could not read run history: {e}", "WARNING")
+                return
+            if not stats["runs"]: continue
+            trend = stats["throughput_trend"]
+            values = (stats["runs"], f"{100 * stats['success_rate']:.0f}", self._format_seconds(stats["p50"]), self._format_seconds(stats["p95"]),
+                      f"{stats['median_bps'] / 1048576:.1f}" if stats["median_bps"] else "-", f"{100 * trend:+.0f}%" if trend is not None else "-",
+                      time.strftime("%Y-%m-%d %H:%M", time.localtime(stats["last_started"])) + ("" if stats["last_success"] else " (failed)"))
+            iid = str(i)
+            self.perf_pairs[iid] = pair
+            self.perf_tree.insert("", tk.END, iid=iid, text=os.path.basename(pair.get('source') or ''), values=values,
+                                  tags=("regression",) if trend is not None and trend < REGRESSION_THRESHOLD else ())
+        selected = [iid for iid in selected if iid in self.perf_pairs]
+        if selected: self.perf_tree.selection_set(selected)
+        else: self.runs_tree.delete(*self.runs_tree.get_children())
+
+    def show_pair_runs(self, event=None):
+        self.runs_tree.delete(*self.runs_tree.get_children())
+        selection = self.perf_tree.selection()
+        if not selection or selection[0] not in self.perf_pairs: return
+        for run in self.sync_manager.history_store.recent(self.perf_pairs[selection[0]], limit=100):
+            duration = run["finished"] - run["started"] if run["finished"] else None
+            options = ", ".join(f"{k}={v}" for k, v in sorted(json.loads(run["options"] or "{}").items()))
+            result = "OK" if run["success"] else f"Failed ({run['exit_code']})" if run["exit_code"] is not None else "Failed"
+            self.runs_tree.insert("", tk.END, values=(time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run["started"])), self._format_seconds(duration),
+                                                      result, run["files_copied"], f"{run['bytes_transferred'] / 1048576:.1f}",
+                                                      f"{run['speed_bps'] / 1048576:.1f}", options))
+
+    @staticmethod
+    def _format_seconds(seconds):
+        if seconds is None: return "-"
+        return f"{seconds:.1f}s" if seconds < 120 else f"{seconds / 60:.1f}m"
+
     def create_context_menu(self):
         self.context_menu = tk.Menu(self.root, tearoff=0)
         self.context_menu.add_command(label="Sync This Pair Now", command=self.sync_selected_pair)
+        self.context_menu.add_command(label="Plan (Dry Run)", command=self.plan_selected_pair)
+        self.context_menu.add_command(label="Verify Pair (compare contents)", command=self.verify_selected_pair)
         self.context_menu.add_separator()
         self.context_menu.add_command(label="Open Source Folder", command=lambda: self.open_selected_folder('source'))
         self.context_menu.add_command(label="Open Destination Folder", command=lambda: self.open_selected_folder('destination'))
@@ -334,8 +556,39 @@ class SyncApp:
         self.save_config_to_file()
         pair = self.pairs[self.selected_pair_index]
         self.log_message(f"Manual sync triggered for '{os.path.basename(pair.get('source'))}'.", "INFO")
+        self.sync_manager.bandwidth.configure(self.validate_bandwidth(), self.bandwidth_schedule)
         self.sync_manager.run_single_pair(pair)
         
+    def verify_selected_pair(self):
+        if self.selected_pair_index is None: return
+        self.commit_ui_to_data()
+        threading.Thread(target=self.sync_manager.verify_pair, args=(self.pairs[self.selected_pair_index],), daemon=True).start()
+
+    def plan_selected_pair(self):
+        if self.selected_pair_index is None: return
+        self.commit_ui_to_data()
+        threading.Thread(target=self.sync_manager.plan_pair, args=(self.pairs[self.selected_pair_index],), daemon=True).start()
+
+    def show_plan(self, pair, plan):
+        window = ttk_bs.Toplevel(self.root)
+        window.title(f"Plan: {os.path.basename(pair.get('source', ''))}")
+        window.geometry("700x450")
+        ttk_bs.Label(window, text=plan.summary(), padding=10).pack(fill=X)
+        text = scrolledtext.ScrolledText(window, wrap=tk.NONE, font=("Consolas", 9))
+        text.pack(fill=BOTH, expand=True, padx=10, pady=(0, 10))
+        for kind, label in (("new", "+"), ("changed", "*"), ("transfer", ">"), ("deleted", "-")):
+            for rel_path, size in getattr(plan, kind):
+                text.insert(tk.END, f"{label} {rel_path}  ({size:,} bytes)\n")
+            if plan.counts[kind] > len(getattr(plan, kind)):
+                text.insert(tk.END, f"{label} ... {plan.counts[kind] - len(getattr(plan, kind))} more\n")
+        for rel_path in plan.deleted_dirs:
+            text.insert(tk.END, f"- {rel_path}/  (folder and everything in it)\n")
+        if plan.counts["deleted_dirs"] > len(plan.deleted_dirs):
+            text.insert(tk.END, f"- ... {plan.counts['deleted_dirs'] - len(plan.deleted_dirs)} more folders\n")
+        text.config(state=tk.DISABLED)
+        ttk_bs.Button(window, text="Sync Now", bootstyle="success",
+                      command=lambda: (window.destroy(), self.sync_manager.run_single_pair(pair))).pack(pady=(0, 10))
+
     def open_selected_folder(self, path_type):
         if self.selected_pair_index is None: return
         self.commit_ui_to_data()
@@ -352,36 +605,108 @@ class SyncApp:
         self.commit_ui_to_data()
         original_pair = self.pairs[self.selected_pair_index]
         new_pair = copy.deepcopy(original_pair)
+        new_pair["id"] = new_pair_id()
         source_path = new_pair.get("source", "")
         if source_path: new_pair["source"] = f"{source_path} (Copy)"
         self.pairs.insert(self.selected_pair_index + 1, new_pair)
+        self.rebuild_pair_index()
         self.update_listbox_entry(self.selected_pair_index + 1, select_it=True)
-        self.save_config_to_file()
+        self.request_save()
         self.log_message(f"Duplicated pair: {os.path.basename(original_pair.get('source'))}", "INFO")
         
     def log_message(self, message, level="INFO"):
+        # Only buffered here; poll_messages writes pending lines to the widget once per tick.
+        self.log_buffer.append(message, level)
+        if self.poll_interval > POLL_MIN_MS:
+            self.poll_interval = POLL_MIN_MS
+            self.root.after_idle(self.flush_log)
+
+    def flush_log(self):
+        min_level = self.log_level_var.get()
+        records = [r for r in self.log_buffer.take_pending() if LogBuffer.visible(r, min_level)]
+        if records: self._insert_log_records(records)
+
+    def refresh_log_view(self, event=None):
+        self.log_buffer.take_pending()
+        self.log_text.config(state=tk.NORMAL)
+        self.log_text.delete("1.0", tk.END)
+        self.log_text.config(state=tk.DISABLED)
+        self._insert_log_records(self.log_buffer.filtered(self.log_level_var.get()))
+
+    def _insert_log_records(self, records):
+        at_bottom = self.log_text.yview()[1] >= 0.999
+        chunks = []
+        for timestamp, message, level in records:
+            chunks.extend((f"[{timestamp}] ", "INFO", f"{message}\n", level))
         self.log_text.config(state=tk.NORMAL)
-        timestamp = time.strftime("%H:%M:%S")
-        self.log_text.insert(tk.END, f"[{timestamp}] ", "INFO")
-        self.log_text.insert(tk.END, f"{message}\n", level)
-        self.log_text.see(tk.END)
+        self.log_text.insert(tk.END, *chunks)
+        excess = int(self.log_text.index("end-1c").split('.')[0]) - 1 - self.log_buffer.max_lines
+        if excess > 0: self.log_text.delete("1.0", f"{excess + 1}.0")
         self.log_text.config(state=tk.DISABLED)
+        # Don't yank the view away from someone reading older lines.
+        if at_bottom: self.log_text.see(tk.END)
         
     def poll_messages(self):
+        """Drains message_queue within a per-tick budget, coalescing status/progress updates per pair."""
+        deadline = time.monotonic() + POLL_TIME_BUDGET
+        handled = 0
+        dirty = set()
+        errors = []
+        finished_runs = False
         try:
-            while True:
+            while handled < POLL_MESSAGE_BUDGET and time.monotonic() < deadline:
                 message_type, *args = self.message_queue.get_nowait()
+                handled += 1
                 if message_type == "log": self.log_message(args[0], args[1])
                 elif message_type == "status":
                     status_text, original_pair_data = args
-                    for i, p in enumerate(self.pairs):
-                        if p['source'] == original_pair_data['source'] and p['destination'] == original_pair_data['destination']:
-                            p["status"] = status_text
-                            self.update_listbox_entry(i, select_it=False)
-                            break
-                elif message_type == "error": messagebox.showerror("Sync Error", args[0])
+                    i = self.find_pair_index(original_pair_data)
+                    if i is not None:
+                        self.pair_status[self.pairs[i]["id"]] = status_text
+                        self.pair_progress.pop(self.pairs[i]["id"], None)
+                        dirty.add(i)
+                    if status_text in ("Completed", "Failed"): finished_runs = True
+                elif message_type == "tuned":
+                    i = self.find_pair_index(args[0])
+                    if i is not None:
+                        apply_tuning(self.pairs[i], *args[1:])
+                        if i == self.selected_pair_index: self.display_pair_details()
+                        self.request_save()
+                elif message_type == "plan":
+                    if self.find_pair_index(args[0]) is not None: self.show_plan(*args)
+                elif message_type == "progress":
+                    original_pair_data, progress_text = args
+                    i = self.find_pair_index(original_pair_data)
+                    if i is not None:
+                        self.pair_progress[self.pairs[i]["id"]] = progress_text
+                        dirty.add(i)
+                elif message_type == "error": errors.append(args[0])
+                elif message_type == "config": self.apply_config(*args)
         except queue.Empty: pass
-        self.root.after(100, self.poll_messages)
+        for i in dirty:
+            self.update_listbox_entry(i, select_it=False)
+        self.flush_log()
+        if finished_runs and self.performance_visible(): self.refresh_performance_view()
+        if errors:
+            more = f"\n\n(and {len(errors) - 1} more, see the log)" if len(errors) > 1 else ""
+            messagebox.showerror("Sync Error", errors[0] + more)
+
+        # Poll fast while messages flow, back off gradually when idle.
+        if handled:
+            self.poll_interval = POLL_MIN_MS
+        else:
+            self.poll_interval = min(POLL_MAX_MS, int(self.poll_interval * 1.5))
+        self.root.after(self.poll_interval, self.poll_messages)
+
+    def rebuild_pair_index(self):
+        self.pair_index = {p["id"]: i for i, p in enumerate(self.pairs)}
+
+    def find_pair_index(self, pair_data):
+        # Events may carry a copy of the pair (e.g. a shard's root pass); the stable id still finds it.
+        i = self.pair_index.get(pair_data.get("id"))
+        if i is not None and i < len(self.pairs) and self.pairs[i]["id"] == pair_data.get("id"):
+            return i
+        return None
         
     def start_sync(self):
         self.commit_ui_to_data()
@@ -395,7 +720,10 @@ class SyncApp:
         if not valid_pairs:
             self.log_message("No enabled pairs to sync.", "WARNING")
             return
-        self.sync_manager.start_cycle(list(valid_pairs), interval)
+        max_workers = self.validate_limit(self.max_workers_var, DEFAULT_MAX_WORKERS)
+        max_per_device = self.validate_limit(self.max_per_device_var, DEFAULT_MAX_PER_DEVICE)
+        self.sync_manager.bandwidth.configure(self.validate_bandwidth(), self.bandwidth_schedule)
+        self.sync_manager.start_cycle(list(valid_pairs), interval, max_workers, max_per_device, self.watch_var.get())
         
     def stop_sync(self):
         if self.sync_manager.is_running(): self.sync_manager.stop_cycle()
@@ -404,7 +732,7 @@ class SyncApp:
     def on_closing(self):
         self.commit_ui_to_data()
         self.save_config_to_file()
-        if self.sync_manager: self.sync_manager.stop_cycle()
+        if self.sync_manager: self.sync_manager.shutdown()
         self.root.destroy()
         
     def create_control_panel(self, parent):
@@ -421,6 +749,25 @@ class SyncApp:
         self.interval_var = tk.StringVar(value="60")
         interval_entry = ttk_bs.Entry(settings_frame, textvariable=self.interval_var, width=10)
         interval_entry.pack(side=LEFT, padx=(0, 20))
+        ttk_bs.Label(settings_frame, text="Parallel pairs:").pack(side=LEFT, padx=(0, 5))
+        self.max_workers_var = tk.StringVar(value=str(DEFAULT_MAX_WORKERS))
+        max_workers_entry = ttk_bs.Entry(settings_frame, textvariable=self.max_workers_var, width=5)
+        max_workers_entry.pack(side=LEFT, padx=(0, 20))
+        tooltip(max_workers_entry, "Maximum number of pairs synced at the same time")
+        ttk_bs.Label(settings_frame, text="Per device:").pack(side=LEFT, padx=(0, 5))
+        self.max_per_device_var = tk.StringVar(value=str(DEFAULT_MAX_PER_DEVICE))
+        max_per_device_entry = ttk_bs.Entry(settings_frame, textvariable=self.max_per_device_var, width=5)
+        max_per_device_entry.pack(side=LEFT, padx=(0, 20))
+        tooltip(max_per_device_entry, "Maximum number of pairs writing to the same destination device or remote")
+        self.watch_var = tk.BooleanVar(value=False)
+        watch_check = ttk_bs.Checkbutton(settings_frame, text="Watch for changes", variable=self.watch_var)
+        watch_check.pack(side=LEFT, padx=(0, 20))
+        tooltip(watch_check, "Sync a pair as soon as its local source changes (Linux inotify). The interval still runs a full sweep.")
+        ttk_bs.Label(settings_frame, text="Bandwidth (MB/s):").pack(side=LEFT, padx=(0, 5))
+        self.bandwidth_var = tk.StringVar(value="0")
+        bandwidth_entry = ttk_bs.Entry(settings_frame, textvariable=self.bandwidth_var, width=6)
+        bandwidth_entry.pack(side=LEFT, padx=(0, 20))
+        tooltip(bandwidth_entry, "Total throughput shared by all running pairs (0 = unlimited). Time-of-day windows can be set with \"bandwidth_schedule\" in config.json.")
         button_frame = ttk_bs.Frame(control_frame)
         button_frame.pack(fill=X, expand=True)
         ttk_bs.Button(button_frame, text="Add Pair", command=self.add_pair, bootstyle=SUCCESS).pack(side=LEFT, padx=(0, 10))
@@ -438,12 +785,10 @@ class SyncApp:
     def update_mode_options(self, *args):
         tool = self.detail_vars['tool'].get()
         current_mode = self.detail_vars['mode'].get()
-        if tool == "robocopy":
-            self.detail_widgets['mode_combo']['values'] = ["MIR", "E-Copy"]
-            if current_mode not in ["MIR", "E-Copy"]: self.detail_vars['mode'].set("MIR")
-        elif tool == "rclone":
-            self.detail_widgets['mode_combo']['values'] = ["sync", "copy"]
-            if current_mode not in ["sync", "copy"]: self.detail_vars['mode'].set("sync")
+        modes = TOOL_MODES.get(tool)
+        if modes:
+            self.detail_widgets['mode_combo']['values'] = modes
+            if current_mode not in modes: self.detail_vars['mode'].set(modes[0])
             
     def on_pair_select(self, event):
         selected_indices = self.pair_listbox.curselection()
@@ -461,13 +806,19 @@ class SyncApp:
         self.selected_pair_index = new_index
         self.display_pair_details()
         
-    def update_listbox_entry(self, index, select_it=False):
-        if index is None or index >= len(self.pairs): return
-        pair = self.pairs[index]
+    def listbox_text(self, pair):
         source_path = pair.get("source", "New Pair")
         name = os.path.basename(source_path) if source_path else "New Pair"
-        status = pair.get("status", "Idle")
+        status = self.pair_status.get(pair["id"], "Idle")
         display_text = f"{name}  -  [{status}]"
+        progress = self.pair_progress.get(pair["id"])
+        if status == "Syncing..." and progress:
+            display_text += f"  {progress}"
+        return display_text
+
+    def update_listbox_entry(self, index, select_it=False):
+        if index is None or index >= len(self.pairs): return
+        display_text = self.listbox_text(self.pairs[index])
         
         is_selected = self.pair_listbox.curselection() and self.pair_listbox.curselection()[0] == index
 
@@ -482,13 +833,33 @@ class SyncApp:
         self._is_updating_vars = False
         
     def load_config(self):
+        """Parses config.json on a worker thread so the window appears first; poll_messages hands the result to apply_config."""
+        if not self.config_store.exists():
+            self.config_loaded = True
+            self.log_message("No config file found. Add a pair to start.", "INFO")
+            return
+
+        def read():
+            try:
+                self.message_queue.put(("config", self.config_store.load(), None))
+            except Exception as e:
+                self.message_queue.put(("config", None, e))
+        threading.Thread(target=read, name="config-loader", daemon=True).start()
+
+    def apply_config(self, config, error):
+        self.config_loaded = True
         try:
-            if not os.path.exists(self.config_file):
-                self.log_message("No config file found. Add a pair to start.", "INFO")
-                return
-            with open(self.config_file, 'r', encoding='utf-8') as f: config = json.load(f)
+            if error is not None: raise error
+            self.loaded_config = config
             
             self.interval_var.set(config.get("interval", "60"))
+            self.max_workers_var.set(config.get("max_workers", str(DEFAULT_MAX_WORKERS)))
+            self.max_per_device_var.set(config.get("max_per_device", str(DEFAULT_MAX_PER_DEVICE)))
+            self.watch_var.set(config.get("watch", False))
+            self.bandwidth_var.set(config.get("bandwidth_limit", 0))
+            self.bandwidth_schedule = config.get("bandwidth_schedule", [])
+            self.sync_manager.bandwidth.configure(self.validate_bandwidth(), self.bandwidth_schedule)
+            self.start_metrics_exporter(config)
             
             theme = config.get("theme", "darkly")
             if theme in self.available_themes:
@@ -496,19 +867,33 @@ class SyncApp:
                 self.theme_var.set(theme)
                 self.style.theme_use(theme)
             self.pairs = config.get("pairs", [])
+            self.rebuild_pair_index()
             self.pair_listbox.delete(0, tk.END)
-            for i in range(len(self.pairs)):
-                self.update_listbox_entry(i, select_it=False)
+            # One insert call for all rows; per-row inserts dominate startup with thousands of pairs.
+            if self.pairs: self.pair_listbox.insert(tk.END, *(self.listbox_text(p) for p in self.pairs))
             
             if self.pairs:
                 self.pair_listbox.selection_set(0)
                 self.on_pair_select(None)
 
-            self.log_message("Configuration loaded successfully.", "SUCCESS")
+            self.log_message(f"Configuration loaded successfully ({len(self.pairs)} pairs) {self._since_start()}.", "SUCCESS")
+            # Writes ids assigned to pairs from older configs; a no-op otherwise.
+            self.request_save()
         except (json.JSONDecodeError, Exception) as e:
             self.log_message(f"Failed to load config: {e}. A new config will be created.", "ERROR")
             self.pairs = []
+            self.rebuild_pair_index()
             
+    def start_metrics_exporter(self, config):
+        port = config.get("metrics_port")
+        if not port or self.metrics_exporter is not None: return
+        from metrics_exporter import MetricsExporter
+        self.metrics_exporter = MetricsExporter(self.sync_manager, int(port), config.get("metrics_host", "127.0.0.1"))
+        try:
+            self.log_message(f"Serving metrics on http://{self.metrics_exporter.host}:{self.metrics_exporter.start()}/metrics", "INFO")
+        except OSError as e:
+            self.log_message(f"Could not start the metrics endpoint on port {port}: {e}", "ERROR")
+
     def browse_directory(self, var):
         directory = filedialog.askdirectory()
         if directory:
@@ -522,7 +907,23 @@ class SyncApp:
         self.interval_var.set("60")
         messagebox.showwarning("Invalid Interval", "Interval must be a positive number. Defaulting to 60 seconds.")
         return 60
+
+    def validate_limit(self, var, default):
+        try:
+            value = int(var.get())
+            if value > 0: return value
+        except ValueError: pass
+        var.set(str(default))
+        return default
         
+    def validate_bandwidth(self):
+        try:
+            value = float(self.bandwidth_var.get())
+            if value >= 0: return value
+        except ValueError: pass
+        self.bandwidth_var.set("0")
+        return 0
+
     def validate_pairs(self):
         valid_pairs = []
         for i, pair in enumerate(self.pairs):
@@ -531,20 +932,34 @@ class SyncApp:
             if not source or not dest:
                 messagebox.showerror("Validation Error", f"Pair '{self.pair_listbox.get(i)}' has an empty source or destination.")
                 return None
-            if tool == "robocopy" and not os.path.isdir(source):
+            if tool in ("robocopy", "native") and not os.path.isdir(source):
                 messagebox.showerror("Validation Error", f"Source directory for pair '{self.pair_listbox.get(i)}' does not exist: {source}")
                 return None
             if tool == "rclone" and not shutil.which("rclone"):
                 messagebox.showerror("Validation Error", "rclone executable not found in system PATH.")
                 return None
+            if tool == "rsync" and not shutil.which("rsync"):
+                messagebox.showerror("Validation Error", "rsync executable not found in system PATH.")
+                return None
             valid_pairs.append(pair)
         return valid_pairs
         
     def save_config_to_file(self):
-        config = {"interval": self.interval_var.get(), "theme": self.current_theme, "pairs": self.pairs}
-        try:
-            with open(self.config_file, 'w', encoding='utf-8') as f: json.dump(config, f, indent=4, ensure_ascii=False)
-        except Exception as e: self.log_message(f"Error saving configuration: {e}", "ERROR")
+        self._save_pending = False
+        # Until the background load finishes, saving would overwrite config.json with an empty pair list.
+        if not self.config_loaded: return
+        # Keys the GUI has no widgets for (e.g. metrics_port) are written back unchanged.
+        config = dict(self.loaded_config)
+        config.update({"interval": self.interval_var.get(), "max_workers": self.max_workers_var.get(),
+                       "max_per_device": self.max_per_device_var.get(), "watch": self.watch_var.get(), "bandwidth_limit": self.bandwidth_var.get(),
+                       "bandwidth_schedule": self.bandwidth_schedule, "theme": self.current_theme, "pairs": self.pairs})
+        self.config_store.save(config)
+
+    def request_save(self):
+        """Debounced save: edits made within SAVE_DELAY_MS are written together, on the Tk thread."""
+        if self._save_pending: return
+        self._save_pending = True
+        self.root.after(SAVE_DELAY_MS, lambda: self._save_pending and self.save_config_to_file())
         
     def change_theme(self, event=None):
         self.commit_ui_to_data()
@@ -556,5 +971,5 @@ class SyncApp:
             self.log_text.tag_config("SUCCESS", foreground=self.style.colors.success)
             self.log_text.tag_config("ERROR", foreground=self.style.colors.danger)
             self.log_text.tag_config("WARNING", foreground=self.style.colors.warning)
-            self.save_config_to_file()
+            self.request_save()
             self.log_message(f"Theme changed to: {new_theme}", "INFO")
\ No newline at end of file
@@ -0,0 +1,106 @@
+import os
+import hashlib
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import xxhash
+    ALGORITHM = "xxh3_128"
+    _new_hasher = xxhash.xxh3_128
+except ImportError:
+    try:
+        import blake3
+        ALGORITHM = "blake3"
+        _new_hasher = blake3.blake3
+    except ImportError:
+        ALGORITHM = "blake2b"
+        _new_hasher = lambda: hashlib.blake2b(digest_size=16)
+
+CACHE_FILE = "hash_cache.db"
+READ_CHUNK = 4 * 1024 * 1024
+# Below this many files a thread pool costs more than it saves.
+POOL_THRESHOLD = 4
+
+
+def hash_file(path):
+    """Returns the hex digest of a file with the fastest available algorithm."""
+    hasher = _new_hasher()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(READ_CHUNK)
+            if not chunk: break
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class HashCache:
+    """Persistent per-pair content hashes keyed by (path, size, mtime, inode), stored next to config.json.
+
+    A cached digest is only reused while the file's size, mtime and inode are unchanged,
+    so only new or modified files are ever read. Missing digests are computed lazily,
+    in a thread pool for larger batches; the hashers release the GIL on large reads.
+    """
+
+    def __init__(self, state_dir, workers=None):
+        self.db_path = os.path.join(state_dir, CACHE_FILE)
+        self.workers = workers or min(8, os.cpu_count() or 2)
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        with self._init_lock:
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("CREATE TABLE IF NOT EXISTS hashes (pair_id TEXT, path TEXT, size INTEGER, mtime_ns INTEGER, "
+                             "inode INTEGER, algorithm TEXT, digest TEXT, PRIMARY KEY (pair_id, path)) WITHOUT ROWID")
+                conn.commit()
+                self._initialized = True
+        return conn
+
+    def get_hashes(self, pair_id, files):
+        """files: {absolute_path: FileEntry}. Returns {absolute_path: digest}, skipping unreadable files."""
+        if not files: return {}
+        result, missing = {}, []
+        conn = self._connect()
+        try:
+            for path, entry in files.items():
+                row = conn.execute("SELECT size, mtime_ns, inode, algorithm, digest FROM hashes WHERE pair_id = ? AND path = ?",
+                                   (pair_id, path)).fetchone()
+                if row and row[:4] == (entry.size, entry.mtime_ns, entry.inode, ALGORITHM):
+                    result[path] = row[4]
+                else:
+                    missing.append(path)
+        finally:
+            conn.close()
+        computed = self._compute(missing)
+        result.update(computed)
+        if computed:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                     [(pair_id, p, files[p].size, files[p].mtime_ns, files[p].inode, ALGORITHM, d) for p, d in computed.items()])
+            finally:
+                conn.close()
+        return result
+
+    def _compute(self, paths):
+        digests = {}
+        if len(paths) < POOL_THRESHOLD:
+            for path in paths:
+                try:
+                    digests[path] = hash_file(path)
+                except OSError:
+                    pass
+            return digests
+        # Threads, not processes: forking a process whose other threads hold locks can deadlock the children.
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hash") as pool:
+            futures = {pool.submit(hash_file, path): path for path in paths}
+            for future, path in futures.items():
+                try:
+                    digests[path] = future.result()
+                except OSError:
+                    pass
+        return digests
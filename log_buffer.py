@@ -0,0 +1,50 @@
+import time
+import logging
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+LEVEL_RANK = {"INFO": 0, "SUCCESS": 1, "WARNING": 2, "ERROR": 3}
+DEFAULT_MAX_LINES = 5000
+SPILL_MAX_BYTES = 5 * 1024 * 1024
+SPILL_BACKUPS = 5
+
+
+class LogBuffer:
+    """Capped in-memory log model for the GUI; every message is also appended to a rotating file on disk."""
+
+    def __init__(self, max_lines=DEFAULT_MAX_LINES, spill_path=None):
+        self.max_lines = max_lines
+        self.records = deque(maxlen=max_lines)
+        self.pending = []
+        self.spill = None
+        if spill_path:
+            try:
+                self.spill = logging.getLogger(f"directorysync.gui.{id(self)}")
+                self.spill.propagate = False
+                self.spill.setLevel(logging.INFO)
+                handler = RotatingFileHandler(spill_path, maxBytes=SPILL_MAX_BYTES, backupCount=SPILL_BACKUPS, encoding='utf-8')
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                self.spill.addHandler(handler)
+            except OSError:
+                self.spill = None
+
+    def append(self, message, level="INFO"):
+        record = (time.strftime("%H:%M:%S"), message, level)
+        self.records.append(record)
+        self.pending.append(record)
+        if len(self.pending) > self.max_lines:
+            del self.pending[:-self.max_lines]
+        if self.spill:
+            self.spill.info(f"{time.strftime('%Y-%m-%d %H:%M:%S')} [{level}] {message}")
+
+    def take_pending(self):
+        pending, self.pending = self.pending, []
+        return pending
+
+    def filtered(self, min_level="INFO"):
+        rank = LEVEL_RANK.get(min_level, 0)
+        return [r for r in self.records if LEVEL_RANK.get(r[2], 0) >= rank]
+
+    @staticmethod
+    def visible(record, min_level):
+        return LEVEL_RANK.get(record[2], 0) >= LEVEL_RANK.get(min_level, 0)
@@ -1,5 +1,7 @@
+import time
+STARTED = time.perf_counter()
+
 import tkinter as tk
-from gui import SyncApp
 import sys
 import os
 
@@ -26,8 +28,9 @@ def main():
     except Exception as e:
         print(f"Could not load icon: {e}")
     
-    # Initialize application
-    app = SyncApp(root)
+    # Imported here, not at module level: ttkbootstrap and the sync engine are the bulk of startup.
+    from gui import SyncApp
+    app = SyncApp(root, STARTED)
     
     # Start the GUI
     root.mainloop()
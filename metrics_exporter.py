@@ -0,0 +1,155 @@
+import os
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DURATION_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600, 7200)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}" if labels else ""
+
+
+class PairStats:
+    __slots__ = ("labels", "last_success", "last_run", "running", "runs_ok", "runs_failed", "bytes", "files_copied",
+                 "files_deleted", "errors", "speed", "buckets", "duration_sum")
+
+    def __init__(self, labels):
+        self.labels = labels
+        self.last_success = None
+        self.last_run = None
+        self.running = 0
+        self.runs_ok = 0
+        self.runs_failed = 0
+        self.bytes = 0
+        self.files_copied = 0
+        self.files_deleted = 0
+        self.errors = 0
+        self.speed = 0.0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.duration_sum = 0.0
+
+
+class MetricsExporter:
+    """Serves Prometheus text-format metrics built from SyncManager events on a small background HTTP server."""
+
+    def __init__(self, manager, port, host="127.0.0.1"):
+        self.manager = manager
+        self.host = host
+        self.port = port
+        self.pairs = {}
+        self.error_events = 0
+        self._lock = threading.Lock()
+        self._server = None
+        manager.add_listener(self.handle_event)
+
+    def start(self):
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="metrics-exporter", daemon=True).start()
+        return self.port
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _stats(self, pair):
+        source, destination = pair.get('source') or '', pair.get('destination') or ''
+        key = (source, destination)
+        stats = self.pairs.get(key)
+        if stats is None:
+            name = os.path.basename(source.rstrip('/\\')) or source
+            stats = self.pairs[key] = PairStats((("pair", name), ("source", source), ("destination", destination)))
+        return stats
+
+    def handle_event(self, event):
+        kind = event[0]
+        with self._lock:
+            if kind == "status":
+                stats = self._stats(event[2])
+                stats.running = 1 if event[1] == "Syncing..." else 0
+            elif kind == "metrics":
+                self._stats(event[1]).speed = event[2].speed_bps or 0.0
+            elif kind == "run":
+                self._record(self._stats(event[1]), event[2])
+            elif kind == "error":
+                self.error_events += 1
+
+    @staticmethod
+    def _record(stats, record):
+        metrics = record.metrics
+        stats.last_run = record.finished
+        if record.success:
+            stats.runs_ok += 1
+            stats.last_success = record.finished
+        else:
+            stats.runs_failed += 1
+        stats.bytes += metrics.bytes_transferred
+        stats.files_copied += metrics.files_copied
+        stats.files_deleted += metrics.files_deleted
+        stats.errors += metrics.errors
+        stats.speed = 0.0
+        stats.duration_sum += record.duration
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if record.duration <= bound: stats.buckets[i] += 1
+
+    def render(self):
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{_labels(labels)} {value}")
+
+        with self._lock:
+            pairs = list(self.pairs.values())
+            family("directorysync_pair_last_success_timestamp_seconds", "gauge", "Unix time of the last successful run.",
+                   [("", p.labels, f"{p.last_success:.3f}") for p in pairs if p.last_success])
+            family("directorysync_pair_last_run_timestamp_seconds", "gauge", "Unix time the last run finished.",
+                   [("", p.labels, f"{p.last_run:.3f}") for p in pairs if p.last_run])
+            family("directorysync_pair_running", "gauge", "1 while the pair is syncing.", [("", p.labels, p.running) for p in pairs])
+            family("directorysync_pair_runs_total", "counter", "Finished runs by result.",
+                   [("", p.labels + (("result", "success"),), p.runs_ok) for p in pairs] +
+                   [("", p.labels + (("result", "failure"),), p.runs_failed) for p in pairs])
+            family("directorysync_pair_bytes_transferred_total", "counter", "Bytes copied.", [("", p.labels, p.bytes) for p in pairs])
+            family("directorysync_pair_files_transferred_total", "counter", "Files copied.", [("", p.labels, p.files_copied) for p in pairs])
+            family("directorysync_pair_files_deleted_total", "counter", "Files deleted at the destination.", [("", p.labels, p.files_deleted) for p in pairs])
+            family("directorysync_pair_file_errors_total", "counter", "Files the tool reported as failed.", [("", p.labels, p.errors) for p in pairs])
+            family("directorysync_pair_speed_bytes_per_second", "gauge", "Current transfer speed of a running pair.",
+                   [("", p.labels, f"{p.speed:.1f}") for p in pairs])
+            samples = []
+            for p in pairs:
+                total = p.runs_ok + p.runs_failed
+                samples += [("_bucket", p.labels + (("le", str(bound)),), p.buckets[i]) for i, bound in enumerate(DURATION_BUCKETS)]
+                samples += [("_bucket", p.labels + (("le", "+Inf"),), total), ("_sum", p.labels, f"{p.duration_sum:.3f}"), ("_count", p.labels, total)]
+            family("directorysync_pair_run_duration_seconds", "histogram", "Run durations.", samples)
+            family("directorysync_error_events_total", "counter", "Errors reported to the user.", [("", (), self.error_events)])
+        running_processes = self.manager.running_process_count()
+        family("directorysync_message_queue_depth", "gauge", "Events waiting in the UI/CLI message queue.", [("", (), self.manager.message_queue.qsize())])
+        family("directorysync_running_processes", "gauge", "Running sync tool processes and native engines.", [("", (), running_processes)])
+        return "\n".join(lines) + "\n"
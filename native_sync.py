@@ -0,0 +1,524 @@
+import os
+import stat
+import shutil
+import errno
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from resume_journal import RESUME_MIN_SIZE, CHECKPOINT_BYTES, CHECKPOINT_SECONDS, new_digest
+from exclusions import matcher_for
+
+COPY_CHUNK = 8 * 1024 * 1024
+# Throttled copies move smaller steps so the pace stays even.
+THROTTLED_CHUNK = 512 * 1024
+TEMP_SUFFIX = ".dsync-tmp"
+# Same tolerance robocopy uses with /FFT, so FAT/SMB targets don't recopy everything.
+MTIME_TOLERANCE_NS = 2 * 1000 * 1000 * 1000
+# Errors meaning "this kernel/filesystem can't do it", as opposed to real I/O failures.
+_FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EBADF, errno.EPERM, errno.ENOTSOCK,
+                    getattr(errno, 'EOPNOTSUPP', errno.EINVAL), getattr(errno, 'ENOTSUP', errno.EINVAL)}
+
+
+class SyncCancelled(Exception):
+    pass
+
+
+class FileEntry:
+    __slots__ = ("is_dir", "size", "mtime_ns", "inode")
+
+    def __init__(self, is_dir, size, mtime_ns, inode):
+        self.is_dir = is_dir
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.inode = inode
+
+
+def scan_tree(root, exclusions=None, cancel_event=None, errors=None):
+    """Walks root with os.scandir and returns {relative_posix_path: FileEntry}, never descending into excluded directories.
+
+    With an errors list, a subdirectory that can't be read is noted there and skipped; otherwise the OSError propagates.
+    """
+    entries = {}
+    if not os.path.isdir(root):
+        return entries
+    matcher = matcher_for(exclusions)
+    stack = [("", root)]
+    while stack:
+        if cancel_event is not None and cancel_event.is_set():
+            raise SyncCancelled()
+        rel_dir, abs_dir = stack.pop()
+        try:
+            with os.scandir(abs_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(TEMP_SUFFIX): continue
+                    rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        if matcher and matcher.excluded(entry.name, rel_path, is_dir): continue
+                        st = entry.stat(follow_symlinks=True)
+                    except OSError:
+                        continue
+                    if is_dir:
+                        entries[rel_path] = FileEntry(True, 0, st.st_mtime_ns, st.st_ino)
+                        stack.append((rel_path, entry.path))
+                    elif stat.S_ISREG(st.st_mode):
+                        entries[rel_path] = FileEntry(False, st.st_size, st.st_mtime_ns, st.st_ino)
+        except OSError as e:
+            if errors is None or not rel_dir: raise
+            errors.append(f"Could not scan {abs_dir}: {e}")
+    return entries
+
+
+def needs_copy(src, dst):
+    if dst is None or dst.is_dir:
+        return True
+    return src.size != dst.size or abs(src.mtime_ns - dst.mtime_ns) > MTIME_TOLERANCE_NS
+
+
+def copy_file_data(src_fd, dst_fd, cancel_event=None, throttle=None, limit=None):
+    """Copies src_fd to dst_fd from their current offsets, preferring kernel-side copies.
+
+    throttle is an optional TokenBucket-like object whose consume(n, cancel_event) paces the copy;
+    limit caps the number of bytes copied by this call.
+    """
+    copied = 0
+    chunk_size = THROTTLED_CHUNK if throttle is not None else COPY_CHUNK
+    for method in ("copy_file_range", "sendfile"):
+        func = getattr(os, method, None)
+        if func is None: continue
+        try:
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise SyncCancelled()
+                size = chunk_size if limit is None else min(chunk_size, limit - copied)
+                if size <= 0:
+                    return copied
+                if method == "copy_file_range":
+                    n = func(src_fd, dst_fd, size)
+                else:
+                    n = func(dst_fd, src_fd, None, size)
+                if n == 0:
+                    return copied
+                copied += n
+                if throttle is not None: throttle.consume(n, cancel_event)
+        except OSError as e:
+            if e.errno not in _FALLBACK_ERRNOS: raise
+            # Positions are left where the kernel stopped, so the next method carries on from there.
+    while True:
+        if cancel_event is not None and cancel_event.is_set():
+            raise SyncCancelled()
+        size = chunk_size if limit is None else min(chunk_size, limit - copied)
+        if size <= 0:
+            return copied
+        chunk = os.read(src_fd, size)
+        if not chunk:
+            return copied
+        view = memoryview(chunk)
+        while view:
+            written = os.write(dst_fd, view)
+            view = view[written:]
+        copied += len(chunk)
+        if throttle is not None: throttle.consume(len(chunk), cancel_event)
+
+
+def _hash_range(path, start, end, digest):
+    """Feeds bytes [start, end) of the file at path into digest; False if the file ends before end."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while start < end:
+            data = f.read(min(COPY_CHUNK, end - start))
+            if not data: return False
+            digest.update(data)
+            start += len(data)
+    return True
+
+
+class NativeSyncEngine:
+    """In-process sync between two local or mounted directories with robocopy-like MIR/E-Copy modes."""
+
+    def __init__(self, source, destination, mode="MIR", exclusions=None, workers=8, log=None, throttle=None, journal=None):
+        self.source = source
+        self.destination = destination
+        self.mode = mode
+        self.exclusions = exclusions or []
+        self.workers = max(1, int(workers))
+        self.log = log or (lambda message, level: None)
+        self.throttle = throttle
+        self.journal = journal
+        self._src_entries = {}
+        self.cancel_event = threading.Event()
+        self._stats_lock = threading.Lock()
+        self.stats = {"files_checked": 0, "files_copied": 0, "bytes_copied": 0, "files_deleted": 0, "dirs_created": 0, "errors": []}
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self, entries=None):
+        """Syncs the trees. entries=(src_entries, dst_entries) reuses a scan made moments ago, e.g. by a plan."""
+        start = time.time()
+        if not os.path.isdir(self.source):
+            raise FileNotFoundError(f"Source directory does not exist: {self.source}")
+        os.makedirs(self.destination, exist_ok=True)
+        source_complete = True
+        if entries:
+            src_entries, dst_entries = entries
+        else:
+            src_errors, dst_errors = [], []
+            src_entries = scan_tree(self.source, self.exclusions, self.cancel_event, src_errors)
+            dst_entries = scan_tree(self.destination, self.exclusions, self.cancel_event, dst_errors)
+            self._scan_errors(src_errors + dst_errors)
+            source_complete = not src_errors
+
+        if self.mode == "MIR":
+            self._delete_extras(src_entries, dst_entries, source_complete)
+        self._create_dirs(src_entries, dst_entries)
+        to_copy = [rel for rel, e in src_entries.items() if not e.is_dir and needs_copy(e, dst_entries.get(rel))]
+        self._src_entries = src_entries
+        if self.journal is not None: self._drop_stale_partials(set(to_copy))
+        self.stats["files_checked"] = sum(1 for e in src_entries.values() if not e.is_dir)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="native-copy") as pool:
+            for _ in pool.map(self._copy_one, to_copy):
+                pass
+        if self.cancel_event.is_set():
+            raise SyncCancelled()
+        self.stats["elapsed"] = time.time() - start
+        return self.stats
+
+    def _abs(self, root, rel_path):
+        return os.path.join(root, *rel_path.split('/'))
+
+    def _error(self, message):
+        with self._stats_lock:
+            self.stats["errors"].append(message)
+
+    def _scan_errors(self, errors):
+        for message in errors:
+            self.log(message, "WARNING")
+            self._error(message)
+
+    def _delete_extras(self, src_entries, dst_entries, source_complete=True):
+        if not source_complete:
+            # Files under an unreadable source directory would look like extras, so nothing is deleted this run.
+            self.log(f"Skipping deletions in {self.destination}: parts of {self.source} could not be scanned.", "WARNING")
+            return
+        removed_dirs = set()
+        for rel_path in sorted(dst_entries):
+            if self.cancel_event.is_set(): raise SyncCancelled()
+            dst = dst_entries[rel_path]
+            src = src_entries.get(rel_path)
+            if src is not None and src.is_dir == dst.is_dir: continue
+            parts = rel_path.split('/')
+            if any('/'.join(parts[:i]) in removed_dirs for i in range(1, len(parts))): continue
+            path = self._abs(self.destination, rel_path)
+            try:
+                if dst.is_dir:
+                    shutil.rmtree(path)
+                    removed_dirs.add(rel_path)
+                else:
+                    os.remove(path)
+                self.stats["files_deleted"] += 1
+            except OSError as e:
+                self._error(f"Could not delete {path}: {e}")
+
+    def _create_dirs(self, src_entries, dst_entries):
+        for rel_path in sorted(r for r, e in src_entries.items() if e.is_dir):
+            dst = dst_entries.get(rel_path)
+            if dst is not None and dst.is_dir: continue
+            path = self._abs(self.destination, rel_path)
+            try:
+                if dst is not None and self.mode != "MIR":
+                    self._error(f"Cannot create directory over existing file: {path}")
+                    continue
+                os.makedirs(path, exist_ok=True)
+                self.stats["dirs_created"] += 1
+            except OSError as e:
+                self._error(f"Could not create directory {path}: {e}")
+
+    def _copy_one(self, rel_path):
+        if self.cancel_event.is_set(): return
+        src_path = self._abs(self.source, rel_path)
+        dst_path = self._abs(self.destination, rel_path)
+        tmp_path = dst_path + TEMP_SUFFIX
+        entry = self._src_entries.get(rel_path)
+        resumable = self.journal is not None and entry is not None and entry.size >= RESUME_MIN_SIZE
+        try:
+            if os.path.isdir(dst_path):
+                if self.mode != "MIR":
+                    self._error(f"Cannot copy file over existing directory: {dst_path}")
+                    return
+                shutil.rmtree(dst_path)
+            if resumable:
+                copied = self._copy_resumable(rel_path, src_path, tmp_path, entry)
+            else:
+                with open(src_path, 'rb') as fsrc, open(tmp_path, 'wb') as fdst:
+                    copied = copy_file_data(fsrc.fileno(), fdst.fileno(), self.cancel_event, self.throttle)
+            shutil.copystat(src_path, tmp_path)
+            os.replace(tmp_path, dst_path)
+            if resumable: self.journal.remove(rel_path)
+            with self._stats_lock:
+                self.stats["files_copied"] += 1
+                self.stats["bytes_copied"] += copied
+        except SyncCancelled:
+            # Journaled partial copies are kept so the next run can pick up where this one stopped.
+            if not resumable: self._discard(tmp_path)
+        except OSError as e:
+            if not resumable: self._discard(tmp_path)
+            self._error(f"Could not copy {src_path}: {e}")
+
+    def _copy_resumable(self, rel_path, src_path, tmp_path, entry):
+        """Copies kernel-side between checkpoints, resuming from the journaled offset if tmp_path still matches it.
+
+        A checkpoint fsyncs the temp copy, folds the bytes since the last one into the rolling digest
+        and journals the new offset.
+        """
+        offset, digest = self._resume_point(rel_path, tmp_path, entry)
+        with open(src_path, 'rb') as fsrc, open(tmp_path, 'r+b' if offset else 'wb') as fdst:
+            src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+            os.ftruncate(dst_fd, offset)
+            os.lseek(src_fd, offset, os.SEEK_SET)
+            os.lseek(dst_fd, offset, os.SEEK_SET)
+            copied = 0
+            while True:
+                start, started = offset, time.monotonic()
+                while offset - start < CHECKPOINT_BYTES and time.monotonic() - started < CHECKPOINT_SECONDS:
+                    n = copy_file_data(src_fd, dst_fd, self.cancel_event, self.throttle, min(COPY_CHUNK * 4, start + CHECKPOINT_BYTES - offset))
+                    if n == 0: break
+                    offset += n
+                if offset == start: break
+                copied += offset - start
+                os.fsync(dst_fd)
+                if not _hash_range(tmp_path, start, offset, digest):
+                    raise OSError(errno.EIO, f"Temp copy shorter than written: {tmp_path}")
+                self.journal.update(rel_path, entry.size, entry.mtime_ns, offset, digest.hexdigest())
+        return copied
+
+    def _resume_point(self, rel_path, tmp_path, entry):
+        """Returns (offset, digest) to continue from: the journaled checkpoint if tmp_path still hashes to it, else a fresh start."""
+        offset, recorded = self.journal.get(rel_path, entry.size, entry.mtime_ns)
+        digest = new_digest()
+        if not offset or not os.path.exists(tmp_path): return 0, digest
+        try:
+            verified = _hash_range(tmp_path, 0, offset, digest)
+        except OSError:
+            verified = False
+        if not verified or digest.hexdigest() != recorded:
+            return 0, new_digest()
+        self.log(f"Resuming {rel_path} at {offset / 1048576:.0f} of {entry.size / 1048576:.0f} MB.", "INFO")
+        return offset, digest
+
+    def _drop_stale_partials(self, to_copy):
+        """Removes journaled partial copies of files that no longer need copying."""
+        for rel_path in self.journal.paths():
+            if rel_path in to_copy: continue
+            self._discard(self._abs(self.destination, rel_path) + TEMP_SUFFIX)
+            self.journal.remove(rel_path)
+
+    @staticmethod
+    def _discard(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class _FanOutTarget:
+    """One destination's copy of the file a fan-out worker is reading.
+
+    Large files are resumable as in NativeSyncEngine._copy_resumable: the copy continues from the
+    destination's own verified checkpoint, and chunks before it are skipped.
+    """
+
+    def __init__(self, engine, rel_path):
+        self.engine = engine
+        self.rel_path = rel_path
+        self.dst_path = engine._abs(engine.destination, rel_path)
+        self.tmp_path = self.dst_path + TEMP_SUFFIX
+        self.entry = engine._src_entries.get(rel_path)
+        self.resumable = engine.journal is not None and self.entry is not None and self.entry.size >= RESUME_MIN_SIZE
+        self.file = None
+        self.copied = 0
+        self.offset = 0
+        self.digest = None
+
+    def open(self):
+        if self.engine.cancel_event.is_set(): raise SyncCancelled()
+        if os.path.isdir(self.dst_path):
+            if self.engine.mode != "MIR": raise IsADirectoryError(errno.EISDIR, "Cannot copy file over existing directory")
+            shutil.rmtree(self.dst_path)
+        if not self.resumable:
+            self.file = open(self.tmp_path, 'wb')
+            return
+        self.offset, self.digest = self.engine._resume_point(self.rel_path, self.tmp_path, self.entry)
+        self.file = open(self.tmp_path, 'r+b' if self.offset else 'wb')
+        self.file.truncate(self.offset)
+        self.file.seek(self.offset)
+        self._checkpointed, self._checkpoint_time = self.offset, time.monotonic()
+
+    def write(self, chunk, position):
+        """Writes the part of chunk, read from the source at position, that lies past this destination's offset."""
+        if self.engine.cancel_event.is_set(): raise SyncCancelled()
+        end = position + len(chunk)
+        if end <= self.offset: return
+        data = memoryview(chunk)[self.offset - position:] if position < self.offset else chunk
+        self.file.write(data)
+        self.offset = end
+        self.copied += len(data)
+        if self.digest is not None:
+            self.digest.update(data)
+            if end - self._checkpointed >= CHECKPOINT_BYTES or time.monotonic() - self._checkpoint_time >= CHECKPOINT_SECONDS:
+                self._checkpoint()
+        if self.engine.throttle is not None: self.engine.throttle.consume(len(data), self.engine.cancel_event)
+
+    def _checkpoint(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.engine.journal.update(self.rel_path, self.entry.size, self.entry.mtime_ns, self.offset, self.digest.hexdigest())
+        self._checkpointed, self._checkpoint_time = self.offset, time.monotonic()
+
+    def finish(self, src_path):
+        self.file.close()
+        shutil.copystat(src_path, self.tmp_path)
+        os.replace(self.tmp_path, self.dst_path)
+        if self.engine.journal is not None: self.engine.journal.remove(self.rel_path)
+        with self.engine._stats_lock:
+            self.engine.stats["files_copied"] += 1
+            self.engine.stats["bytes_copied"] += self.copied
+
+    def abort(self):
+        if self.file is not None:
+            try:
+                self.file.close()
+            except OSError:
+                pass
+        # Journaled partial copies are kept so the next run can pick up where this one stopped.
+        if not self.resumable: NativeSyncEngine._discard(self.tmp_path)
+
+
+class _AllSet:
+    """Event-like view that is set once every one of several events is set."""
+
+    def __init__(self, events):
+        self.events = events
+
+    def is_set(self):
+        return all(event.is_set() for event in self.events)
+
+
+class FanOutEngine:
+    """Syncs one source to several destinations, scanning the source once and reading each changed file once.
+
+    Each destination is a NativeSyncEngine that keeps its own mode, throttle, stats and cancel
+    event. Every chunk read is written to all destinations that need the file in parallel; a
+    destination that fails or is cancelled drops out without holding up the others.
+    """
+
+    def __init__(self, engines, workers=8, log=None):
+        self.engines = engines
+        self.source = engines[0].source
+        self.exclusions = engines[0].exclusions
+        self.workers = max(1, int(workers))
+        self.log = log or (lambda message, level: None)
+        self.failures = {}
+        # Stopping a pair cancels its engine; the shared source scan stops once every pair has been stopped.
+        self.cancel_event = _AllSet([engine.cancel_event for engine in engines])
+        throttled = any(engine.throttle is not None for engine in engines)
+        self.chunk_size = THROTTLED_CHUNK if throttled else COPY_CHUNK
+        self._writers = None
+
+    def run(self):
+        """Returns [(engine, stats or the exception that stopped that destination)] in engine order."""
+        start = time.time()
+        if not os.path.isdir(self.source):
+            raise FileNotFoundError(f"Source directory does not exist: {self.source}")
+        src_errors = []
+        src_entries = scan_tree(self.source, self.exclusions, self.cancel_event, src_errors)
+        for message in src_errors:
+            self.log(message, "WARNING")
+        targets = {}
+        with ThreadPoolExecutor(max_workers=len(self.engines), thread_name_prefix="fanout-scan") as pool:
+            for engine, to_copy in zip(self.engines, pool.map(lambda e: self._prepare(e, src_entries, src_errors), self.engines)):
+                for rel_path in to_copy or ():
+                    targets.setdefault(rel_path, []).append(engine)
+        # Writer threads for every copy worker's destinations, so no copy waits on another's writes.
+        with ThreadPoolExecutor(max_workers=self.workers * len(self.engines), thread_name_prefix="fanout-write") as self._writers:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="fanout-copy") as pool:
+                for _ in pool.map(self._copy_one, targets.items()):
+                    pass
+        self._writers = None
+        elapsed = time.time() - start
+        results = []
+        for engine in self.engines:
+            engine.stats["elapsed"] = elapsed
+            if engine in self.failures:
+                results.append((engine, self.failures[engine]))
+            elif engine.cancel_event.is_set():
+                results.append((engine, SyncCancelled()))
+            else:
+                results.append((engine, engine.stats))
+        return results
+
+    def _prepare(self, engine, src_entries, src_errors):
+        """Scans one destination and applies its deletions and new directories; returns the files it needs copied."""
+        try:
+            os.makedirs(engine.destination, exist_ok=True)
+            dst_errors = []
+            dst_entries = scan_tree(engine.destination, engine.exclusions, engine.cancel_event, dst_errors)
+            for message in src_errors:
+                engine._error(message)
+            engine._scan_errors(dst_errors)
+            if engine.mode == "MIR":
+                engine._delete_extras(src_entries, dst_entries, not src_errors)
+            engine._create_dirs(src_entries, dst_entries)
+        except Exception as e:
+            self.failures[engine] = e
+            return None
+        to_copy = [rel for rel, e in src_entries.items() if not e.is_dir and needs_copy(e, dst_entries.get(rel))]
+        engine._src_entries = src_entries
+        if engine.journal is not None: engine._drop_stale_partials(set(to_copy))
+        engine.stats["files_checked"] = sum(1 for e in src_entries.values() if not e.is_dir)
+        return to_copy
+
+    def _each(self, step, targets, src_path):
+        """Runs step on every target, in parallel when there are several; returns the targets it succeeded on."""
+        def attempt(target):
+            try:
+                step(target)
+                return True
+            except SyncCancelled:
+                target.abort()
+            except OSError as e:
+                target.abort()
+                target.engine._error(f"Could not copy {src_path} to {target.dst_path}: {e}")
+            return False
+        if len(targets) == 1:
+            return targets if attempt(targets[0]) else []
+        return [target for target, ok in zip(targets, self._writers.map(attempt, targets)) if ok]
+
+    def _copy_one(self, item):
+        rel_path, engines = item
+        live = [_FanOutTarget(engine, rel_path) for engine in engines if not engine.cancel_event.is_set()]
+        if not live: return
+        src_path = self.engines[0]._abs(self.source, rel_path)
+        try:
+            fsrc = open(src_path, 'rb')
+        except OSError as e:
+            for target in live:
+                target.engine._error(f"Could not copy {src_path}: {e}")
+            return
+        with fsrc:
+            live = self._each(_FanOutTarget.open, live, src_path)
+            # Read from the earliest point any destination still needs; each skips what it already has.
+            position = min((target.offset for target in live), default=0)
+            fsrc.seek(position)
+            while live:
+                try:
+                    chunk = fsrc.read(self.chunk_size)
+                except OSError as e:
+                    for target in live:
+                        target.abort()
+                        target.engine._error(f"Could not copy {src_path}: {e}")
+                    return
+                if not chunk: break
+                live = self._each(lambda target: target.write(chunk, position), live, src_path)
+                position += len(chunk)
+        self._each(lambda target: target.finish(src_path), live, src_path)
@@ -0,0 +1,124 @@
+import os
+import sys
+import json
+import time
+import atexit
+import base64
+import secrets
+import socket
+import threading
+import subprocess
+import urllib.request
+import urllib.error
+
+STARTUP_TIMEOUT = 15
+CALL_TIMEOUT = 60
+
+
+class RcloneRcError(Exception):
+    pass
+
+
+class RcloneJob:
+    """An async sync/copy job running inside the daemon; registered like a process so a pair stop cancels it."""
+
+    def __init__(self, daemon, jobid):
+        self.daemon = daemon
+        self.jobid = jobid
+        self.cancelled = False
+
+    def status(self):
+        return self.daemon.call("job/status", {"jobid": self.jobid})
+
+    def stats(self):
+        # Every async job gets its own stats group, so concurrent pairs don't mix their counters.
+        return self.daemon.call("core/stats", {"group": f"job/{self.jobid}"})
+
+    def cancel(self):
+        self.cancelled = True
+        try:
+            self.daemon.call("job/stop", {"jobid": self.jobid})
+        except RcloneRcError:
+            pass
+
+
+class RcloneDaemon:
+    """One long-lived `rclone rcd` on localhost, started on first use and shared by every rclone pair.
+
+    Jobs reuse its connections, directory caches and remote auth tokens across runs. The rc API is
+    protected by a random user/password generated for this process.
+    """
+
+    def __init__(self, log=None, executable="rclone"):
+        self.log = log or (lambda message, level: None)
+        self.executable = executable
+        self.process = None
+        self.url = None
+        self._auth = None
+        self._lock = threading.Lock()
+        atexit.register(self.stop)
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def ensure_started(self):
+        with self._lock:
+            if self.is_alive(): return
+            with socket.socket() as sock:
+                sock.bind(("127.0.0.1", 0))
+                port = sock.getsockname()[1]
+            user, password = "dsync", secrets.token_urlsafe(24)
+            self._auth = "Basic " + base64.b64encode(f"{user}:{password}".encode()).decode()
+            self.url = f"http://127.0.0.1:{port}/"
+            command = [self.executable, "rcd", f"--rc-addr=127.0.0.1:{port}", "--log-level=NOTICE", "--use-json-log"]
+            # Credentials go through the environment: other local users can read a process's command line, not its environment.
+            env = dict(os.environ, RCLONE_RC_USER=user, RCLONE_RC_PASS=password)
+            try:
+                self.process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env,
+                                                start_new_session=sys.platform != "win32")
+            except OSError as e:
+                raise RcloneRcError(f"could not start rclone rcd: {e}") from None
+            deadline = time.monotonic() + STARTUP_TIMEOUT
+            while True:
+                try:
+                    self._post("rc/noop", {}, timeout=2)
+                    break
+                except RcloneRcError:
+                    if self.process.poll() is not None or time.monotonic() > deadline:
+                        self.stop()
+                        raise RcloneRcError("rclone rcd did not start")
+                    time.sleep(0.2)
+            self.log(f"Started rclone rcd on 127.0.0.1:{port} (pid {self.process.pid}).", "INFO")
+
+    def call(self, method, params=None, timeout=CALL_TIMEOUT):
+        self.ensure_started()
+        return self._post(method, params or {}, timeout)
+
+    def _post(self, method, params, timeout):
+        request = urllib.request.Request(self.url + method, data=json.dumps(params).encode('utf-8'), method="POST",
+                                         headers={"Content-Type": "application/json", "Authorization": self._auth})
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return json.loads(response.read() or b"{}")
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get("error") or str(e)
+            except ValueError:
+                message = str(e)
+            raise RcloneRcError(f"{method}: {message}") from None
+        except (OSError, ValueError) as e:
+            raise RcloneRcError(f"{method}: {e}") from None
+
+    def submit(self, command, params):
+        """Starts command (e.g. sync/sync) as an async job and returns its RcloneJob."""
+        result = self.call(command, dict(params, _async=True))
+        return RcloneJob(self, result["jobid"])
+
+    def stop(self):
+        process, self.process = self.process, None
+        if process is None or process.poll() is not None: return
+        try:
+            self._post("core/quit", {}, timeout=2)
+            process.wait(timeout=5)
+        except (RcloneRcError, subprocess.TimeoutExpired):
+            process.kill()
@@ -0,0 +1,73 @@
+import os
+import json
+import hashlib
+import threading
+
+# Files smaller than this are simply copied again after an interruption.
+RESUME_MIN_SIZE = 64 * 1024 * 1024
+# A resumable copy is fsynced and journaled after this many bytes or seconds, whichever comes first.
+CHECKPOINT_BYTES = 256 * 1024 * 1024
+CHECKPOINT_SECONDS = 30.0
+
+
+def new_digest():
+    """Rolling digest of a temp copy's verified prefix; updated as the copy moves past each checkpoint."""
+    return hashlib.blake2b(digest_size=16)
+
+
+class ResumeJournal:
+    """Sidecar JSON journal of partially copied files for one pair, keyed by relative path.
+
+    Each entry records the source size and mtime it belongs to, the offset up to which the file's
+    temp copy is fsynced, and the rolling digest of those bytes. The file is deleted once it is empty.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def paths(self):
+        with self._lock:
+            return list(self._load())
+
+    def get(self, rel_path, size, mtime_ns):
+        """Returns (offset, digest) recorded for this version of the file, or (0, None)."""
+        with self._lock:
+            entry = self._load().get(rel_path)
+        if not entry or entry.get("size") != size or entry.get("mtime_ns") != mtime_ns or "offset" not in entry:
+            return 0, None
+        return int(entry["offset"]), entry.get("digest")
+
+    def update(self, rel_path, size, mtime_ns, offset, digest):
+        with self._lock:
+            self._load()[rel_path] = {"size": size, "mtime_ns": mtime_ns, "offset": offset, "digest": digest}
+            self._flush()
+
+    def remove(self, rel_path):
+        with self._lock:
+            if self._load().pop(rel_path, None) is not None: self._flush()
+
+    def _flush(self):
+        if not self._entries:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,123 @@
+import os
+import json
+import math
+import sqlite3
+import threading
+
+from sync_metrics import SyncMetrics, RunRecord
+from config_store import state_key
+
+HISTORY_FILE = "run_history.db"
+# Runs per pair the dashboard looks at; the table itself is append-only and keeps everything.
+SUMMARY_WINDOW = 200
+# Throughput of the newest runs is compared with the runs before them to spot regressions.
+TREND_RUNS = 5
+
+_METRIC_COLUMNS = ("bytes_transferred", "bytes_total", "files_checked", "files_copied", "files_skipped",
+                   "files_deleted", "errors", "speed_bps", "elapsed_seconds")
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers, or None if it is empty."""
+    if not values: return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _median(values):
+    return percentile(values, 0.5)
+
+
+def summarize(runs):
+    """Aggregates runs (newest first, as returned by RunHistoryStore.recent) into dashboard figures."""
+    durations = [r["finished"] - r["started"] for r in runs if r["finished"]]
+    moving = [r["speed_bps"] for r in runs if r["success"] and r["bytes_transferred"] > 0 and r["speed_bps"]]
+    trend = None
+    if len(moving) >= 2 * TREND_RUNS:
+        recent, earlier = _median(moving[:TREND_RUNS]), _median(moving[TREND_RUNS:])
+        if earlier: trend = recent / earlier - 1
+    return {
+        "runs": len(runs),
+        "success_rate": sum(1 for r in runs if r["success"]) / len(runs) if runs else None,
+        "p50": percentile(durations, 0.5),
+        "p95": percentile(durations, 0.95),
+        "median_bps": _median(moving),
+        "throughput_trend": trend,
+        "last_started": runs[0]["started"] if runs else None,
+        "last_success": bool(runs[0]["success"]) if runs else None,
+    }
+
+
+class RunHistoryStore:
+    """Append-only SQLite log of every pair run, kept next to config.json."""
+
+    def __init__(self, state_dir):
+        self.db_path = os.path.join(state_dir, HISTORY_FILE)
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self._adopted = set()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        with self._init_lock:
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY, source TEXT, destination TEXT, tool TEXT, mode TEXT, "
+                             "started REAL, finished REAL, success INTEGER, exit_code INTEGER, error TEXT, "
+                             "bytes_transferred INTEGER, bytes_total INTEGER, files_checked INTEGER, files_copied INTEGER, "
+                             "files_skipped INTEGER, files_deleted INTEGER, errors INTEGER, speed_bps REAL, elapsed_seconds REAL, options TEXT, pair_id TEXT)")
+                if "pair_id" not in {row[1] for row in conn.execute("PRAGMA table_info(runs)")}:
+                    conn.execute("ALTER TABLE runs ADD COLUMN pair_id TEXT")
+                conn.execute("CREATE INDEX IF NOT EXISTS runs_by_pair ON runs (source, destination, started)")
+                conn.execute("CREATE INDEX IF NOT EXISTS runs_by_id ON runs (pair_id, started)")
+                conn.commit()
+                self._initialized = True
+        return conn
+
+    def append(self, record):
+        m = record.metrics
+        row = (record.pair_key[0], record.pair_key[1], record.tool, record.mode, record.started, record.finished,
+               None if record.success is None else int(record.success), record.exit_code, (record.error or "")[:2000] or None,
+               *(getattr(m, name) for name in _METRIC_COLUMNS), json.dumps(record.options, sort_keys=True), record.pair_id)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(f"INSERT INTO runs (source, destination, tool, mode, started, finished, success, exit_code, error, "
+                             f"{', '.join(_METRIC_COLUMNS)}, options, pair_id) VALUES ({', '.join('?' * len(row))})", row)
+        finally:
+            conn.close()
+
+    def recent(self, pair, limit=SUMMARY_WINDOW):
+        """Returns the newest runs of a pair as dicts, newest first. Runs are found by the pair's id, so they survive path edits."""
+        pair_id = state_key(pair)
+        conn = self._connect()
+        try:
+            if pair_id not in self._adopted:
+                # Runs logged before they carried an id belong to whichever pair still has their paths.
+                with conn:
+                    conn.execute("UPDATE runs SET pair_id = ? WHERE pair_id IS NULL AND source = ? AND destination = ?",
+                                 (pair_id, pair.get('source'), pair.get('destination')))
+                self._adopted.add(pair_id)
+            rows = conn.execute("SELECT * FROM runs WHERE pair_id = ? ORDER BY started DESC LIMIT ?", (pair_id, limit))
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
+
+    def pair_keys(self):
+        conn = self._connect()
+        try:
+            return [(row[0], row[1]) for row in conn.execute("SELECT DISTINCT source, destination FROM runs")]
+        finally:
+            conn.close()
+
+    def load_records(self, pair, limit):
+        """Rebuilds RunRecords (oldest first) so in-memory history survives a restart."""
+        pair_key, records = (pair.get('source'), pair.get('destination')), []
+        for row in reversed(self.recent(pair, limit)):
+            metrics = SyncMetrics(tool=row["tool"] or "", **{name: row[name] or 0 for name in _METRIC_COLUMNS})
+            records.append(RunRecord(pair_key, row["tool"], row["mode"], json.loads(row["options"] or "{}"), started=row["started"],
+                                     finished=row["finished"], success=None if row["success"] is None else bool(row["success"]),
+                                     error=row["error"], metrics=metrics, exit_code=row["exit_code"], pair_id=row["pair_id"]))
+        return records
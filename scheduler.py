@@ -0,0 +1,144 @@
+import heapq
+import itertools
+import time
+
+# Longest wait between retries of a pair that keeps failing.
+MAX_BACKOFF_SECONDS = 3600
+MIN_INTERVAL_SECONDS = 5
+
+
+def _seconds(value, default):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return default
+    return value if value > 0 else default
+
+
+class ScheduleEntry:
+    __slots__ = ("pair", "key", "interval", "priority", "max_staleness", "next_due", "last_success",
+                 "failures", "trigger", "running", "running_full", "stale_reported")
+
+    def __init__(self, pair, key, default_interval, now):
+        self.pair = pair
+        self.key = key
+        self.interval = max(MIN_INTERVAL_SECONDS, _seconds(pair.get('interval'), default_interval))
+        self.priority = _seconds(pair.get('priority'), 1)
+        self.max_staleness = _seconds(pair.get('max_staleness'), None)
+        self.next_due = now
+        # Staleness is measured from when scheduling started until the first success.
+        self.last_success = now
+        self.failures = 0
+        self.trigger = None
+        self.running = False
+        self.running_full = False
+        self.stale_reported = False
+
+    def deadline(self):
+        return self.last_success + self.max_staleness if self.max_staleness else None
+
+
+class PairScheduler:
+    """Decides which pairs are due from a heap of next-due times instead of one global cycle.
+
+    Each pair has its own interval (falling back to the global one), a priority, an optional
+    max_staleness deadline and exponential backoff while it keeps failing. Watch events make a
+    pair due at once without moving its next full sweep.
+    """
+
+    def __init__(self, pairs, default_interval, key_func, log=None):
+        self.default_interval = max(MIN_INTERVAL_SECONDS, _seconds(default_interval, 60))
+        self.key_func = key_func
+        self.log = log or (lambda message, level: None)
+        self.entries = {}
+        self._heap = []
+        self._ready = set()
+        self._seq = itertools.count()
+        now = time.time()
+        for pair in pairs:
+            entry = ScheduleEntry(pair, key_func(pair), self.default_interval, now)
+            self.entries[entry.key] = entry
+            self._push(entry)
+
+    def _push(self, entry):
+        heapq.heappush(self._heap, (entry.next_due, next(self._seq), entry.key))
+
+    def _is_current(self, item):
+        # Heap items are never removed in place; a reschedule just pushes a new one.
+        entry = self.entries.get(item[2])
+        return entry is not None and entry.next_due == item[0] and not entry.running
+
+    def trigger(self, key, paths):
+        """Marks a pair as changed; paths is a set of changed paths or None when a full run is needed."""
+        entry = self.entries.get(key)
+        if entry is None: return
+        if paths is None or entry.trigger is True:
+            entry.trigger = True
+        else:
+            entry.trigger = (entry.trigger or set()) | paths
+
+    def due(self, now):
+        """Returns [(pair, changed_paths)] ready to run, most urgent first; changed_paths None means a full run."""
+        while self._heap and self._heap[0][0] <= now:
+            item = heapq.heappop(self._heap)
+            if self._is_current(item): self._ready.add(item[2])
+        candidates = []
+        for entry in self.entries.values():
+            if entry.running or not (entry.key in self._ready or entry.trigger): continue
+            deadline = entry.deadline()
+            overdue = deadline is not None and now > deadline
+            if overdue and not entry.stale_reported:
+                entry.stale_reported = True
+                self.log(f"Pair '{self._name(entry)}' has not synced successfully for {int(now - entry.last_success)}s "
+                         f"(max staleness {int(entry.max_staleness)}s).", "WARNING")
+            slack = deadline - now if deadline is not None else float('inf')
+            full = entry.key in self._ready or entry.trigger is True
+            # Pairs past their deadline go first, then higher priority, then the tightest deadline.
+            candidates.append(((not overdue, -entry.priority, slack, entry.next_due), entry.pair, None if full else entry.trigger))
+        candidates.sort(key=lambda c: c[0])
+        return [(pair, changed) for _, pair, changed in candidates]
+
+    def started(self, pair, changed_paths):
+        entry = self.entries[self.key_func(pair)]
+        entry.running = True
+        entry.running_full = changed_paths is None
+        entry.trigger = None
+        if entry.running_full: self._ready.discard(entry.key)
+
+    def completed(self, pair, success, now=None):
+        """Reschedules a finished pair; success None means it was skipped (e.g. already running from a manual sync)."""
+        now = now or time.time()
+        entry = self.entries.get(self.key_func(pair))
+        if entry is None: return
+        entry.running = False
+        if success is None:
+            if entry.running_full: entry.next_due = now + MIN_INTERVAL_SECONDS
+        elif success:
+            entry.failures = 0
+            entry.last_success = now
+            entry.stale_reported = False
+            # Watch-triggered runs only cover what changed, so they don't postpone the next full sweep.
+            if entry.running_full: entry.next_due = now + entry.interval
+        else:
+            entry.failures += 1
+            delay = min(max(entry.interval, MAX_BACKOFF_SECONDS), entry.interval * 2 ** min(entry.failures - 1, 16))
+            deadline = entry.deadline()
+            # Retry sooner than the backoff if that still meets the pair's staleness deadline.
+            if deadline is not None and deadline > now: delay = min(delay, max(MIN_INTERVAL_SECONDS, deadline - now))
+            entry.next_due = now + delay
+            self._ready.discard(entry.key)
+            if entry.failures > 1:
+                self.log(f"Pair '{self._name(entry)}' failed {entry.failures} times in a row; next attempt in {int(delay)}s.", "WARNING")
+        self._push(entry)
+
+    def seconds_until_next(self, now):
+        """Time until the next pair that is not yet due becomes due."""
+        while self._heap and not self._is_current(self._heap[0]):
+            heapq.heappop(self._heap)
+        if not self._heap: return float(self.default_interval)
+        return max(0.0, self._heap[0][0] - now)
+
+    @staticmethod
+    def _name(entry):
+        source = entry.pair.get('source') or ''
+        return source.replace('\\', '/').rstrip('/').rsplit('/', 1)[-1]
@@ -12,6 +12,7 @@ VERSION = '1.0.0'
 DESCRIPTION = 'A GUI tool for synchronizing directories using robocopy, rclone, or rsync.'
 AUTHOR = 'Gemini'
 ENTRY_POINT = 'main.py'
+PY_MODULES = ['main', 'gui', 'cli', 'sync_manager', 'native_sync', 'file_index', 'fs_watcher', 'sync_metrics', 'autotune', 'sharding', 'log_buffer', 'hash_cache', 'sync_plan', 'bandwidth', 'scheduler', 'run_history', 'metrics_exporter', 'resume_journal', 'exclusions', 'config_store', 'rclone_rc']
 ICON_FILE = 'DirectorySync.ico'
 REQUIREMENTS_FILE = 'requirements.txt'
 
@@ -97,6 +98,7 @@ class BuildBinaryCommand(build_py):
             'pyinstaller',
             '--noconfirm', # Overwrite output directory without asking
             '--windowed',  # No console window for the GUI
+            '--noupx',     # UPX-compressed binaries are slower to unpack on every start
             f'--icon={ICON_FILE}',
             f'--add-data={ICON_FILE}{separator}.',
             f'--name={NAME}',
@@ -132,10 +134,14 @@ setup(
     description=DESCRIPTION,
     author=AUTHOR,
     packages=find_packages(),
+    py_modules=PY_MODULES,
     install_requires=read_requirements(),
     entry_points={
         'console_scripts': [
-            'directorysync=main:main',
+            'directorysync=cli:main',
+        ],
+        'gui_scripts': [
+            'directorysync-gui=main:main',
         ],
     },
     cmdclass={
@@ -0,0 +1,31 @@
+import os
+
+from exclusions import matcher_for
+
+
+def list_top_dirs(source, exclusions=None):
+    """Returns the non-excluded top-level directory names of a local source."""
+    matcher = matcher_for(exclusions)
+    names = []
+    with os.scandir(source) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False) and not matcher.excluded(entry.name, entry.name, True):
+                names.append(entry.name)
+    return sorted(names)
+
+
+def plan_shards(names, weights, shard_count):
+    """Splits names into at most shard_count groups of similar total weight (greedy longest-first).
+
+    Subtrees without a recorded weight get the average of the known ones, so a
+    first run without history degrades to an even split by count.
+    """
+    known = [weights[n] for n in names if weights.get(n)]
+    default = sum(known) / len(known) if known else 1.0
+    shards = [[] for _ in range(min(shard_count, len(names)))]
+    totals = [0.0] * len(shards)
+    for name in sorted(names, key=lambda n: weights.get(n) or default, reverse=True):
+        i = totals.index(min(totals))
+        shards[i].append(name)
+        totals[i] += weights.get(name) or default
+    return [s for s in shards if s]
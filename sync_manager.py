@@ -5,22 +5,79 @@ import os
 import queue
 import signal
 import sys
-import tempfile
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from native_sync import NativeSyncEngine, FanOutEngine, SyncCancelled, scan_tree
+from file_index import FileIndex
+from config_store import path_key
+from sync_metrics import SyncMetrics, RunRecord, parser_for
+from rclone_rc import RcloneDaemon, RcloneRcError
+from autotune import AutoTuner
+from sharding import list_top_dirs, plan_shards
+from hash_cache import HashCache
+from sync_plan import SyncPlan, plan_from_entries, plan_parser_for
+from bandwidth import BandwidthManager
+from scheduler import PairScheduler
+from run_history import RunHistoryStore
+from resume_journal import ResumeJournal
+from exclusions import MAX_EXCLUDE_ARGV, write_filter_file, prune_filter_files, rebase_exclusions
+import fs_watcher
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_PER_DEVICE = 1
+# Beyond this many changed subtrees one full run is cheaper than many small ones.
+MAX_SUBTREE_RUNS = 8
+# Only the tail of a tool's output is kept; memory stays flat however big the run is.
+OUTPUT_TAIL_LINES = 200
+PROGRESS_INTERVAL = 0.5
+RUN_HISTORY_LENGTH = 50
+# Re-copying small files is cheaper than hashing both sides to prove they were renamed.
+MIN_RENAME_SIZE = 1024 * 1024
+# A plan's scan is handed to the next real run of the pair only if it starts within this window.
+PLAN_REUSE_SECONDS = 120
+RESUME_DIR = "resume"
+FILTER_DIR = "filters"
+RC_POLL_SECONDS = 1.0
 
 class SyncManager:
-    def __init__(self, message_queue):
+    def __init__(self, message_queue, state_dir=None):
         self.message_queue = message_queue
+        self.state_dir = state_dir or os.getcwd()
+        self.file_index = FileIndex(self.state_dir)
+        self.hash_cache = HashCache(self.state_dir)
         self.running = False
         self.main_thread = None
-        self.current_process = None
+        self.processes = {}
+        self.active_pairs = set()
+        self._lock = threading.Lock()
         self.pairs_to_sync = []
         self.interval = 60
+        self.max_workers = DEFAULT_MAX_WORKERS
+        self.max_per_device = DEFAULT_MAX_PER_DEVICE
+        self.watcher = None
+        self.change_queue = queue.Queue()
+        self.run_history = {}
+        self.history_store = RunHistoryStore(self.state_dir)
+        self.tuner = AutoTuner()
+        self._local = threading.local()
+        self._plan_scans = {}
+        self.listeners = []
+        self.bandwidth = BandwidthManager()
+        self.rclone_daemon = RcloneDaemon(self._log)
+        try:
+            prune_filter_files(os.path.join(self.state_dir, FILTER_DIR))
+        except OSError as e:
+            self._log(f"Could not prune old filter files: {e}", "WARNING")
         
-    def start_cycle(self, pairs, interval):
+    def start_cycle(self, pairs, interval, max_workers=None, max_per_device=None, watch=False):
         if not self.running:
             self.running = True
             self.pairs_to_sync = pairs
             self.interval = interval
+            if max_workers: self.max_workers = max(1, int(max_workers))
+            if max_per_device: self.max_per_device = max(1, int(max_per_device))
+            if watch: self._start_watcher(pairs)
             self.main_thread = threading.Thread(target=self._sync_loop, daemon=True)
             self.main_thread.start()
             self._log("Sync cycle started.", "SUCCESS")
@@ -28,107 +85,845 @@ class SyncManager:
     def stop_cycle(self):
         if self.running:
             self.running = False
-            if self.current_process:
-                self._terminate_process()
+            self._terminate_process()
+            self._stop_watcher()
             self._log("Sync cycle stopped.", "WARNING")
     
+    def run_once(self, pairs, max_workers=None, max_per_device=None):
+        """Runs pairs a single time on the calling thread and returns [(pair, success)]."""
+        if self.running: return []
+        self.running = True
+        if max_workers: self.max_workers = max(1, int(max_workers))
+        if max_per_device: self.max_per_device = max(1, int(max_per_device))
+        try:
+            return self._run_pairs(pairs)
+        finally:
+            self.running = False
+
     def run_single_pair(self, pair_data):
         self._log(f"Starting immediate sync for: {os.path.basename(pair_data.get('source'))}", "INFO")
         single_run_thread = threading.Thread(target=self._execute_and_report_status, args=(pair_data,), daemon=True)
         single_run_thread.start()
 
-    def _terminate_process(self):
-        if not self.current_process: return
-        try:
-            if sys.platform == "win32":
-                subprocess.run(f"taskkill /F /T /PID {self.current_process.pid}", shell=True, capture_output=True)
+    def _terminate_process(self, key=None):
+        """Kills the child process of one pair, or of every running pair when key is None."""
+        with self._lock:
+            if key is None:
+                targets = list(self.processes.items())
+                self.processes.clear()
             else:
-                os.killpg(os.getpgid(self.current_process.pid), signal.SIGTERM)
-        except Exception as e:
-            self._log(f"Error terminating process: {e}", "ERROR")
-        finally:
-            self.current_process = None
+                process = self.processes.pop(key, None)
+                targets = [(key, process)] if process else []
+        for _, process in targets:
+            # Native engines and rcd jobs are cancelled in-process; only real child processes are killed.
+            if not isinstance(process, subprocess.Popen):
+                process.cancel()
+                continue
+            try:
+                if sys.platform == "win32":
+                    subprocess.run(f"taskkill /F /T /PID {process.pid}", shell=True, capture_output=True)
+                else:
+                    os.killpg(os.getpgid(process.pid), signal.SIGTERM)
+            except Exception as e:
+                self._log(f"Error terminating process: {e}", "ERROR")
+
+    def _register_process(self, pair, process):
+        with self._lock:
+            self.processes[self._pair_key(pair)] = process
+
+    def _unregister_process(self, pair):
+        with self._lock:
+            self.processes.pop(self._pair_key(pair), None)
+
+    @staticmethod
+    def _pair_key(pair):
+        # Keys runtime bookkeeping only (processes, watchers, shards each get their own); persisted state uses FileIndex.pair_id.
+        return (pair.get('source'), pair.get('destination'))
+
+    @staticmethod
+    def _is_remote(path):
+        # rclone remotes look like "name:path"; single letters are Windows drives.
+        return bool(re.match(r'^[^/\\:]{2,}:', path or ''))
+
+    def _device_key(self, pair):
+        """Groups pairs by the device their destination lives on, for the per-device limit."""
+        dest = pair.get('destination') or ''
+        if self._is_remote(dest):
+            return dest.split(':', 1)[0] + ':'
+        path = os.path.abspath(dest)
+        drive = os.path.splitdrive(path)[0]
+        if drive:
+            return drive.lower()
+        while not os.path.exists(path):
+            parent = os.path.dirname(path)
+            if parent == path: break
+            path = parent
+        try:
+            return os.stat(path).st_dev
+        except OSError:
+            return path
 
     def is_running(self):
         return self.running
+
+    def shutdown(self):
+        """Stops everything, including the shared rclone rcd; call when the app exits."""
+        self.stop_cycle()
+        self._terminate_process()
+        self.rclone_daemon.stop()
+
+    def running_process_count(self):
+        with self._lock:
+            return len(self.processes)
+
+    def _start_watcher(self, pairs):
+        if not fs_watcher.is_supported():
+            self._log("Watch mode needs inotify (Linux); using interval polling only.", "WARNING")
+            return
+        try:
+            self.watcher = fs_watcher.InotifyWatcher(lambda key, paths: self.change_queue.put((key, paths)), log=self._log)
+            watched = 0
+            for pair in pairs:
+                source = pair.get('source')
+                if self._is_remote(source) or not os.path.isdir(source): continue
+                self.watcher.watch(self._pair_key(pair), source, pair.get('exclusions', []))
+                watched += 1
+            self.watcher.start()
+            self._log(f"Watching {watched} source folder(s) for changes; full sweeps still run on each pair's interval.", "INFO")
+        except OSError as e:
+            self._log(f"Could not start file watcher, using interval polling only: {e}", "WARNING")
+            self.watcher = None
+
+    def _stop_watcher(self):
+        if self.watcher:
+            self.watcher.stop()
+            self.watcher = None
+
+    def _wait_for_changes(self, timeout):
+        """Blocks up to timeout for watcher events and returns {pair_key: changed paths or None}."""
+        try:
+            key, paths = self.change_queue.get(timeout=timeout) if timeout > 0 else self.change_queue.get_nowait()
+        except queue.Empty:
+            return {}
+        changed = {key: paths}
+        while True:
+            try:
+                key, paths = self.change_queue.get_nowait()
+            except queue.Empty:
+                return changed
+            if paths is None or (key in changed and changed[key] is None):
+                changed[key] = None
+            else:
+                changed[key] = changed.get(key, set()) | paths
     
     def _sync_loop(self):
-        while self.running:
+        """Dispatches pairs as they fall due, within the global and per-device limits, until stopped."""
+        scheduler = PairScheduler(self.pairs_to_sync, self.interval, self._pair_key, self._log)
+        active = {}
+        device_counts = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sync-pair") as pool:
+            while self.running:
+                try:
+                    for key, paths in self._wait_for_changes(0).items():
+                        scheduler.trigger(key, paths)
+                    for group, changed_paths in self._fanout_groups(scheduler.due(time.time())):
+                        if len(active) >= self.max_workers: break
+                        devices = {self._device_key(pair) for pair in group}
+                        if any(device_counts.get(device, 0) >= self.max_per_device for device in devices): continue
+                        for device in devices:
+                            device_counts[device] = device_counts.get(device, 0) + 1
+                        for pair in group:
+                            scheduler.started(pair, changed_paths)
+                        active[pool.submit(self._execute_group, group, changed_paths)] = (group, devices)
+                    timeout = min(1.0, scheduler.seconds_until_next(time.time()))
+                    if not active:
+                        for key, paths in self._wait_for_changes(timeout).items():
+                            scheduler.trigger(key, paths)
+                        continue
+                    done, _ = wait(active, timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        group, devices = active.pop(future)
+                        for device in devices:
+                            device_counts[device] -= 1
+                        outcomes = [False] * len(group) if future.exception() else future.result()
+                        for pair, success in zip(group, outcomes):
+                            scheduler.completed(pair, success)
+                except Exception as e:
+                    self._log(f"Critical error in sync loop: {e}", "ERROR")
+                    self._emit(("error", f"A critical error occurred: {e}"))
+                    time.sleep(10)
+
+    def _run_pairs(self, pairs):
+        """Runs pairs in parallel, capped globally and per destination device. Returns [(pair, success)]."""
+        pending = [group for group, _ in self._fanout_groups((pair, None) for pair in pairs)]
+        active = {}
+        device_counts = {}
+        results = []
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sync-pair") as pool:
+            while self.running and (pending or active):
+                for group in list(pending):
+                    if len(active) >= self.max_workers: break
+                    devices = {self._device_key(pair) for pair in group}
+                    if any(device_counts.get(device, 0) >= self.max_per_device for device in devices): continue
+                    pending.remove(group)
+                    for device in devices:
+                        device_counts[device] = device_counts.get(device, 0) + 1
+                    active[pool.submit(self._execute_group, group)] = (group, devices)
+                if not active: break
+                done, _ = wait(active, timeout=1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    group, devices = active.pop(future)
+                    for device in devices:
+                        device_counts[device] -= 1
+                    results.extend(self._group_results(group, future))
+        for future, (group, _) in active.items():
+            results.extend(self._group_results(group, future))
+        return results
+
+    @staticmethod
+    def _group_results(group, future):
+        outcomes = [False] * len(group) if future.exception() else future.result()
+        return [(pair, bool(success)) for pair, success in zip(group, outcomes)]
+
+    def _fanout_key(self, pair):
+        """Pairs with equal keys can share one scan and one read of their source; None for pairs that must run alone."""
+        source = pair.get('source')
+        # Incremental, rename-detecting and sharded pairs plan their runs from their own source scans.
+        if pair.get('tool') != 'native' or self._is_remote(source) or pair.get('incremental') or pair.get('detect_renames'): return None
+        if int(pair.get('shards') or 1) > 1: return None
+        return os.path.normcase(os.path.abspath(source)), tuple(pair.get('exclusions', []))
+
+    def _fanout_groups(self, due):
+        """Groups (pair, changed_paths) items into [(pairs, changed_paths)], merging full runs of pairs that share a source."""
+        groups = []
+        by_key = {}
+        for pair, changed_paths in due:
+            key = self._fanout_key(pair) if changed_paths is None else None
+            if key is not None and key in by_key:
+                by_key[key].append(pair)
+                continue
+            group = [pair]
+            if key is not None: by_key[key] = group
+            groups.append((group, changed_paths))
+        return groups
+
+    def _execute_group(self, group, changed_paths=None):
+        """Runs a group from _fanout_groups and returns each pair's result, in order."""
+        if len(group) == 1:
+            return [self._execute_and_report_status(group[0], changed_paths)]
+        keys = [self._pair_key(pair) for pair in group]
+        claimed = []
+        with self._lock:
+            for pair, key in zip(group, keys):
+                if key in self.active_pairs:
+                    self._log(f"Pair '{os.path.basename(pair.get('source', 'Unknown'))}' is already syncing, skipping.", "WARNING")
+                    continue
+                self.active_pairs.add(key)
+                claimed.append(pair)
+        try:
+            if len(claimed) == 1:
+                outcomes = {self._pair_key(claimed[0]): self._run_and_report(claimed[0], os.path.basename(claimed[0].get("source", "Unknown")))}
+            else:
+                outcomes = self._run_fanout(claimed) if claimed else {}
+        finally:
+            with self._lock:
+                for pair in claimed:
+                    self.active_pairs.discard(self._pair_key(pair))
+        return [outcomes.get(key) for key in keys]
+
+    def _run_fanout(self, pairs):
+        """Syncs native pairs sharing a source through one FanOutEngine; each pair is still reported and recorded on its own."""
+        source_name = os.path.basename(pairs[0].get("source", "Unknown"))
+        self._log(f"Fanning out '{source_name}' to {len(pairs)} destinations with one scan and one read: "
+                  + ", ".join(pair['destination'] for pair in pairs), "INFO")
+        records, engines, bandwidth_keys = [], [], []
+        for pair in pairs:
+            self._emit(("status", "Syncing...", pair))
+            records.append(RunRecord(self._pair_key(pair), pair.get('tool'), pair.get('mode'), dict(pair.get('tool_options', {})),
+                                     pair_id=self.file_index.pair_id(pair)))
+            # The shared scan replaces any scan a plan left behind.
+            self._take_plan_scan(pair)
+            bandwidth_key, bucket = self._acquire_bandwidth(pair)
+            bandwidth_keys.append(bandwidth_key)
+            journal = self._journal(pair)
+            engines.append(NativeSyncEngine(pair['source'], pair['destination'], pair.get('mode', 'MIR'), pair.get('exclusions', []),
+                                            pair.get('tool_options', {}).get('workers', 8), self._log,
+                                            bucket if self.bandwidth.is_limited() else None, journal))
+            # Each pair keeps its own entry, so stopping one pair drops only its destination.
+            self._register_process(pair, engines[-1])
+        fanout = FanOutEngine(engines, max(engine.workers for engine in engines), self._log)
+        try:
+            results = [stats for _, stats in fanout.run()]
+        except Exception as e:
+            results = [e] * len(engines)
+        finally:
+            for pair, bandwidth_key in zip(pairs, bandwidth_keys):
+                self._unregister_process(pair)
+                self.bandwidth.release(bandwidth_key)
+        outcomes = {}
+        for pair, record, stats in zip(pairs, records, results):
+            self._local.run = (pair, record)
             try:
-                self._log("Starting sync cycle...", "INFO")
-                for pair in self.pairs_to_sync:
-                    if not self.running: break
-                    self._execute_and_report_status(pair)
-                if self.running:
-                    self._log(f"Cycle finished. Next run in {self.interval}s.", "INFO")
-                    for _ in range(self.interval):
-                        if not self.running: break
-                        time.sleep(1)
-            except Exception as e:
-                self._log(f"Critical error in sync loop: {e}", "ERROR")
-                self.message_queue.put(("error", f"A critical error occurred: {e}"))
-                time.sleep(10)
+                success, error_message = self._native_result(pair, stats)
+            finally:
+                self._local.run = None
+            outcomes[record.pair_key] = self._finish_run(pair, os.path.basename(pair.get("source", "Unknown")), record, success, error_message)
+        return outcomes
 
-    def _execute_and_report_status(self, pair):
+    def _execute_and_report_status(self, pair, changed_paths=None):
         source_name = os.path.basename(pair.get("source", "Unknown"))
+        key = self._pair_key(pair)
+        with self._lock:
+            if key in self.active_pairs:
+                self._log(f"Pair '{source_name}' is already syncing, skipping.", "WARNING")
+                return None
+            self.active_pairs.add(key)
+        try:
+            return self._run_and_report(pair, source_name, changed_paths)
+        finally:
+            with self._lock:
+                self.active_pairs.discard(key)
+
+    def _run_and_report(self, pair, source_name, changed_paths=None):
         self._log(f"Processing pair '{source_name}': {pair['source']} -> {pair['destination']}", "INFO")
-        self.message_queue.put(("status", "Syncing...", pair))
-        success, error_message = self._execute_sync(pair)
+        self._emit(("status", "Syncing...", pair))
+        record = RunRecord(self._pair_key(pair), pair.get('tool'), pair.get('mode'), dict(pair.get('tool_options', {})),
+                           pair_id=self.file_index.pair_id(pair))
+        self._local.run = (pair, record)
+        try:
+            success, error_message = self._execute_sync(pair, changed_paths)
+        finally:
+            self._local.run = None
+        return self._finish_run(pair, source_name, record, success, error_message)
+
+    def _finish_run(self, pair, source_name, record, success, error_message):
+        record.finish(success, error_message)
+        self._record_run(pair, record)
+        if pair.get('auto_tune'):
+            tuned = self.tuner.observe(pair, record)
+            if tuned:
+                change, tuning, options = tuned
+                if change: self._log(f"Auto-tune for '{source_name}': {change}.", "INFO")
+                # Applied by the GUI or CLI thread that owns the config, never here while it may be edited or saved.
+                self._emit(("tuned", pair, tuning, options))
         if success:
-            self.message_queue.put(("status", "Completed", pair))
+            self._emit(("status", "Completed", pair))
             self._log(f"Pair '{source_name}' completed successfully.", "SUCCESS")
         else:
-            self.message_queue.put(("status", "Failed", pair))
+            self._emit(("status", "Failed", pair))
             self._log(f"Pair '{source_name}' failed. {error_message}", "ERROR")
             if error_message:
-                self.message_queue.put(("error", error_message))
+                self._emit(("error", error_message))
+        return success
+
+    def _record_run(self, pair, record):
+        self.get_run_history(pair)
+        with self._lock:
+            self.run_history[record.pair_key].append(record)
+        try:
+            self.history_store.append(record)
+        except Exception as e:
+            self._log(f"Could not save run history: {e}", "WARNING")
+        self._emit(("metrics", pair, record.metrics.snapshot()))
+        self._emit(("run", pair, record))
+        if record.metrics.files_copied or record.metrics.files_deleted:
+            self._log(f"Pair '{os.path.basename(pair.get('source', ''))}': {record.metrics.summary()} in {record.duration:.1f}s.", "INFO")
+
+    def get_run_history(self, pair):
+        """Recent RunRecords of a pair, oldest first; loaded from the history store the first time a pair is asked for."""
+        key = self._pair_key(pair)
+        with self._lock:
+            history = self.run_history.get(key)
+            if history is not None: return list(history)
+        try:
+            records = self.history_store.load_records(pair, RUN_HISTORY_LENGTH)
+        except Exception as e:
+            self._log(f"Could not load run history: {e}", "WARNING")
+            records = []
+        with self._lock:
+            history = self.run_history.setdefault(key, deque(records, maxlen=RUN_HISTORY_LENGTH))
+            return list(history)
+
+    def _current_run(self, pair):
+        """Returns the (pair, RunRecord) being reported for this thread; sub-runs report as their parent pair."""
+        return getattr(self._local, 'run', None) or (pair, None)
+
+    def _add_metrics(self, pair, metrics):
+        _, record = self._current_run(pair)
+        if record is not None:
+            record.metrics.merge(metrics)
+
+    def _execute_sync(self, pair, changed_paths=None):
+        if pair.get('detect_renames') and pair.get('mode') in ('MIR', 'sync') and self._is_local_pair(pair):
+            try:
+                self._apply_local_renames(pair)
+            except Exception as e:
+                self._log(f"Rename detection failed, continuing with a normal sync: {e}", "WARNING")
+        if pair.get('incremental') and not self._is_remote(pair.get('source')):
+            return self._execute_incremental(pair)
+        subtrees = self._subtrees_for_paths(pair, changed_paths) if changed_paths else None
+        if subtrees:
+            self._log(f"Change detected in '{os.path.basename(pair['source'])}', syncing only: {', '.join(subtrees)}", "INFO")
+            for subtree in subtrees:
+                success, error_message = self._execute_tool(self._subtree_pair(pair, subtree))
+                if not success: return success, error_message
+            return True, None
+        return self._execute_full(pair)
+
+    def plan_pair(self, pair):
+        """Works out what a run of the pair would copy and delete without changing anything. Returns a SyncPlan or None."""
+        source_name = os.path.basename(pair.get("source", "Unknown"))
+        self._log(f"Planning '{source_name}' (dry run)...", "INFO")
+        plan = SyncPlan(self._pair_key(pair), pair.get('tool'), pair.get('mode'))
+        try:
+            if pair.get('tool') == 'native':
+                exclusions = pair.get('exclusions', [])
+                src_entries = scan_tree(pair['source'], exclusions)
+                dst_entries = scan_tree(pair['destination'], exclusions)
+                plan_from_entries(plan, src_entries, dst_entries)
+                with self._lock:
+                    self._plan_scans[self.file_index.pair_id(pair)] = (time.monotonic(), self._scan_settings(pair), src_entries, dst_entries)
+            else:
+                error_message = self._plan_with_tool(pair, plan)
+                if error_message:
+                    self._log(f"Plan for '{source_name}' failed. {error_message}", "ERROR")
+                    return None
+        except Exception as e:
+            self._log(f"Plan for '{source_name}' failed: {e}", "ERROR")
+            return None
+        plan.estimated_seconds = self._estimate_duration(pair, plan)
+        self._emit(("plan", pair, plan))
+        self._log(f"Plan for '{source_name}': {plan.summary()}.", "INFO")
+        return plan
+
+    def _plan_with_tool(self, pair, plan):
+        """Runs the pair's tool in list-only mode and parses its listing into plan. Returns an error message or None."""
+        command = self._generate_command(pair, dry_run=True)
+        if not command: return "Failed to generate command."
+        self._log(f"Executing: {command}", "INFO")
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                                   encoding='utf-8', errors='replace', shell=True, start_new_session=True)
+        key = ('plan',) + self._pair_key(pair)
+        with self._lock:
+            self.processes[key] = process
+        tail = deque(maxlen=20)
+        parser = plan_parser_for(pair['tool'], plan, pair['source'], pair['destination'])
+        try:
+            for line in process.stdout:
+                line = line.rstrip()
+                if line and not parser.feed(line): tail.append(line)
+            returncode = process.wait()
+        finally:
+            with self._lock:
+                self.processes.pop(key, None)
+        # 24 is rsync's "source files vanished"; rclone has no such code.
+        failed = returncode >= 8 if pair['tool'] == 'robocopy' else returncode not in ((0, 24) if pair['tool'] == 'rsync' else (0,))
+        return f"{pair['tool']} exited with code {returncode}:\n" + "\n".join(tail) if failed else None
+
+    def _estimate_duration(self, pair, plan):
+        """Estimates run time from the pair's recent throughput; None until a run has moved enough data to measure."""
+        runs = [r for r in self.get_run_history(pair) if r.success and r.metrics.bytes_transferred > 0]
+        if not plan.files_to_copy: return 0.0
+        if not runs: return None
+        elapsed = sum(r.metrics.elapsed_seconds or r.duration for r in runs)
+        bytes_per_second = sum(r.metrics.bytes_transferred for r in runs) / elapsed if elapsed else 0
+        files_per_second = sum(r.metrics.files_copied for r in runs) / elapsed if elapsed else 0
+        if not bytes_per_second: return None
+        # Small files are bound by per-file overhead rather than bandwidth; take whichever limit dominates.
+        by_files = plan.files_to_copy / files_per_second if files_per_second else 0
+        return max(plan.bytes_to_copy / bytes_per_second, by_files)
+
+    @staticmethod
+    def _scan_settings(pair):
+        return (pair.get('source'), pair.get('destination'), pair.get('mode', 'MIR'), tuple(pair.get('exclusions') or ()))
+
+    def _take_plan_scan(self, pair, consume=True):
+        """Returns (src_entries, dst_entries) from a plan made in the last PLAN_REUSE_SECONDS with the pair's current settings, or None."""
+        key = self.file_index.pair_id(pair)
+        with self._lock:
+            cached = self._plan_scans.pop(key, None) if consume else self._plan_scans.get(key)
+        if cached is None or time.monotonic() - cached[0] > PLAN_REUSE_SECONDS: return None
+        # A scan made under other exclusions or another mode would treat the wrong files as extras.
+        if cached[1] != self._scan_settings(pair): return None
+        return cached[2], cached[3]
+
+    def discard_plan_scan(self, pair):
+        """Forgets the scan a plan of the pair left behind; called when the pair is edited."""
+        with self._lock:
+            self._plan_scans.pop(self.file_index.pair_id(pair), None)
 
-    def _execute_sync(self, pair):
+    def _is_local_pair(self, pair):
+        source, dest = pair.get('source'), pair.get('destination')
+        return not self._is_remote(source) and not self._is_remote(dest) and os.path.isdir(source) and os.path.isdir(dest)
+
+    def _apply_local_renames(self, pair):
+        """Finds destination files that MIR would delete whose content matches a new source path, and moves them there."""
+        source, dest = pair['source'], pair['destination']
+        exclusions = pair.get('exclusions', [])
+        src_entries, dst_entries = scan_tree(source, exclusions), scan_tree(dest, exclusions)
+        new = {rel: e for rel, e in src_entries.items() if not e.is_dir and rel not in dst_entries and e.size >= MIN_RENAME_SIZE}
+        extra = {rel: e for rel, e in dst_entries.items() if not e.is_dir and rel not in src_entries and e.size >= MIN_RENAME_SIZE}
+        sizes = {e.size for e in new.values()} & {e.size for e in extra.values()}
+        if not sizes: return 0
+
+        pair_id = self.file_index.pair_id(pair)
+        new_files = {os.path.join(source, *rel.split('/')): (rel, e) for rel, e in new.items() if e.size in sizes}
+        extra_files = {os.path.join(dest, *rel.split('/')): (rel, e) for rel, e in extra.items() if e.size in sizes}
+        src_hashes = self.hash_cache.get_hashes(pair_id, {p: e for p, (_, e) in new_files.items()})
+        dst_hashes = self.hash_cache.get_hashes(pair_id, {p: e for p, (_, e) in extra_files.items()})
+        candidates = {}
+        for path, (rel, e) in extra_files.items():
+            if path in dst_hashes: candidates.setdefault((e.size, dst_hashes[path]), []).append(path)
+
+        moved = 0
+        for path, (rel, e) in new_files.items():
+            matches = candidates.get((e.size, src_hashes.get(path)))
+            if not matches: continue
+            target = os.path.join(dest, *rel.split('/'))
+            try:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.rename(matches.pop(), target)
+                moved += 1
+            except OSError as err:
+                self._log(f"Could not move {target} into place: {err}", "WARNING")
+        if moved:
+            self._take_plan_scan(pair)
+            self._log(f"Detected {moved} renamed/moved file(s) in '{os.path.basename(source)}'; moved them at the destination instead of copying.", "INFO")
+        return moved
+
+    def verify_pair(self, pair):
+        """Compares both sides of a local pair by content, reusing cached hashes for unchanged files."""
+        source_name = os.path.basename(pair.get("source", "Unknown"))
+        if not self._is_local_pair(pair):
+            self._log(f"Verify needs a local or mounted source and destination: '{source_name}'.", "WARNING")
+            return None
+        self._log(f"Verifying '{source_name}'...", "INFO")
+        try:
+            exclusions = pair.get('exclusions', [])
+            src_entries = {r: e for r, e in scan_tree(pair['source'], exclusions).items() if not e.is_dir}
+            dst_entries = {r: e for r, e in scan_tree(pair['destination'], exclusions).items() if not e.is_dir}
+            missing = sorted(set(src_entries) - set(dst_entries))
+            extra = sorted(set(dst_entries) - set(src_entries))
+            common = [r for r in src_entries if r in dst_entries]
+            mismatched = [r for r in common if src_entries[r].size != dst_entries[r].size]
+            same_size = [r for r in common if src_entries[r].size == dst_entries[r].size]
+            pair_id = self.file_index.pair_id(pair)
+            src_files = {os.path.join(pair['source'], *r.split('/')): src_entries[r] for r in same_size}
+            dst_files = {os.path.join(pair['destination'], *r.split('/')): dst_entries[r] for r in same_size}
+            src_hashes = self.hash_cache.get_hashes(pair_id, src_files)
+            dst_hashes = self.hash_cache.get_hashes(pair_id, dst_files)
+            for r in same_size:
+                s = src_hashes.get(os.path.join(pair['source'], *r.split('/')))
+                d = dst_hashes.get(os.path.join(pair['destination'], *r.split('/')))
+                if s is None or s != d: mismatched.append(r)
+        except Exception as e:
+            self._log(f"Verify of '{source_name}' failed: {e}", "ERROR")
+            return None
+        result = {"checked": len(common), "missing": missing, "extra": extra, "mismatched": sorted(mismatched)}
+        self._emit(("verify", pair, result))
+        if missing or mismatched or (extra and pair.get('mode') in ('MIR', 'sync')):
+            details = "\n".join([f"missing: {r}" for r in missing[:20]] + [f"differs: {r}" for r in result['mismatched'][:20]] + [f"extra: {r}" for r in extra[:20]])
+            self._log(f"Verify '{source_name}': {len(missing)} missing, {len(mismatched)} different, {len(extra)} extra of {len(common)} compared.\n{details}", "WARNING")
+        else:
+            self._log(f"Verify '{source_name}': all {len(common)} files match.", "SUCCESS")
+        return result
+
+    def _subtrees_for_paths(self, pair, changed_paths):
+        """Maps watcher paths to top-level subtrees, or None when the root itself changed."""
+        subtrees = set()
+        for rel_path in changed_paths:
+            top, sep, _ = rel_path.partition('/')
+            # A root entry is only safe to sync on its own if it is (still) a directory.
+            if not sep and not os.path.isdir(os.path.join(pair['source'], top)):
+                return None
+            subtrees.add(top)
+        if len(subtrees) > MAX_SUBTREE_RUNS: return None
+        return sorted(subtrees)
+
+    def _execute_incremental(self, pair):
+        """Skips the tool when the source matches the stored index, or runs it only on changed subtrees."""
+        source_name = os.path.basename(pair.get("source", "Unknown"))
+        try:
+            full_sweep = self.file_index.needs_full_sweep(pair)
+            cached = self._take_plan_scan(pair, consume=False)
+            changes = self.file_index.scan(pair, entries=cached[0] if cached else None)
+        except Exception as e:
+            self._log(f"Index scan for '{source_name}' failed, running a full sync: {e}", "WARNING")
+            return self._execute_full(pair)
+
+        if not full_sweep and changes.is_empty():
+            self._log(f"No changes in '{source_name}' since last sync, skipping.", "INFO")
+            return True, None
+        subtrees = None if full_sweep else changes.changed_subtrees()
+        if subtrees is not None and len(subtrees) <= MAX_SUBTREE_RUNS:
+            self._log(f"{len(changes)} changes in '{source_name}', syncing only: {', '.join(subtrees)}", "INFO")
+            for subtree in subtrees:
+                success, error_message = self._execute_tool(self._subtree_pair(pair, subtree))
+                if not success: return success, error_message
+        else:
+            success, error_message = self._execute_full(pair)
+            if not success: return success, error_message
+        try:
+            self.file_index.commit(pair, changes, full_run=subtrees is None or len(subtrees) > MAX_SUBTREE_RUNS)
+        except Exception as e:
+            self._log(f"Could not update index for '{source_name}': {e}", "WARNING")
+        return True, None
+
+    def _subtree_pair(self, pair, subtree):
+        sub_pair = dict(pair)
+        sub_pair['source'] = os.path.join(pair['source'], subtree)
+        dest = pair['destination']
+        if not self._is_remote(dest):
+            sub_pair['destination'] = os.path.join(dest, subtree)
+        elif dest.endswith(':'):
+            # "remote:/sub" would be absolute on sftp-like backends; "remote:sub" stays under the remote's default directory.
+            sub_pair['destination'] = f"{dest}{subtree}"
+        else:
+            sub_pair['destination'] = f"{dest.rstrip('/')}/{subtree}"
+        # Root-anchored exclusions would otherwise be matched against the subtree root.
+        sub_pair['exclusions'] = rebase_exclusions(pair.get('exclusions', []), subtree)
+        # Sub-pairs share the pair's id; the subtree keeps their persisted state (journal, index) apart.
+        sub_pair['subtree'] = f"{pair['subtree']}/{subtree}" if pair.get('subtree') else subtree
+        return sub_pair
+
+    def _execute_full(self, pair):
+        source = pair.get('source')
+        if int(pair.get('shards') or 1) > 1 and not self._is_remote(source) and os.path.isdir(source):
+            return self._execute_sharded(pair)
+        return self._execute_tool(pair)
+
+    def _execute_sharded(self, pair):
+        """Runs one tool process per group of top-level subtrees, plus a root pass that excludes them all.
+
+        The root pass copies root-level files and, for MIR modes, deletes anything at the
+        destination root that is gone from the source; excluded subtrees are never purged.
+        """
+        source_name = os.path.basename(pair.get("source", "Unknown"))
+        try:
+            names = list_top_dirs(pair['source'], pair.get('exclusions', []))
+            weights = self.file_index.load_weights(pair)
+        except Exception as e:
+            self._log(f"Could not shard '{source_name}', running it as one job: {e}", "WARNING")
+            return self._execute_tool(pair)
+        if len(names) < 2:
+            return self._execute_tool(pair)
+
+        shards = plan_shards(names, weights, int(pair['shards']))
+        # No job of a sharded run covers the tree the plan scanned, so its scan is dropped.
+        self._take_plan_scan(pair)
+        root_pair = dict(pair, exclusions=list(pair.get('exclusions', [])) + [f"/{name}/" for name in names])
+        self._log(f"Syncing '{source_name}' as {len(shards)} shard(s) over {len(names)} subtrees plus a root pass.", "INFO")
+        event_pair, parent_record = self._current_run(pair)
+        lock = threading.Lock()
+        new_weights = {}
+        failures = []
+
+        def run_job(label, job_pair):
+            record = RunRecord(self._pair_key(job_pair), pair.get('tool'), pair.get('mode'), {})
+            self._local.run = (event_pair, record)
+            try:
+                success, error_message = self._execute_tool(job_pair)
+            finally:
+                self._local.run = None
+            record.finish(success, error_message)
+            with lock:
+                if parent_record is not None:
+                    parent_record.metrics.merge(record.metrics)
+                    if record.exit_code is not None: parent_record.exit_code = max(record.exit_code, parent_record.exit_code or 0)
+                if label is not None: new_weights[label] = record.metrics.files_checked or 1
+                if not success: failures.append(f"[{label or 'root'}] {error_message}")
+            return success
+
+        def run_shard(shard):
+            for name in shard:
+                run_job(name, self._subtree_pair(pair, name))
+
+        with ThreadPoolExecutor(max_workers=len(shards) + 1, thread_name_prefix="sync-shard") as pool:
+            futures = [pool.submit(run_job, None, root_pair)] + [pool.submit(run_shard, shard) for shard in shards]
+            for future in futures:
+                future.result()
+        if parent_record is not None:
+            # Shards overlap in time; let the run's wall clock determine elapsed time and speed.
+            parent_record.metrics.elapsed_seconds = 0
+            parent_record.metrics.speed_bps = 0.0
+        try:
+            self.file_index.save_weights(pair, new_weights)
+        except Exception as e:
+            self._log(f"Could not save shard weights for '{source_name}': {e}", "WARNING")
+        if failures:
+            return False, f"{len(failures)} shard job(s) failed:\n" + "\n".join(failures)
+        return True, None
+
+    def _acquire_bandwidth(self, pair):
+        """Registers a job with the bandwidth budget under its reporting pair, so shards and subtree runs split one share."""
+        key = self._pair_key(self._current_run(pair)[0])
+        return key, self.bandwidth.acquire(key, pair.get('priority', 1))
+
+    def _execute_tool(self, pair):
+        if pair.get('tool') == 'native':
+            return self._execute_native(pair)
+        bandwidth_key, _ = self._acquire_bandwidth(pair)
+        bwlimit = None
         try:
-            command = self._generate_command(pair)
+            bwlimit = self.bandwidth.reserve_job_rate(bandwidth_key)
+            # rcd jobs share the daemon's global bandwidth limit, so a per-pair share needs its own process.
+            if pair['tool'] == 'rclone' and pair.get('tool_options', {}).get('use_rcd') and not bwlimit:
+                return self._execute_rclone_rc(pair)
+            # External tools keep the rate they start with; it stays reserved until they exit.
+            command = self._generate_command(pair, bwlimit=bwlimit)
             if not command:
                 return False, "Failed to generate command."
             self._log(f"Executing: {command}", "INFO")
-            self.current_process = subprocess.Popen(
+            process = subprocess.Popen(
                 command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
                 text=True, encoding='utf-8', errors='replace',
                 shell=True, start_new_session=True
             )
-            stdout, stderr = self.current_process.communicate()
-            returncode = self.current_process.returncode
+            self._register_process(pair, process)
+            parser = parser_for(pair['tool'], pair.get('mode'))
+            stdout_tail, stderr_tail = self._stream_output(process, pair, parser)
+            returncode = process.wait()
+            self._add_metrics(pair, parser.metrics)
+            _, record = self._current_run(pair)
+            # Shards and subtree runs share a record; keep the worst exit code.
+            if record is not None: record.exit_code = max(returncode, record.exit_code or 0)
             if pair['tool'] == 'robocopy':
                 if returncode < 8:
-                    if stdout and stdout.strip(): self._log(f"Robocopy output:\n{stdout.strip()}", "INFO")
+                    if stdout_tail: self._log("Robocopy output:\n" + "\n".join(stdout_tail), "INFO")
                     return True, None
                 else:
-                    return False, f"Robocopy failed (code {returncode}): {stderr.strip()}"
+                    output = "\n".join(list(stdout_tail)[-20:] + list(stderr_tail))
+                    return False, f"Robocopy failed (code {returncode}):\n{output}"
             elif pair['tool'] == 'rclone':
                 if returncode == 0:
                     return True, None
                 else:
-                    log_content = self._read_and_delete_temp_log(command)
-                    return False, f"Rclone failed (code {returncode}):\n{log_content}\n{stderr.strip()}"
+                    return False, f"Rclone failed (code {returncode}):\n" + "\n".join(parser.display(line) for line in stderr_tail)
+            elif pair['tool'] == 'rsync':
+                if returncode == 0:
+                    return True, None
+                elif returncode == 24:
+                    self._log("Rsync: some source files vanished during the transfer.", "WARNING")
+                    return True, None
+                else:
+                    return False, f"Rsync failed (code {returncode}):\n" + "\n".join(stderr_tail)
         except Exception as e:
             return False, f"Exception during execution: {e}"
         finally:
-            self.current_process = None
+            self._unregister_process(pair)
+            self.bandwidth.release(bandwidth_key, bwlimit)
         return False, "Unknown error."
 
-    def _read_and_delete_temp_log(self, command_str):
+    def _execute_rclone_rc(self, pair):
+        """Runs an rclone pair as an async job of the shared rcd, polling its stats instead of parsing output."""
+        command, params = self._generate_rc_job(pair)
+        parser = parser_for('rclone')
+        event_pair, record = self._current_run(pair)
+        try:
+            job = self.rclone_daemon.submit(command, params)
+        except RcloneRcError as e:
+            return False, f"Rclone rcd job could not be started: {e}"
+        self._log(f"Submitted rclone {command} job {job.jobid} for '{os.path.basename(pair['source'])}'.", "INFO")
+        self._register_process(pair, job)
+        try:
+            while True:
+                time.sleep(RC_POLL_SECONDS)
+                status = job.status()
+                if parser.update(job.stats()):
+                    self._emit(("metrics", event_pair, parser.metrics.snapshot()))
+                    self._emit(("progress", event_pair, parser.metrics.summary()))
+                if status.get("finished"): break
+        except RcloneRcError as e:
+            job.cancel()
+            return False, f"Lost track of rclone job {job.jobid}: {e}"
+        finally:
+            self._unregister_process(pair)
+        self._add_metrics(pair, parser.metrics)
+        if record is not None: record.exit_code = max(0 if status.get("success") else 1, record.exit_code or 0)
+        if status.get("success"): return True, None
+        if job.cancelled: return False, "Rclone job cancelled."
+        return False, f"Rclone job {job.jobid} failed: {status.get('error') or 'unknown error'}"
+
+    def _journal(self, pair):
+        """The pair's resume journal, named by its state key; one written under the old path key is picked up."""
+        resume_dir = os.path.join(self.state_dir, RESUME_DIR)
+        path, legacy = os.path.join(resume_dir, f"{self.file_index.pair_id(pair)}.json"), os.path.join(resume_dir, f"{path_key(pair)}.json")
+        if legacy != path and os.path.exists(legacy) and not os.path.exists(path):
+            try:
+                os.replace(legacy, path)
+            except OSError:
+                pass
+        return ResumeJournal(path)
+
+    def _execute_native(self, pair):
+        options = pair.get('tool_options', {})
+        bandwidth_key, bucket = self._acquire_bandwidth(pair)
+        journal = self._journal(pair)
+        engine = NativeSyncEngine(pair['source'], pair['destination'], pair.get('mode', 'MIR'), pair.get('exclusions', []),
+                                  options.get('workers', 8), self._log, bucket if self.bandwidth.is_limited() else None, journal)
+        self._register_process(pair, engine)
+        entries = self._take_plan_scan(pair)
+        if entries: self._log(f"Reusing the scan from the last plan of '{os.path.basename(pair['source'])}'.", "INFO")
         try:
-            log_path_arg = [arg for arg in command_str.split() if arg.startswith('--log-file=')]
-            if log_path_arg:
-                log_path = log_path_arg[0].split('=', 1)[1].strip('"')
-                if os.path.exists(log_path):
-                    with open(log_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    os.remove(log_path)
-                    return content
+            stats = engine.run(entries)
         except Exception as e:
-            return f"(Could not read/delete log file: {e})"
-        return "(Log file not found or specified)"
+            stats = e
+        finally:
+            self._unregister_process(pair)
+            self.bandwidth.release(bandwidth_key)
+        return self._native_result(pair, stats)
+
+    def _native_result(self, pair, stats):
+        """Turns a native engine's stats, or the exception that stopped it, into (success, error_message)."""
+        if isinstance(stats, SyncCancelled):
+            return False, "Native sync cancelled."
+        if isinstance(stats, Exception):
+            return False, f"Exception during execution: {stats}"
+        self._add_metrics(pair, SyncMetrics(tool="native", bytes_transferred=stats['bytes_copied'], files_checked=stats['files_checked'],
+                                            files_copied=stats['files_copied'], files_skipped=stats['files_checked'] - stats['files_copied'],
+                                            files_deleted=stats['files_deleted'], errors=len(stats['errors']), elapsed_seconds=stats['elapsed']))
+        summary = (f"Native sync: {stats['files_copied']} files copied ({stats['bytes_copied'] / 1048576:.1f} MB), "
+                   f"{stats['files_deleted']} deleted in {stats['elapsed']:.1f}s.")
+        if stats['errors']:
+            return False, f"{summary}\n" + "\n".join(stats['errors'][:50])
+        self._log(summary, "INFO")
+        return True, None
 
-    def _generate_command(self, pair):
+    def _stream_output(self, process, pair, parser):
+        """Reads stdout and stderr line by line into bounded tails, emitting throttled progress and metrics events."""
+        stdout_tail = deque(maxlen=OUTPUT_TAIL_LINES)
+        stderr_tail = deque(maxlen=OUTPUT_TAIL_LINES)
+        progress = {"lines": 0, "last_emit": 0.0, "has_metrics": False}
+        lock = threading.Lock()
+        event_pair, _ = self._current_run(pair)
+
+        def consume(stream, tail):
+            for line in stream:
+                line = line.rstrip()
+                if not line: continue
+                tail.append(line)
+                with lock:
+                    if parser.feed(line): progress["has_metrics"] = True
+                    progress["lines"] += 1
+                    now = time.monotonic()
+                    if now - progress["last_emit"] < PROGRESS_INTERVAL: continue
+                    progress["last_emit"] = now
+                    if progress["has_metrics"]:
+                        metrics = parser.metrics.snapshot()
+                        text = metrics.summary()
+                    else:
+                        metrics = None
+                        text = f"{progress['lines']} lines | {parser.display(line).strip()[:120]}"
+                if metrics is not None: self._emit(("metrics", event_pair, metrics))
+                self._emit(("progress", event_pair, text))
+
+        stderr_thread = threading.Thread(target=consume, args=(process.stderr, stderr_tail), daemon=True)
+        stderr_thread.start()
+        consume(process.stdout, stdout_tail)
+        stderr_thread.join()
+        return stdout_tail, stderr_tail
+
+    def _generate_command(self, pair, dry_run=False, bwlimit=None):
         source, dest, tool, mode = pair['source'], pair['destination'], pair['tool'], pair['mode']
         exclusions = pair.get('exclusions', [])
         options = pair.get('tool_options', {})
@@ -140,31 +935,47 @@ class SyncManager:
             
             base_cmd = f'robocopy "{source}" "{dest}"'
             mode_opt = {"MIR": "/MIR", "E-Copy": "/E"}.get(mode, "")
-            common_opts = f"/MT:{threads} /R:{retries} /W:{wait} /Z /COPY:DAT /NP /NJH /NJS"
+            # robocopy ignores /IPG in multithreaded mode, so a limited run copies on one stream that pauses
+            # (in ms) after each 64 KB block.
+            stream_opt = f"/IPG:{max(1, int(65536 * 1000 / bwlimit))}" if bwlimit else f"/MT:{threads}"
+            common_opts = f"{stream_opt} /R:{retries} /W:{wait} /Z /COPY:DAT /NP /NJH /BYTES"
+            if dry_run: common_opts += " /L /FP"
             
             exclude_dirs = []
             exclude_files = []
             for p in exclusions:
                 pattern = p.strip()
-                if not pattern:
+                if not pattern or pattern.startswith('#'):
                     continue
                 
                 # Convention: If it ends with a slash, it's a directory for /XD.
                 if pattern.endswith('/') or pattern.endswith('\\'):
                     # Robocopy wants dir names without the trailing slash.
                     cleaned_p = pattern.rstrip('/\\')
-                    exclude_dirs.append('"' + cleaned_p + '"')
+                    # A leading slash anchors the directory to the source root; robocopy needs a full path for that.
+                    # The destination path is excluded too, or /MIR would purge that folder there as an extra.
+                    if cleaned_p.startswith('/') or cleaned_p.startswith('\\'):
+                        anchored = cleaned_p.lstrip('/\\')
+                        exclude_dirs.append(os.path.join(dest, anchored))
+                        cleaned_p = os.path.join(source, anchored)
+                    exclude_dirs.append(cleaned_p)
                 else:
                     # Otherwise, it's a file/path pattern for /XF.
-                    exclude_files.append('"' + pattern + '"')
+                    exclude_files.append(pattern)
 
             exclude_opts = []
-            if exclude_dirs:
-                # Group all directory exclusions under a single /XD flag.
-                exclude_opts.append('/XD ' + ' '.join(exclude_dirs))
-            if exclude_files:
-                # Group all file exclusions under a single /XF flag.
-                exclude_opts.append('/XF ' + ' '.join(exclude_files))
+            if self._exclusions_too_long(exclude_dirs + exclude_files):
+                # A job file lists each value on its own tab-indented line under its switch.
+                lines = (['/XD'] + [f'\t{d}' for d in exclude_dirs] if exclude_dirs else []) + \
+                        (['/XF'] + [f'\t{f}' for f in exclude_files] if exclude_files else [])
+                exclude_opts.append(f'/JOB:"{self._filter_file(lines, "rcj")}"')
+            else:
+                if exclude_dirs:
+                    # Group all directory exclusions under a single /XD flag.
+                    exclude_opts.append('/XD ' + ' '.join(f'"{d}"' for d in exclude_dirs))
+                if exclude_files:
+                    # Group all file exclusions under a single /XF flag.
+                    exclude_opts.append('/XF ' + ' '.join(f'"{f}"' for f in exclude_files))
             
             return f'{base_cmd} {mode_opt} {common_opts} {" ".join(exclude_opts)}'
         
@@ -174,25 +985,102 @@ class SyncManager:
             multi_thread = options.get('multi_thread_streams', 4)
 
             action = 'sync' if mode == 'sync' else 'copy'
-            with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.log', encoding='utf-8') as log_file:
-                log_path = log_file.name
+            # JSON logs go to stderr so they can be streamed and their stats blocks parsed.
+            common_opts = f'--checkers={checkers} --transfers={transfers} --multi-thread-streams={multi_thread} --update --copy-links --log-level=INFO --use-json-log --stats=2s'
+            # rclone turns renames into server-side moves itself when both sides support hashes.
+            if pair.get('detect_renames') and action == 'sync': common_opts += ' --track-renames'
+            if dry_run: common_opts += ' --dry-run'
+            if bwlimit: common_opts += f' --bwlimit={max(1, int(bwlimit / 1024))}k'
             
-            common_opts = f'--checkers={checkers} --transfers={transfers} --multi-thread-streams={multi_thread} --update --copy-links --log-level=INFO --log-file="{log_path}"'
-            
-            exclude_opts = []
+            patterns = []
             for pattern in exclusions:
                 pattern = pattern.strip()
-                if not pattern: continue
+                if not pattern or pattern.startswith('#'): continue
                 if pattern.endswith('/') or pattern.endswith('\\'):
                     pattern = pattern.rstrip('/\\') + "/**"
-                exclude_opts.append(f'--exclude "{pattern}"')
+                patterns.append(pattern)
+            if self._exclusions_too_long(patterns):
+                exclude_opts = [f'--exclude-from "{self._filter_file(patterns)}"']
+            else:
+                exclude_opts = [f'--exclude "{pattern}"' for pattern in patterns]
 
             return f'rclone {action} "{source}" "{dest}" {common_opts} {" ".join(exclude_opts)}'
+
+        elif tool == 'rsync':
+            transfer_mode = options.get('transfer_mode', 'auto')
+            compress_level = int(options.get('compress_level', 0))
+
+            opts = ['-a', '--dry-run --out-format="%i %l %n"'] if dry_run else ['-a', '--info=progress2,stats2']
+            if mode == 'MIR': opts.append('--delete')
+            # rsync defaults to whole-file for local paths and delta for remote ones; 'auto' keeps that.
+            if transfer_mode == 'whole': opts.append('--whole-file')
+            elif transfer_mode == 'delta': opts.append('--no-whole-file')
+            if compress_level > 0: opts.append(f'-z --compress-level={compress_level}')
+            if options.get('inplace', False): opts.append('--inplace')
+            if options.get('compare', 'mtime') == 'checksum': opts.append('--checksum')
+            # Keep interrupted files so the next run delta-transfers the rest (--inplace already keeps them in place).
+            if not dry_run and not options.get('inplace', False): opts.append('--partial-dir=.dsync-partial')
+            if bwlimit: opts.append(f'--bwlimit={max(1, int(bwlimit / 1024))}')
+
+            patterns = []
+            for pattern in exclusions:
+                pattern = pattern.strip()
+                if not pattern or pattern.startswith('#'): continue
+                # rsync already treats a trailing slash as "directories only".
+                if pattern.endswith('\\'): pattern = pattern.rstrip('\\') + '/'
+                patterns.append(pattern)
+            if self._exclusions_too_long(patterns):
+                exclude_opts = [f'--exclude-from="{self._filter_file(patterns)}"']
+            else:
+                exclude_opts = [f'--exclude "{pattern}"' for pattern in patterns]
+
+            # The trailing slash makes rsync copy the contents of source, not the folder itself.
+            return f'rsync {" ".join(opts)} {" ".join(exclude_opts)} "{source.rstrip("/")}/" "{dest}"'
         
         return None
 
+    @staticmethod
+    def _generate_rc_job(pair):
+        """The rc equivalent of the rclone command line: (command, params) for sync/sync or sync/copy."""
+        options = pair.get('tool_options', {})
+        command = 'sync/sync' if pair['mode'] == 'sync' else 'sync/copy'
+        config = {"Checkers": int(options.get('checkers', 16)), "Transfers": int(options.get('transfers', 8)),
+                  "MultiThreadStreams": int(options.get('multi_thread_streams', 4)), "UpdateOlder": True}
+        if pair.get('detect_renames') and command == 'sync/sync': config["TrackRenames"] = True
+        params = {"srcFs": pair['source'], "dstFs": pair['destination'], "_config": config}
+        rules = []
+        for pattern in pair.get('exclusions', []):
+            pattern = pattern.strip()
+            if not pattern or pattern.startswith('#'): continue
+            if pattern.endswith('/') or pattern.endswith('\\'):
+                pattern = pattern.rstrip('/\\') + "/**"
+            rules.append(pattern)
+        # Filters travel in the JSON body, so long exclusion lists need no filter file here.
+        if rules: params["_filter"] = {"ExcludeRule": rules}
+        return command, params
+
+    @staticmethod
+    def _exclusions_too_long(patterns):
+        return sum(len(p) + 14 for p in patterns) > MAX_EXCLUDE_ARGV
+
+    def _filter_file(self, lines, extension="txt"):
+        """Writes exclusions that would overflow the command line to a filter file under the state directory."""
+        return write_filter_file(os.path.join(self.state_dir, FILTER_DIR), lines, extension)
+
+    def add_listener(self, callback):
+        """Calls callback(event) for every event put on message_queue, from the thread that emits it."""
+        self.listeners.append(callback)
+
+    def _emit(self, event):
+        self.message_queue.put(event)
+        for callback in self.listeners:
+            try:
+                callback(event)
+            except Exception:
+                pass
+
     def _log(self, message, level):
         try:
-            self.message_queue.put(("log", message, level))
+            self._emit(("log", message, level))
         except Exception:
             pass
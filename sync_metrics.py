@@ -0,0 +1,240 @@
+import re
+import json
+import time
+from dataclasses import dataclass, field, asdict, replace
+from typing import Optional
+
+
+@dataclass
+class SyncMetrics:
+    """Counters for one tool run, or the sum of several runs of the same pair."""
+    tool: str = ""
+    bytes_transferred: int = 0
+    bytes_total: int = 0
+    files_checked: int = 0
+    files_copied: int = 0
+    files_skipped: int = 0
+    files_deleted: int = 0
+    errors: int = 0
+    speed_bps: float = 0.0
+    eta_seconds: Optional[float] = None
+    elapsed_seconds: float = 0.0
+
+    def merge(self, other):
+        for name in ("bytes_transferred", "bytes_total", "files_checked", "files_copied",
+                     "files_skipped", "files_deleted", "errors", "elapsed_seconds"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.tool = self.tool or other.tool
+        self.eta_seconds = None
+        self.speed_bps = self.bytes_transferred / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def snapshot(self):
+        return replace(self)
+
+    def summary(self):
+        parts = [f"{self.files_copied} copied"]
+        if self.files_checked: parts.append(f"{self.files_checked} checked")
+        parts.append(f"{self.bytes_transferred / 1048576:.1f} MB")
+        if self.bytes_total: parts.append(f"{100 * self.bytes_transferred / self.bytes_total:.0f}%")
+        if self.speed_bps: parts.append(f"{self.speed_bps / 1048576:.1f} MB/s")
+        if self.eta_seconds is not None: parts.append(f"ETA {int(self.eta_seconds)}s")
+        return ", ".join(parts)
+
+    def to_dict(self):
+        return asdict(self)
+
+
+@dataclass
+class RunRecord:
+    """One run of a pair: timing, outcome, metrics and the settings it ran with."""
+    pair_key: tuple
+    tool: str
+    mode: str
+    options: dict
+    started: float = field(default_factory=time.time)
+    finished: Optional[float] = None
+    success: Optional[bool] = None
+    error: Optional[str] = None
+    metrics: SyncMetrics = field(default_factory=SyncMetrics)
+    exit_code: Optional[int] = None
+    pair_id: Optional[str] = None
+
+    @property
+    def duration(self):
+        return (self.finished or time.time()) - self.started
+
+    def finish(self, success, error=None):
+        self.finished = time.time()
+        self.success = success
+        self.error = error
+        if not self.metrics.elapsed_seconds:
+            self.metrics.elapsed_seconds = self.duration
+        if not self.metrics.speed_bps and self.metrics.elapsed_seconds:
+            self.metrics.speed_bps = self.metrics.bytes_transferred / self.metrics.elapsed_seconds
+
+
+class OutputParser:
+    tool = ""
+
+    def __init__(self):
+        self.metrics = SyncMetrics(tool=self.tool)
+
+    def feed(self, line):
+        """Parses one line of output. Returns True if the metrics changed."""
+        return False
+
+    def display(self, line):
+        return line
+
+
+_UNITS = {'': 1, 'b': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3, 't': 1024 ** 4}
+
+
+def _parse_duration(text):
+    parts = [float(p) for p in text.split(':')]
+    seconds = 0.0
+    for p in parts:
+        seconds = seconds * 60 + p
+    return seconds
+
+
+class RobocopyParser(OutputParser):
+    """Counts per-file lines as they stream and reads the job summary table at the end (needs /BYTES, no /NJS).
+
+    robocopy lists extras whether or not it purges them, so they count as deleted only with purge (/MIR).
+    """
+    tool = "robocopy"
+    _FILE_LINE = re.compile(r'^\s*(New File|Newer|Older|Changed|Tweaked|\*EXTRA File)\s+(\d+)\s')
+    _SUMMARY = re.compile(r'^\s*(Dirs|Files|Bytes|Times)\s*:\s*(.+)$')
+    _SPEED = re.compile(r'^\s*Speed\s*:\s*([\d.,]+)\s+Bytes/sec', re.IGNORECASE)
+    _SIZE = re.compile(r'([\d.]+)(?:\s+([kmgt]))?(?=\s|$)', re.IGNORECASE)
+
+    def __init__(self, purge=False):
+        super().__init__()
+        self.purge = purge
+
+    def feed(self, line):
+        m = self._FILE_LINE.match(line)
+        if m:
+            if m.group(1) == "*EXTRA File":
+                if self.purge: self.metrics.files_deleted += 1
+            else:
+                self.metrics.files_copied += 1
+                self.metrics.bytes_transferred += int(m.group(2))
+            return True
+        m = self._SUMMARY.match(line)
+        if m:
+            label, values = m.group(1), m.group(2)
+            if label == "Files":
+                nums = [int(v) for v in values.split()[:6]]
+                if len(nums) == 6:
+                    total, copied, skipped, _, failed, extras = nums
+                    self.metrics.files_checked, self.metrics.files_copied = total, copied
+                    self.metrics.files_skipped, self.metrics.errors = skipped, failed
+                    self.metrics.files_deleted = extras if self.purge else 0
+            elif label == "Bytes":
+                sizes = [float(n) * _UNITS[(u or '').lower()] for n, u in self._SIZE.findall(values)]
+                if len(sizes) >= 2:
+                    self.metrics.bytes_total, self.metrics.bytes_transferred = int(sizes[0]), int(sizes[1])
+            elif label == "Times":
+                self.metrics.elapsed_seconds = _parse_duration(values.split()[0])
+            return True
+        m = self._SPEED.match(line)
+        if m:
+            self.metrics.speed_bps = float(m.group(1).replace(',', ''))
+            return True
+        return False
+
+
+class RcloneParser(OutputParser):
+    """Reads the stats block of rclone's --use-json-log output (or of an rcd job's core/stats)."""
+    tool = "rclone"
+
+    def feed(self, line):
+        stats = self._decode(line).get("stats")
+        if not stats: return False
+        return self.update(stats)
+
+    def update(self, stats):
+        """Applies one stats block; the rc API's core/stats returns the same fields."""
+        m = self.metrics
+        m.bytes_transferred = int(stats.get("bytes", 0))
+        m.bytes_total = int(stats.get("totalBytes", 0))
+        m.files_copied = int(stats.get("transfers", 0))
+        m.files_checked = int(stats.get("checks", 0))
+        m.files_skipped = max(0, m.files_checked - m.files_copied)
+        m.files_deleted = int(stats.get("deletes", 0))
+        m.errors = int(stats.get("errors", 0))
+        m.speed_bps = float(stats.get("speed") or 0)
+        m.eta_seconds = stats.get("eta")
+        m.elapsed_seconds = float(stats.get("elapsedTime") or 0)
+        return True
+
+    def display(self, line):
+        record = self._decode(line)
+        if not record: return line
+        return f"{record.get('level', 'info').upper()}: {record.get('msg', '').strip()}"
+
+    @staticmethod
+    def _decode(line):
+        if not line.startswith('{'): return {}
+        try:
+            return json.loads(line)
+        except ValueError:
+            return {}
+
+
+class RsyncParser(OutputParser):
+    """Reads --info=progress2 lines while running and the --info=stats2 block at the end."""
+    tool = "rsync"
+    _PROGRESS = re.compile(r'^\s*([\d,]+)\s+(\d+)%\s+([\d.,]+)([kKMGT]?)B/s\s+(\d+:\d{2}:\d{2})(.*)$')
+    _TO_CHECK = re.compile(r'(?:ir|to)-chk=(\d+)/(\d+)')
+    _XFR = re.compile(r'xfr#(\d+)')
+    _STATS = {
+        "Number of files": "files_checked",
+        "Number of regular files transferred": "files_copied",
+        "Number of deleted files": "files_deleted",
+        "Total file size": "bytes_total",
+        "Total transferred file size": "bytes_transferred",
+    }
+    _RATE = re.compile(r'^sent [\d,]+ bytes\s+received [\d,]+ bytes\s+([\d.,]+) bytes/sec')
+
+    def feed(self, line):
+        m = self._PROGRESS.match(line)
+        if m:
+            self.metrics.bytes_transferred = int(m.group(1).replace(',', ''))
+            percent = int(m.group(2))
+            if percent: self.metrics.bytes_total = self.metrics.bytes_transferred * 100 // percent
+            self.metrics.speed_bps = float(m.group(3).replace(',', '')) * _UNITS[m.group(4).lower()]
+            tail = m.group(6)
+            # The time column is an ETA while running and the elapsed time on the final line.
+            if 'xfr#' in tail or 'chk' in tail:
+                self.metrics.elapsed_seconds = _parse_duration(m.group(5))
+                self.metrics.eta_seconds = None
+            else:
+                self.metrics.eta_seconds = _parse_duration(m.group(5))
+            chk = self._TO_CHECK.search(tail)
+            if chk: self.metrics.files_checked = int(chk.group(2)) - int(chk.group(1))
+            xfr = self._XFR.search(tail)
+            if xfr: self.metrics.files_copied = int(xfr.group(1))
+            return True
+        label, sep, value = line.strip().partition(':')
+        if sep and label in self._STATS:
+            number = re.match(r'\s*([\d,]+)', value)
+            if number:
+                setattr(self.metrics, self._STATS[label], int(number.group(1).replace(',', '')))
+                self.metrics.files_skipped = max(0, self.metrics.files_checked - self.metrics.files_copied)
+                return True
+        m = self._RATE.match(line.strip())
+        if m:
+            self.metrics.speed_bps = float(m.group(1).replace(',', ''))
+            return True
+        return False
+
+
+PARSERS = {"robocopy": RobocopyParser, "rclone": RcloneParser, "rsync": RsyncParser}
+
+
+def parser_for(tool, mode=None):
+    if tool == "robocopy": return RobocopyParser(purge=mode == "MIR")
+    return PARSERS.get(tool, OutputParser)()
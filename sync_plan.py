@@ -0,0 +1,167 @@
+import re
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from native_sync import needs_copy
+
+# How many paths per category a plan keeps; the counts and byte totals are always complete.
+MAX_LISTED_PATHS = 5000
+
+
+@dataclass
+class SyncPlan:
+    """What a run of a pair would do: files to create, update and delete, with byte totals.
+
+    "transfer" holds copies a tool lists without saying whether the file is new or changed.
+    "deleted_dirs" holds extra folders a tool only lists as a whole; their contents aren't counted.
+    """
+    pair_key: tuple
+    tool: str
+    mode: str
+    new: list = field(default_factory=list)
+    changed: list = field(default_factory=list)
+    deleted: list = field(default_factory=list)
+    transfer: list = field(default_factory=list)
+    deleted_dirs: list = field(default_factory=list)
+    counts: dict = field(default_factory=lambda: {"new": 0, "changed": 0, "deleted": 0, "transfer": 0, "deleted_dirs": 0})
+    bytes: dict = field(default_factory=lambda: {"new": 0, "changed": 0, "deleted": 0, "transfer": 0})
+    estimated_seconds: Optional[float] = None
+    created: float = field(default_factory=time.time)
+
+    def add(self, kind, rel_path, size=0):
+        self.counts[kind] += 1
+        self.bytes[kind] += max(0, size)
+        entries = getattr(self, kind)
+        if len(entries) < MAX_LISTED_PATHS: entries.append((rel_path, max(0, size)))
+
+    def add_deleted_dir(self, rel_path):
+        self.counts["deleted_dirs"] += 1
+        if len(self.deleted_dirs) < MAX_LISTED_PATHS: self.deleted_dirs.append(rel_path)
+
+    @property
+    def bytes_to_copy(self):
+        return self.bytes["new"] + self.bytes["changed"] + self.bytes["transfer"]
+
+    @property
+    def files_to_copy(self):
+        return self.counts["new"] + self.counts["changed"] + self.counts["transfer"]
+
+    def is_empty(self):
+        return not any(self.counts.values())
+
+    def summary(self):
+        kinds = ("transfer", "deleted") if self.counts["transfer"] else ("new", "changed", "deleted")
+        parts = [f"{self.counts[k]} {'to transfer' if k == 'transfer' else k} ({self.bytes[k] / 1048576:.1f} MB)" for k in kinds]
+        if self.counts["deleted_dirs"]: parts.append(f"{self.counts['deleted_dirs']} extra folder(s) deleted with their contents")
+        if self.estimated_seconds is not None: parts.append(f"estimated {int(self.estimated_seconds)}s")
+        return ", ".join(parts)
+
+    def to_dict(self):
+        return {"pair_key": list(self.pair_key), "tool": self.tool, "mode": self.mode, "counts": dict(self.counts),
+                "bytes": dict(self.bytes), "estimated_seconds": self.estimated_seconds, "created": self.created,
+                "new": self.new, "changed": self.changed, "deleted": self.deleted, "transfer": self.transfer,
+                "deleted_dirs": self.deleted_dirs}
+
+
+def plan_from_entries(plan, src_entries, dst_entries):
+    """Fills plan with the same comparison NativeSyncEngine makes."""
+    for rel_path, src in src_entries.items():
+        if src.is_dir: continue
+        dst = dst_entries.get(rel_path)
+        if dst is None or dst.is_dir:
+            plan.add("new", rel_path, src.size)
+        elif needs_copy(src, dst):
+            plan.add("changed", rel_path, src.size)
+    if plan.mode == "MIR":
+        for rel_path, dst in dst_entries.items():
+            src = src_entries.get(rel_path)
+            if not dst.is_dir and (src is None or src.is_dir):
+                plan.add("deleted", rel_path, dst.size)
+    return plan
+
+
+class PlanParser:
+    """Turns one line of a tool's dry-run listing into plan entries."""
+
+    def __init__(self, plan, source, destination):
+        self.plan = plan
+        self.source = source
+        self.destination = destination
+
+    def feed(self, line):
+        return False
+
+
+class RobocopyPlanParser(PlanParser):
+    """Reads the file lines of robocopy /L /FP /BYTES."""
+    _LINE = re.compile(r'^\s*(New File|Newer|Older|Changed|\*EXTRA File|\*EXTRA Dir)\s+(-?\d+)\s+(.+?)\s*$')
+    _KINDS = {"New File": "new", "Newer": "changed", "Older": "changed", "Changed": "changed",
+              "*EXTRA File": "deleted", "*EXTRA Dir": "deleted_dirs"}
+
+    def feed(self, line):
+        m = self._LINE.match(line)
+        if not m: return False
+        kind = self._KINDS[m.group(1)]
+        # robocopy lists extras even without /MIR, it just doesn't delete them.
+        if kind in ("deleted", "deleted_dirs") and self.plan.mode != "MIR": return False
+        root = self.source if kind in ("new", "changed") else self.destination
+        # /L lists an extra folder on one line (its number is a file count) and nothing inside it.
+        if kind == "deleted_dirs": self.plan.add_deleted_dir(self._relative(m.group(3), root))
+        else: self.plan.add(kind, self._relative(m.group(3), root), int(m.group(2)))
+        return True
+
+    @staticmethod
+    def _relative(path, root):
+        path = path.rstrip('\\/')
+        prefix = root.rstrip('\\/') + '\\'
+        if path.lower().startswith(prefix.lower()): path = path[len(prefix):]
+        return path.replace('\\', '/')
+
+
+class RclonePlanParser(PlanParser):
+    """Reads the "Skipped ... as --dry-run is set" notices of rclone --use-json-log.
+
+    rclone says "Skipped copy" for new and changed files alike, so both land in "transfer".
+    """
+    _SKIPPED = re.compile(r'Skipped (\w+(?: \w+)?) as --dry-run is set(?: \(size ([\d.]+)(\w*)\))?')
+    _KINDS = {"copy": "transfer", "update": "transfer", "replace": "transfer", "delete": "deleted", "remove": "deleted"}
+    _UNITS = {'': 1, 'B': 1, 'Ki': 1024, 'Mi': 1024 ** 2, 'Gi': 1024 ** 3, 'Ti': 1024 ** 4}
+
+    def feed(self, line):
+        if not line.startswith('{'): return False
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return False
+        m = self._SKIPPED.search(record.get("msg", ""))
+        if not m or m.group(1) not in self._KINDS or not record.get("object"): return False
+        size = float(m.group(2)) * self._UNITS.get(m.group(3), 1) if m.group(2) else 0
+        self.plan.add(self._KINDS[m.group(1)], record["object"], int(size))
+        return True
+
+
+class RsyncPlanParser(PlanParser):
+    """Reads rsync --dry-run --out-format="%i %l %n" lines."""
+    _LINE = re.compile(r'^(\S{2}[\S.+]{9}|\*deleting\s*) (\d+) (.+)$')
+
+    def feed(self, line):
+        m = self._LINE.match(line)
+        if not m: return False
+        item, size, path = m.group(1), int(m.group(2)), m.group(3)
+        if item.startswith('*deleting'):
+            if path.endswith('/'): return False
+            self.plan.add("deleted", path, size)
+        elif item[0] in '<>' and item[1] == 'f':
+            self.plan.add("new" if '+++' in item else "changed", path, size)
+        else:
+            return False
+        return True
+
+
+PLAN_PARSERS = {"robocopy": RobocopyPlanParser, "rclone": RclonePlanParser, "rsync": RsyncPlanParser}
+
+
+def plan_parser_for(tool, plan, source, destination):
+    return PLAN_PARSERS.get(tool, PlanParser)(plan, source, destination)
@@ -0,0 +1,63 @@
+import os
+import time
+
+import pytest
+
+from exclusions import ExclusionMatcher, matcher_for, write_filter_file, prune_filter_files, FILTER_MAX_AGE_SECONDS
+
+EXCLUSIONS = ["node_modules/", "/build/", "*.tmp", "/secrets.txt", "cache/*.bin", "# comment", "  ", "Thumbs.db"]
+
+
+@pytest.fixture
+def matcher():
+    return ExclusionMatcher(EXCLUSIONS)
+
+
+@pytest.mark.parametrize("name, rel_path, is_dir, expected", [
+    ("node_modules", "node_modules", True, True),
+    ("node_modules", "app/web/node_modules", True, True),
+    ("node_modules", "app/node_modules", False, False),
+    ("build", "build", True, True),
+    ("build", "app/build", True, False),
+    ("a.tmp", "deep/down/a.tmp", False, True),
+    ("a.tmp", "dir.tmp", True, False),
+    ("secrets.txt", "secrets.txt", False, True),
+    ("secrets.txt", "app/secrets.txt", False, False),
+    ("x.bin", "cache/x.bin", False, True),
+    ("x.bin", "other/x.bin", False, False),
+    ("Thumbs.db", "photos/Thumbs.db", False, True),
+    ("readme.md", "readme.md", False, False),
+])
+def test_excluded(matcher, name, rel_path, is_dir, expected):
+    assert matcher.excluded(name, rel_path, is_dir) is expected
+
+
+def test_excludes_path_checks_parent_directories(matcher):
+    assert matcher.excludes_path("app/node_modules/lib/index.js", False)
+    assert matcher.excludes_path("build/out/app.exe", False)
+    assert not matcher.excludes_path("app/build/out/app.exe", False)
+    assert not matcher.excludes_path("app/src/index.js", False)
+
+
+def test_comments_and_blank_lines_are_ignored():
+    assert not ExclusionMatcher(["# only a comment", "", "   "])
+    assert ExclusionMatcher(EXCLUSIONS).patterns == ("node_modules/", "/build/", "*.tmp", "/secrets.txt", "cache/*.bin", "Thumbs.db")
+
+
+def test_matcher_for_reuses_compiled_lists(matcher):
+    assert matcher_for(EXCLUSIONS) is matcher_for(list(EXCLUSIONS))
+    assert matcher_for(EXCLUSIONS) is not matcher_for(EXCLUSIONS + ["*.log"])
+    assert matcher_for(matcher) is matcher
+
+
+def test_filter_files_are_reused_and_pruned_when_unused(tmp_path):
+    directory = str(tmp_path / "filters")
+    old = write_filter_file(directory, ["*.tmp"])
+    kept = write_filter_file(directory, ["*.log"], "rcj")
+    stale = time.time() - FILTER_MAX_AGE_SECONDS - 60
+    for path in (old, kept):
+        os.utime(path, (stale, stale))
+    assert write_filter_file(directory, ["*.log"], "rcj") == kept
+    assert prune_filter_files(directory) == 1
+    assert not os.path.exists(old) and os.path.exists(kept)
+    assert prune_filter_files(str(tmp_path / "missing")) == 0
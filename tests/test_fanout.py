@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+from native_sync import FanOutEngine, NativeSyncEngine, SyncCancelled
+
+
+def _source(tmp_path):
+    source = tmp_path / "src"
+    for i in range(20):
+        path = source / f"d{i % 3}" / f"f{i}.txt"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(os.urandom(1000 + i))
+    return str(source)
+
+
+def _engines(tmp_path, source, count=3):
+    return [NativeSyncEngine(source, str(tmp_path / f"dst{i}")) for i in range(count)]
+
+
+def test_fanout_copies_to_every_destination(tmp_path):
+    source = _source(tmp_path)
+    engines = _engines(tmp_path, source)
+    results = FanOutEngine(engines).run()
+    for engine, stats in results:
+        assert stats["files_copied"] == 20 and not stats["errors"]
+        for i in range(20):
+            rel = os.path.join(f"d{i % 3}", f"f{i}.txt")
+            assert open(os.path.join(engine.destination, rel), "rb").read() == open(os.path.join(source, rel), "rb").read()
+
+
+def test_stopping_one_pair_leaves_the_others_running(tmp_path):
+    source = _source(tmp_path)
+    engines = _engines(tmp_path, source)
+    engines[1].cancel()
+    results = FanOutEngine(engines).run()
+    assert isinstance(results[1][1], SyncCancelled)
+    assert results[0][1]["files_copied"] == results[2][1]["files_copied"] == 20
+
+
+def test_stopping_every_pair_stops_the_shared_scan(tmp_path):
+    source = _source(tmp_path)
+    engines = _engines(tmp_path, source)
+    for engine in engines:
+        engine.cancel()
+    with pytest.raises(SyncCancelled):
+        FanOutEngine(engines).run()
+    assert not any(os.path.exists(engine.destination) for engine in engines)
+
+
+def test_large_files_resume_per_destination(tmp_path, monkeypatch):
+    import native_sync
+    from resume_journal import ResumeJournal
+    monkeypatch.setattr(native_sync, "RESUME_MIN_SIZE", 1024 * 1024)
+    monkeypatch.setattr(native_sync, "CHECKPOINT_BYTES", 1024 * 1024)
+    monkeypatch.setattr(native_sync, "COPY_CHUNK", 256 * 1024)
+    source = tmp_path / "src"
+    source.mkdir()
+    data = os.urandom(3 * 1024 * 1024 + 999)
+    (source / "big.bin").write_bytes(data)
+
+    def engines(count):
+        return [NativeSyncEngine(str(source), str(tmp_path / f"dst{i}"), journal=ResumeJournal(str(tmp_path / f"j{i}.json")))
+                for i in range(count)]
+
+    first = engines(2)
+    # Stop the first destination right after its first checkpoint; the second one finishes.
+    update = first[0].journal.update
+    first[0].journal.update = lambda *args: (update(*args), first[0].cancel())
+    results = FanOutEngine(first).run()
+    assert isinstance(results[0][1], SyncCancelled)
+    assert results[1][1]["bytes_copied"] == len(data)
+    assert first[0].journal.get("big.bin", len(data), os.stat(source / "big.bin").st_mtime_ns)[0] == 1024 * 1024
+
+    # A new third destination starts from zero in the same read that resumes the first.
+    second = engines(3)
+    results = FanOutEngine(second).run()
+    assert results[0][1]["bytes_copied"] == len(data) - 1024 * 1024
+    assert results[1][1]["files_copied"] == 0
+    assert results[2][1]["bytes_copied"] == len(data)
+    assert (tmp_path / "dst0" / "big.bin").read_bytes() == data
+    assert (tmp_path / "dst2" / "big.bin").read_bytes() == data
+    assert second[0].journal.paths() == []
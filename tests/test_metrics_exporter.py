@@ -0,0 +1,86 @@
+import queue
+import re
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from metrics_exporter import MetricsExporter, DURATION_BUCKETS
+from sync_manager import SyncManager
+from sync_metrics import RunRecord
+
+_SAMPLE = re.compile(r'^([a-zA-Z_:][\w:]*)(?:\{(.*)\})? (\S+)$')
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_metrics(text):
+    """Parses the Prometheus text format into {name: [(labels, value)]} and {name: type}."""
+    samples, types = {}, {}
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            types[name] = kind
+        elif line and not line.startswith("#"):
+            m = _SAMPLE.match(line)
+            assert m, f"malformed sample line: {line!r}"
+            labels = dict(_LABEL.findall(m.group(2) or ""))
+            samples.setdefault(m.group(1), []).append((labels, float(m.group(3))))
+    return samples, types
+
+
+@pytest.fixture
+def exporter(tmp_path):
+    exporter = MetricsExporter(SyncManager(queue.Queue(), str(tmp_path)), 0)
+    exporter.start()
+    yield exporter
+    exporter.stop()
+
+
+def _run(pair, success, seconds, bytes_transferred):
+    record = RunRecord((pair["source"], pair["destination"]), "native", "MIR", {}, started=time.time() - seconds)
+    record.metrics.bytes_transferred = bytes_transferred
+    record.metrics.files_copied = 2
+    record.finish(success)
+    return record
+
+
+def test_metrics_endpoint_serves_run_events(exporter):
+    pair = {"source": "/data/Photos", "destination": "/backup/Photos"}
+    manager = exporter.manager
+    manager._emit(("status", "Syncing...", pair))
+    manager._emit(("run", pair, _run(pair, True, 42, 1000)))
+    manager._emit(("run", pair, _run(pair, False, 700, 500)))
+    manager._emit(("status", "Failed", pair))
+    manager._emit(("error", "boom"))
+
+    with urllib.request.urlopen(f"http://127.0.0.1:{exporter.port}/metrics", timeout=5) as response:
+        assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        samples, types = parse_metrics(response.read().decode("utf-8"))
+
+    labels = {"pair": "Photos", "source": "/data/Photos", "destination": "/backup/Photos"}
+    assert types["directorysync_pair_run_duration_seconds"] == "histogram"
+    assert samples["directorysync_pair_running"] == [(labels, 0)]
+    assert samples["directorysync_pair_bytes_transferred_total"] == [(labels, 1500)]
+    assert samples["directorysync_pair_files_transferred_total"] == [(labels, 4)]
+    runs = {l["result"]: v for l, v in samples["directorysync_pair_runs_total"]}
+    assert runs == {"success": 1, "failure": 1}
+    assert samples["directorysync_error_events_total"] == [({}, 1)]
+
+    buckets = {l["le"]: v for l, v in samples["directorysync_pair_run_duration_seconds_bucket"]}
+    assert list(buckets) == [str(b) for b in DURATION_BUCKETS] + ["+Inf"]
+    assert buckets["30"] == 0 and buckets["60"] == 1 and buckets["600"] == 1 and buckets["1800"] == 2 and buckets["+Inf"] == 2
+    assert list(buckets.values()) == sorted(buckets.values())
+    (_, total), = samples["directorysync_pair_run_duration_seconds_count"]
+    (_, duration), = samples["directorysync_pair_run_duration_seconds_sum"]
+    assert total == 2 and duration == pytest.approx(742, abs=1)
+
+
+def test_unknown_paths_are_not_found(exporter):
+    with pytest.raises(urllib.error.HTTPError) as e:
+        urllib.request.urlopen(f"http://127.0.0.1:{exporter.port}/other", timeout=5)
+    assert e.value.code == 404
+
+
+def test_failures_are_only_exported_as_a_runs_total_label(exporter):
+    assert "directorysync_pair_failures_total" not in exporter.render()
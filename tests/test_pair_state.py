@@ -0,0 +1,61 @@
+import sqlite3
+
+from config_store import path_key, state_key
+from file_index import FileIndex, INDEX_FILE
+from run_history import RunHistoryStore, HISTORY_FILE
+from sync_metrics import RunRecord
+
+
+def _write_tree(root):
+    (root / "a").mkdir(parents=True)
+    (root / "a" / "one.txt").write_text("1")
+
+
+def test_index_follows_the_pair_id_and_resets_when_paths_change(tmp_path):
+    _write_tree(tmp_path / "src")
+    pair = {"source": str(tmp_path / "src"), "destination": str(tmp_path / "dst"), "exclusions": []}
+    index = FileIndex(str(tmp_path))
+    index.commit(pair, index.scan(pair), full_run=True)
+    assert not index.needs_full_sweep(pair)
+
+    # A pair that gets an id adopts the snapshot stored under its path key.
+    pair["id"] = "abc"
+    index = FileIndex(str(tmp_path))
+    assert not index.needs_full_sweep(pair)
+    assert index.scan(pair).is_empty()
+    conn = sqlite3.connect(str(tmp_path / INDEX_FILE))
+    assert conn.execute("SELECT COUNT(*) FROM files WHERE pair_id = ?", (path_key(pair),)).fetchone()[0] == 0
+    conn.close()
+
+    # Pointing it at a new destination forces a full run instead of trusting the old snapshot.
+    pair["destination"] = str(tmp_path / "elsewhere")
+    assert index.needs_full_sweep(pair)
+    assert not index.scan(pair).is_empty()
+
+
+def test_sub_pairs_get_their_own_state_key():
+    pair = {"id": "abc", "source": "/data", "destination": "/backup"}
+    assert state_key(pair) == "abc"
+    assert state_key(dict(pair, subtree="photos")) not in ("abc", state_key(dict(pair, subtree="music")))
+    assert state_key({"source": "/data", "destination": "/backup"}) == path_key(pair)
+
+
+def test_run_history_survives_a_path_edit(tmp_path):
+    pair = {"source": "/data", "destination": "/backup"}
+    store = RunHistoryStore(str(tmp_path))
+    record = RunRecord(("/data", "/backup"), "native", "MIR", {}, started=1000.0)
+    record.finish(True)
+    store.append(record)
+    conn = sqlite3.connect(str(tmp_path / HISTORY_FILE))
+    assert conn.execute("SELECT pair_id FROM runs").fetchone()[0] is None
+    conn.close()
+
+    pair["id"] = "abc"
+    store = RunHistoryStore(str(tmp_path))
+    assert len(store.recent(pair)) == 1
+    pair["destination"] = "/new-backup"
+    record = RunRecord(("/data", "/new-backup"), "native", "MIR", {}, started=2000.0, pair_id="abc")
+    record.finish(True)
+    store.append(record)
+    assert [run["destination"] for run in store.recent(pair)] == ["/new-backup", "/backup"]
+    assert [r.pair_id for r in store.load_records(pair, 10)] == ["abc", "abc"]
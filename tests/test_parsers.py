@@ -0,0 +1,57 @@
+import pytest
+
+from sync_metrics import parser_for
+
+ROBOCOPY_OUTPUT = """\
+\t    New File  \t\t    2048\tC:\\data\\a.txt
+\t    Newer     \t\t    1024\tC:\\data\\b.txt
+\t*EXTRA File \t\t     512\tD:\\backup\\old.txt
+
+               Total    Copied   Skipped  Mismatch    FAILED    Extras
+    Dirs :         3         1         2         0         0         0
+   Files :        10         2         8         0         0         1
+   Bytes :    1.00 m      3072   1.00 m         0         0       512
+   Times :   0:00:02   0:00:01                       0:00:00   0:00:01
+   Speed :           3072 Bytes/sec.
+"""
+
+
+@pytest.mark.parametrize("mode, deleted", [("MIR", 1), ("E-Copy", 0)])
+def test_robocopy_counts_extras_as_deleted_only_when_purging(mode, deleted):
+    parser = parser_for("robocopy", mode)
+    for line in ROBOCOPY_OUTPUT.splitlines():
+        parser.feed(line)
+    m = parser.metrics
+    assert (m.files_checked, m.files_copied, m.files_skipped, m.files_deleted) == (10, 2, 8, deleted)
+    assert (m.bytes_total, m.bytes_transferred) == (1024 ** 2, 3072)
+    assert m.elapsed_seconds == 2 and m.speed_bps == 3072
+
+
+def test_robocopy_streamed_extras_follow_the_mode():
+    parser = parser_for("robocopy", "E-Copy")
+    assert parser.feed("\t*EXTRA File \t\t     512\tD:\\backup\\old.txt")
+    assert parser.metrics.files_deleted == 0
+
+
+@pytest.mark.parametrize("tail, checked", [
+    ("(xfr#3, ir-chk=1020/1050)", 30),
+    ("(xfr#3, to-chk=20/1050)", 1030),
+])
+def test_rsync_progress_reads_both_check_counters(tail, checked):
+    parser = parser_for("rsync")
+    assert parser.feed(f"    1,048,576  50%    2.00MB/s    0:00:01 {tail}")
+    m = parser.metrics
+    assert (m.files_checked, m.files_copied) == (checked, 3)
+    assert m.bytes_transferred == 1048576 and m.bytes_total == 2097152
+    assert m.speed_bps == 2 * 1024 ** 2 and m.elapsed_seconds == 1 and m.eta_seconds is None
+
+
+def test_rsync_stats_block():
+    parser = parser_for("rsync")
+    for line in ("Number of files: 1,200 (reg: 1,000, dir: 200)", "Number of regular files transferred: 40",
+                 "Number of deleted files: 2", "Total file size: 5,000,000 bytes", "Total transferred file size: 300,000 bytes",
+                 "sent 310,000 bytes  received 1,200 bytes  62,240.00 bytes/sec"):
+        assert parser.feed(line)
+    m = parser.metrics
+    assert (m.files_checked, m.files_copied, m.files_skipped, m.files_deleted) == (1200, 40, 1160, 2)
+    assert (m.bytes_total, m.bytes_transferred, m.speed_bps) == (5000000, 300000, 62240.0)
@@ -0,0 +1,51 @@
+import os
+import queue
+
+import pytest
+
+from sync_manager import SyncManager
+
+
+@pytest.fixture
+def setup(tmp_path):
+    for rel in ("src/a.txt", "dst/keep/k", "dst/stale.txt"):
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(rel)
+    pair = {"id": "p1", "source": str(tmp_path / "src"), "destination": str(tmp_path / "dst"), "tool": "native",
+            "mode": "MIR", "enabled": True, "exclusions": [], "tool_options": {}}
+    return SyncManager(queue.Queue(), str(tmp_path)), pair, tmp_path / "dst"
+
+
+def _logs(manager):
+    messages = []
+    while not manager.message_queue.empty():
+        event = manager.message_queue.get()
+        if event[0] == "log": messages.append(event[1])
+    return messages
+
+
+def test_run_after_plan_reuses_its_scan(setup):
+    manager, pair, dst = setup
+    assert manager.plan_pair(pair).counts["deleted"] == 2
+    _logs(manager)
+    assert manager.run_once([pair]) == [(pair, True)]
+    assert any("Reusing the scan" in m for m in _logs(manager))
+    assert not (dst / "keep").exists() and (dst / "a.txt").exists()
+
+
+def test_plan_then_new_exclusion_keeps_excluded_folder(setup):
+    manager, pair, dst = setup
+    manager.plan_pair(pair)
+    pair["exclusions"] = ["keep/"]
+    _logs(manager)
+    assert manager.run_once([pair]) == [(pair, True)]
+    assert not any("Reusing the scan" in m for m in _logs(manager))
+    assert (dst / "keep" / "k").exists() and not (dst / "stale.txt").exists()
+
+
+def test_editing_a_pair_discards_its_plan_scan(setup):
+    manager, pair, dst = setup
+    manager.plan_pair(pair)
+    manager.discard_plan_scan(pair)
+    assert manager._take_plan_scan(pair) is None
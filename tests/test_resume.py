@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+import native_sync
+from native_sync import NativeSyncEngine, SyncCancelled, TEMP_SUFFIX
+from resume_journal import ResumeJournal
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def small_checkpoints(monkeypatch):
+    monkeypatch.setattr(native_sync, "RESUME_MIN_SIZE", MB)
+    monkeypatch.setattr(native_sync, "CHECKPOINT_BYTES", MB)
+
+
+def _setup(tmp_path):
+    source, dest = tmp_path / "src", tmp_path / "dst"
+    source.mkdir()
+    data = os.urandom(3 * MB + 12345)
+    (source / "big.bin").write_bytes(data)
+    return str(source), str(dest), data, ResumeJournal(str(tmp_path / "resume.json"))
+
+
+def _interrupted_run(source, dest, journal):
+    """Runs until the first checkpoint has been journaled, then cancels."""
+    engine = NativeSyncEngine(source, dest, journal=journal)
+    update = journal.update
+
+    def update_then_cancel(*args):
+        update(*args)
+        engine.cancel()
+    journal.update = update_then_cancel
+    with pytest.raises(SyncCancelled):
+        engine.run()
+    del journal.update
+
+
+def test_interrupted_copy_resumes_from_checkpoint(tmp_path, small_checkpoints):
+    source, dest, data, journal = _setup(tmp_path)
+    _interrupted_run(source, dest, journal)
+    assert journal.get("big.bin", len(data), os.stat(os.path.join(source, "big.bin")).st_mtime_ns)[0] == MB
+
+    messages = []
+    stats = NativeSyncEngine(source, dest, journal=journal, log=lambda message, level: messages.append(message)).run()
+    assert any(message.startswith("Resuming big.bin") for message in messages)
+    assert stats["bytes_copied"] == len(data) - MB
+    assert open(os.path.join(dest, "big.bin"), "rb").read() == data
+    assert journal.paths() == []
+    assert not os.path.exists(os.path.join(dest, "big.bin" + TEMP_SUFFIX))
+
+
+def test_damaged_partial_copy_starts_over(tmp_path, small_checkpoints):
+    source, dest, data, journal = _setup(tmp_path)
+    _interrupted_run(source, dest, journal)
+    with open(os.path.join(dest, "big.bin" + TEMP_SUFFIX), "r+b") as f:
+        f.write(b"corrupt")
+
+    stats = NativeSyncEngine(source, dest, journal=journal).run()
+    assert stats["bytes_copied"] == len(data)
+    assert open(os.path.join(dest, "big.bin"), "rb").read() == data
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+import native_sync
+from native_sync import FanOutEngine, NativeSyncEngine, scan_tree
+
+
+@pytest.fixture
+def unreadable(monkeypatch):
+    """Makes os.scandir fail for directories named "locked", as it would without read permission."""
+    real_scandir = os.scandir
+
+    def scandir(path):
+        if os.path.basename(path) == "locked": raise PermissionError(13, "Permission denied", path)
+        return real_scandir(path)
+    monkeypatch.setattr(native_sync.os, "scandir", scandir)
+
+
+def _tree(root, files):
+    for rel, content in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return str(root)
+
+
+def test_unreadable_subdirectory_is_reported_and_skipped(tmp_path, unreadable):
+    root = _tree(tmp_path / "src", {"locked/a.txt": "a", "open/b.txt": "b", "c.txt": "c"})
+    errors = []
+    entries = scan_tree(root, errors=errors)
+    assert {"locked", "open", "open/b.txt", "c.txt"} == set(entries)
+    assert len(errors) == 1 and "locked" in errors[0]
+    with pytest.raises(PermissionError):
+        scan_tree(root)
+
+
+def test_native_sync_keeps_copying_but_skips_deletions(tmp_path, unreadable):
+    source = _tree(tmp_path / "src", {"locked/a.txt": "a", "open/b.txt": "b"})
+    destination = _tree(tmp_path / "dst", {"locked/a.txt": "old", "stale.txt": "x"})
+    logged = []
+    stats = NativeSyncEngine(source, destination, log=lambda message, level: logged.append(level)).run()
+    # The locked folder can't be read on either side.
+    assert stats["files_copied"] == 1 and len(stats["errors"]) == 2
+    assert os.path.exists(os.path.join(destination, "open", "b.txt"))
+    # Without a full view of the source, MIR must not treat the unread files as extras.
+    assert os.path.exists(os.path.join(destination, "locked", "a.txt"))
+    assert os.path.exists(os.path.join(destination, "stale.txt"))
+    assert "WARNING" in logged
+
+
+def test_fanout_reports_source_scan_errors_on_every_destination(tmp_path, unreadable):
+    source = _tree(tmp_path / "src", {"locked/a.txt": "a", "open/b.txt": "b"})
+    engines = [NativeSyncEngine(source, str(tmp_path / f"dst{i}")) for i in range(2)]
+    for engine, stats in FanOutEngine(engines).run():
+        assert stats["files_copied"] == 1 and len(stats["errors"]) == 1
+        assert os.path.exists(os.path.join(engine.destination, "open", "b.txt"))
@@ -0,0 +1,90 @@
+import time
+
+from scheduler import PairScheduler, MIN_INTERVAL_SECONDS
+
+
+def _key(pair):
+    return (pair["source"], pair["destination"])
+
+
+def _pair(name, **settings):
+    return dict(source=f"/data/{name}", destination=f"/backup/{name}", **settings)
+
+
+def _names(due):
+    return [pair["source"].rsplit("/", 1)[-1] for pair, _ in due]
+
+
+def test_due_orders_by_priority_and_reschedules_by_interval():
+    low, high = _pair("low", interval=60), _pair("high", interval=300, priority=5)
+    scheduler = PairScheduler([low, high], 120, _key)
+    now = time.time()
+    assert _names(scheduler.due(now)) == ["high", "low"]
+
+    for pair in (low, high):
+        scheduler.started(pair, None)
+    assert scheduler.due(now) == []
+    scheduler.completed(low, True, now)
+    scheduler.completed(high, True, now)
+    assert scheduler.seconds_until_next(now) == 60
+    assert scheduler.due(now + 59) == []
+    assert _names(scheduler.due(now + 60)) == ["low"]
+
+
+def test_failures_back_off_exponentially():
+    pair = _pair("flaky", interval=60)
+    logged = []
+    scheduler = PairScheduler([pair], 60, _key, lambda message, level: logged.append(level))
+    now = time.time()
+    delays = []
+    for _ in range(4):
+        scheduler.due(now)
+        scheduler.started(pair, None)
+        scheduler.completed(pair, False, now)
+        delays.append(scheduler.seconds_until_next(now))
+    assert delays == [60, 120, 240, 480]
+    assert logged == ["WARNING"] * 3
+
+    scheduler.started(pair, None)
+    scheduler.completed(pair, True, now)
+    assert scheduler.entries[_key(pair)].failures == 0
+
+
+def test_triggers_run_changed_paths_without_moving_the_full_sweep():
+    pair = _pair("watched", interval=600)
+    scheduler = PairScheduler([pair], 60, _key)
+    now = time.time()
+    scheduler.due(now)
+    scheduler.started(pair, None)
+    scheduler.completed(pair, True, now)
+
+    scheduler.trigger(_key(pair), {"a.txt"})
+    scheduler.trigger(_key(pair), {"b.txt"})
+    assert scheduler.due(now + 1) == [(pair, {"a.txt", "b.txt"})]
+    scheduler.started(pair, {"a.txt", "b.txt"})
+    scheduler.completed(pair, True, now + 2)
+    assert scheduler.seconds_until_next(now) == 600
+
+    scheduler.trigger(_key(pair), {"c.txt"})
+    scheduler.trigger(_key(pair), None)
+    assert scheduler.due(now + 3) == [(pair, None)]
+
+
+def test_overdue_pairs_go_first_and_are_reported_once():
+    relaxed, strict = _pair("relaxed", priority=10), _pair("strict", max_staleness=30)
+    logged = []
+    scheduler = PairScheduler([relaxed, strict], 60, _key, lambda message, level: logged.append(message))
+    now = time.time() + 31
+    assert _names(scheduler.due(now)) == ["strict", "relaxed"]
+    scheduler.due(now)
+    assert len(logged) == 1 and "strict" in logged[0]
+
+
+def test_skipped_full_runs_retry_shortly():
+    pair = _pair("busy", interval=600)
+    scheduler = PairScheduler([pair], 60, _key)
+    now = time.time()
+    scheduler.due(now)
+    scheduler.started(pair, None)
+    scheduler.completed(pair, None, now)
+    assert scheduler.seconds_until_next(now) == MIN_INTERVAL_SECONDS
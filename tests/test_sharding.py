@@ -0,0 +1,49 @@
+import os
+import queue
+
+from native_sync import NativeSyncEngine
+from sync_manager import SyncManager
+
+
+def _make_tree(root, names):
+    for name in names:
+        os.makedirs(os.path.join(root, name))
+        with open(os.path.join(root, name, "data.txt"), "w") as f:
+            f.write(name)
+    with open(os.path.join(root, "top.txt"), "w") as f:
+        f.write("top")
+
+
+def _root_pass(tmp_path, tool, names=("alpha", "beta", "gamma")):
+    """Runs _execute_sharded with the tool calls captured; returns (pair, root pass pair)."""
+    source, dest = str(tmp_path / "src"), str(tmp_path / "dst")
+    _make_tree(source, names)
+    os.makedirs(dest)
+    manager = SyncManager(queue.Queue(), str(tmp_path))
+    jobs = []
+    manager._execute_tool = lambda job_pair: jobs.append(job_pair) or (True, None)
+    pair = {"source": source, "destination": dest, "tool": tool, "mode": "MIR", "exclusions": [], "shards": 2, "tool_options": {}}
+    assert manager._execute_sharded(pair) == (True, None)
+    root_pair = next(job for job in jobs if job["source"] == source)
+    return manager, pair, root_pair
+
+
+def test_robocopy_root_pass_excludes_shard_folders_at_the_destination(tmp_path):
+    manager, pair, root_pair = _root_pass(tmp_path, "robocopy")
+    command = manager._generate_command(root_pair)
+    for name in ("alpha", "beta", "gamma"):
+        assert f'"{os.path.join(pair["source"], name)}"' in command
+        assert f'"{os.path.join(pair["destination"], name)}"' in command
+
+
+def test_native_root_pass_keeps_shard_destinations(tmp_path):
+    _, pair, root_pair = _root_pass(tmp_path, "native")
+    # What the shard jobs have written so far while the root pass runs.
+    for name in ("alpha", "beta", "gamma"):
+        os.makedirs(os.path.join(pair["destination"], name))
+        with open(os.path.join(pair["destination"], name, "partial.txt"), "w") as f:
+            f.write("in progress")
+    NativeSyncEngine(root_pair["source"], root_pair["destination"], "MIR", root_pair["exclusions"]).run()
+    for name in ("alpha", "beta", "gamma"):
+        assert os.path.exists(os.path.join(pair["destination"], name, "partial.txt"))
+    assert os.path.exists(os.path.join(pair["destination"], "top.txt"))
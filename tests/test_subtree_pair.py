@@ -0,0 +1,36 @@
+import os
+import queue
+
+import pytest
+
+from exclusions import rebase_exclusions
+from sync_manager import SyncManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return SyncManager(queue.Queue(), str(tmp_path))
+
+
+@pytest.mark.parametrize("dest, expected", [
+    ("remote:", "remote:photos/2024"),
+    ("remote:backup", "remote:backup/photos/2024"),
+    ("remote:backup/", "remote:backup/photos/2024"),
+    ("remote:/srv/backup", "remote:/srv/backup/photos/2024"),
+])
+def test_remote_destinations_join_without_a_slash_after_the_colon(manager, dest, expected):
+    pair = {"source": "/data", "destination": dest, "exclusions": []}
+    assert manager._subtree_pair(pair, "photos/2024")["destination"] == expected
+
+
+def test_local_destination(manager):
+    pair = {"source": "/data", "destination": "/mnt/backup", "exclusions": []}
+    sub_pair = manager._subtree_pair(pair, "photos")
+    assert sub_pair["source"] == os.path.join("/data", "photos")
+    assert sub_pair["destination"] == os.path.join("/mnt/backup", "photos")
+
+
+def test_anchored_exclusions_are_rebased_onto_the_subtree():
+    exclusions = ["*.tmp", "cache/", "/photos/raw/", "/photos/2024/thumbs/", "/videos/", "/photos/", "/*/index.db", "# note"]
+    assert rebase_exclusions(exclusions, "photos") == ["*.tmp", "cache/", "/raw/", "/2024/thumbs/", "/index.db", "# note"]
+    assert rebase_exclusions(exclusions, "photos/2024") == ["*.tmp", "cache/", "/thumbs/", "# note"]
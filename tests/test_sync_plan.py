@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from sync_plan import SyncPlan, plan_parser_for
+
+
+def _rclone_line(msg, obj):
+    return json.dumps({"level": "notice", "msg": msg, "object": obj})
+
+
+def test_rclone_copies_are_reported_as_transfers():
+    plan = SyncPlan(("/data", "remote:backup"), "rclone", "MIR")
+    parser = plan_parser_for("rclone", plan, "/data", "remote:backup")
+    assert parser.feed(_rclone_line("Skipped copy as --dry-run is set (size 2Ki)", "a.txt"))
+    assert parser.feed(_rclone_line("Skipped delete as --dry-run is set (size 10)", "old.txt"))
+    assert not parser.feed("not json")
+    assert plan.counts == {"new": 0, "changed": 0, "deleted": 1, "transfer": 1, "deleted_dirs": 0}
+    assert plan.bytes_to_copy == 2048 and plan.files_to_copy == 1
+    assert plan.summary().startswith("1 to transfer (0.0 MB), 1 deleted")
+
+
+def test_rsync_tells_new_and_changed_apart():
+    plan = SyncPlan(("/data", "/backup"), "rsync", "MIR")
+    parser = plan_parser_for("rsync", plan, "/data", "/backup")
+    assert parser.feed(">f+++++++++ 10 new.txt")
+    assert parser.feed(">f.st...... 20 changed.txt")
+    assert parser.feed("*deleting   30 gone.txt")
+    assert plan.counts == {"new": 1, "changed": 1, "deleted": 1, "transfer": 0, "deleted_dirs": 0}
+    assert plan.summary().startswith("1 new")
+
+
+@pytest.mark.parametrize("mode", ["MIR", "E-Copy"])
+def test_robocopy_extra_folders_are_not_counted_as_files(mode):
+    plan = SyncPlan(("C:\\data", "D:\\backup"), "robocopy", mode)
+    parser = plan_parser_for("robocopy", plan, "C:\\data", "D:\\backup")
+    assert parser.feed("\t    New File  \t\t    2048\tC:\\data\\a.txt")
+    parser.feed("\t*EXTRA Dir        -1\tD:\\backup\\old\\")
+    parser.feed("\t*EXTRA File \t\t     512\tD:\\backup\\gone.txt")
+    if mode == "MIR":
+        assert plan.deleted_dirs == ["old"] and plan.deleted == [("gone.txt", 512)]
+        assert plan.counts["deleted"] == 1 and plan.bytes["deleted"] == 512 and "deleted_dirs" not in plan.bytes
+        assert "1 extra folder(s) deleted with their contents" in plan.summary()
+    else:
+        assert plan.counts["deleted_dirs"] == plan.counts["deleted"] == 0
+    assert plan.new == [("a.txt", 2048)]